@@ -17,4 +17,6 @@ def create_celery_app(config: dict) -> Celery:
         result_serializer="yaml",
         event_serialzer="yaml",
         accept_content = ["json", "yaml"],
+        # Photo processing is CPU heavy, it gets its own queue so that it can be consumed by dedicated workers
+        task_routes={"tasks.process_photo": {"queue": config.get("PHOTO_TASK_QUEUE") or "photos"}},
     )
@@ -13,10 +13,11 @@ from urllib3.exceptions import MaxRetryError
 
 import py_reportit.crawler.service.crawler as crawler_service
 from py_reportit.crawler.service.photo import PhotoService
+from py_reportit.crawler.service.snapshot import SnapshotService
 from py_reportit.crawler.service.reportit_api import ReportItService, ReportNotFoundException
 from py_reportit.shared.model.crawl_item import CrawlItemState
+from py_reportit.shared.model.report import Report
 from py_reportit.shared.repository.report import ReportRepository
-from py_reportit.shared.repository.report_answer import ReportAnswerRepository
 from py_reportit.crawler.post_processors.abstract_pp import PostProcessorDispatcher
 from py_reportit.crawler.util.reportit_utils import filter_pp,\
     generate_random_times_between, is_last_in_reports_data, pretty_format_time
@@ -52,9 +53,8 @@ def chained_crawl(
     config: dict = Provide['config'],
     crawler: crawler_service.CrawlerService = Provide['crawler_service'],
     api_service: ReportItService = Provide['reportit_service'],
-    photo_service: PhotoService = Provide['photo_service'],
     report_repository: ReportRepository = Provide['report_repository'],
-    report_answer_repository: ReportAnswerRepository = Provide['report_answer_repository']
+    photo_service: PhotoService = Provide['photo_service'],
 ) -> None:
     current_crawl = crawler.get_active_crawl(self.session)
 
@@ -78,37 +78,57 @@ def chained_crawl(
 
     try:
         existing_report = report_repository.get_by_id(self.session, current_report_id)
+        reports_data_index = crawler.get_reports_data_index(current_crawl)
+
+        # Photos are only handled once it is known whether the report changed at all
+        fetched_photos: list[tuple[Report, str]] = []
 
         fetched_report = api_service.get_report_with_answers(
             current_report_id,
             existing_report,
-            current_crawl.reports_data,
-            photo_service.process_base64_photo_if_not_downloaded_yet,
+            reports_data_index,
+            lambda report, base64_photo: fetched_photos.append((report, base64_photo)),
         )
 
-        report_repository.update_or_create(self.session, fetched_report)
-        report_answer_repository.update_or_create_all(self.session, fetched_report.answers)
+        changes = crawler.persist_changed_reports(
+            self.session,
+            [existing_report] if existing_report else [],
+            [fetched_report]
+        )
 
         current_crawl_item.report_found = True
         current_crawl_item.state = CrawlItemState.SUCCESS
 
         logger.info(f"Successfully processed report with id {current_report_id}, title: {fetched_report.title}")
 
-        run_post_processors.delay(immediate_run=True)
+        # Photos are resized by their own task, so that the crawl does not wait for them. They are handled even for
+        # unchanged reports, in case a previous photo task failed for good.
+        for report, base64_photo in fetched_photos:
+            spool_path = photo_service.spool_base64_photo_if_not_downloaded_yet(report.id, base64_photo)
+
+            if spool_path:
+                process_photo.delay(report.id, spool_path)
+
+        if changes["unchanged"]:
+            logger.info(f"Report with id {current_report_id} is unchanged, skipping post processors")
+        else:
+            run_post_processors.delay(immediate_run=True)
 
-        if is_last_in_reports_data(fetched_report, current_crawl.reports_data):
+        if is_last_in_reports_data(fetched_report, reports_data_index):
             logger.info(f"Stop condition hit at report with id {current_report_id}, not queueing next crawl")
 
             current_crawl_item.stop_condition_hit = True
             crawler.set_skip_remaining_items(self.session, current_crawl_item)
             self.session.commit()
 
+            write_snapshots.delay()
+
             return
 
     except ReportNotFoundException:
         current_crawl_item.report_found = False
         current_crawl_item.state = CrawlItemState.SUCCESS
-        logger.info(f"No report found with id {current_report_id}, skipping. (This can hide a failed nonce verification!)")
+        logger.info(f"No report found with id {current_report_id}, skipping")
     except Timeout or MaxRetryError:
         current_crawl_item.state = CrawlItemState.FAILURE
         logger.warn(f"Retrieval of report with id {current_report_id} timed out "
@@ -129,6 +149,7 @@ def chained_crawl(
         current_crawl.current_task_id = None
         self.session.commit()
         logger.info(f"No more reports in queue, crawl finished without hitting stop condition.")
+        write_snapshots.delay()
         return
 
     next_task_execution_report_id = next_crawl_item.report_id
@@ -152,6 +173,21 @@ def chained_crawl(
     self.session.commit()
 
 
+@shared_task(name="tasks.process_photo", bind=True, autoretry_for=(Exception,), max_retries=5, retry_backoff=True)
+@inject
+def process_photo(self, report_id: int, spool_path: str, photo_service: PhotoService = Provide['photo_service']) -> None:
+    try:
+        photo_service.process_spooled_photo(report_id, spool_path)
+    except (Exception,):
+        if self.request.retries >= self.max_retries:
+            # Without its spooled photo, the report is no longer held back by post processors and the next crawl of
+            # it spools the photo again
+            logger.error(f"Giving up on the photo of report {report_id}", exc_info=True)
+            photo_service.discard_spooled_photo(spool_path)
+
+        raise
+
+
 @shared_task(name="tasks.launch_chained_crawl", base=DBTask, bind=True)
 @inject
 def launch_chained_crawl(
@@ -202,3 +238,21 @@ def run_post_processors(
     for pp in filter_pp(pp_dispatcher.post_processors, immediate_run):
         logger.info(f"Running post processor {pp}")
         pp.process(self.session, [])  # TODO: Provide new or updated reports (not necessary with current post procs)
+
+
+@shared_task(name="tasks.write_snapshots", base=DBTask, bind=True)
+@inject
+def write_snapshots(
+        self,
+        force: bool = False,
+        config: dict = Provide["config"],
+        snapshot_service: SnapshotService = Provide["snapshot_service"]
+) -> None:
+    if not config.get("SNAPSHOT_FOLDER"):
+        logger.info("No snapshot folder configured, skipping snapshots")
+        return
+
+    logger.info(f"Writing snapshots (forced: {force})")
+
+    if snapshot_service.write_snapshots(self.session, force=force):
+        logger.info("Snapshots written")
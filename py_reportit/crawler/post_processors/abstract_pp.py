@@ -4,6 +4,7 @@ from abc import ABC, abstractmethod
 from sqlalchemy.orm import Session
 
 from py_reportit.crawler.service.geocoder import GeocoderService
+from py_reportit.crawler.service.geocoding_engine import GeocodingEngine
 from py_reportit.crawler.service.reportit_api import ReportItService
 from py_reportit.shared.model.report import Report
 from py_reportit.shared.repository.report_answer import ReportAnswerRepository
@@ -18,12 +19,14 @@ class PostProcessor(ABC):
                  config: dict,
                  api_service: ReportItService,
                  geocoder_service: GeocoderService,
+                 geocoding_engine: GeocodingEngine,
                  report_repository: ReportRepository,
                  meta_repository: MetaRepository,
                  report_answer_repository: ReportAnswerRepository):
         self.config = config
         self.api_service = api_service
         self.geocoder_service = geocoder_service
+        self.geocoding_engine = geocoding_engine
         self.report_repository = report_repository
         self.meta_repository = meta_repository
         self.report_answer_repository = report_answer_repository
@@ -1,6 +1,5 @@
 import logging
 
-from time import sleep
 from sqlalchemy.orm import Session
 
 from py_reportit.crawler.post_processors.abstract_pp import PostProcessor
@@ -19,8 +18,6 @@ class Geocode(PostProcessor):
             logger.info("Geocoding not active, skipping")
             return
 
-        delay = float(self.config.get("GEOCODE_DELAY_SECONDS"))
-
         unprocessed_reports = self.report_repository.get_by(
             session,
             Report.latitude != None,
@@ -30,31 +27,20 @@ class Geocode(PostProcessor):
 
         logger.info("Processing %d reports", len(unprocessed_reports))
 
-        for report in unprocessed_reports:
-            try:
-                self.process_report(session, report)
-            except KeyboardInterrupt:
-                raise
-            except:
-                logger.error(f"Unexpected error while processing report {report}", exc_info=True)
-            finally:
-                logger.debug("Sleeping for %d seconds", delay)
-                sleep(delay)
+        failed_reports = self.geocoding_engine.geocode_reports(session, unprocessed_reports)
+        session.commit()
+
+        logger.info("Geocoded %d reports, %d failed", len(unprocessed_reports) - len(failed_reports), len(failed_reports))
 
     def process_report(self, session: Session, report: Report):
         logger.info(f"Processing report {report.id}")
 
-        try:
-            geocode_results = self.geocoder_service.get_neighbourhood_and_street(report.latitude, report.longitude)
-            logger.info("Found geolocation for report: %s", str(geocode_results))
-        except Exception as e:
-            logger.error(f"Could not geolocate report {report.id}: {e}")
-            raise
+        if self.geocoding_engine.geocode_reports(session, [report]):
+            raise GeocodeException(f"Could not geolocate report {report.id}")
 
-        report.meta.address_polled = True
-        report.meta.address_street = geocode_results["street"]
-        report.meta.address_postcode = int(geocode_results["postcode"]) if geocode_results["postcode"] else None
-        report.meta.address_neighbourhood = geocode_results["neighbourhood"]
+        logger.info("Found geolocation for report: %s", report.meta.address_street)
 
         session.commit()
 
+class GeocodeException(Exception):
+    pass
@@ -7,6 +7,7 @@ from sqlalchemy.sql.elements import and_
 from sqlalchemy.orm import Session
 
 from py_reportit.crawler.post_processors.abstract_pp import PostProcessor
+from py_reportit.crawler.service.photo import PhotoService
 from py_reportit.shared.model.report import Report
 from py_reportit.shared.model.meta import Meta
 from py_reportit.shared.model.meta_tweet import MetaTweet
@@ -29,6 +30,7 @@ class Twitter(PostProcessor):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.tweet_service = TweetService(self.config)
+        self.photo_service = PhotoService(self.config)
 
     def process(self, session: Session, new_or_updated_reports: list[Report]):
         self.process_reports(session)
@@ -44,6 +46,11 @@ class Twitter(PostProcessor):
             )
             logger.info("Processing %d reports", len(unprocessed_reports))
             for report in unprocessed_reports:
+                if report.has_photo and self.photo_service.photo_pending_for_report_id(report.id):
+                    # Its photo task has not saved the photo yet, the report is tweeted by a later run
+                    logger.info(f"Photo of report {report.id} is still being processed, not tweeting it yet")
+                    continue
+
                 try:
                     self.tweet_report(session, report)
                 except KeyboardInterrupt:
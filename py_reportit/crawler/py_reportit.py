@@ -44,6 +44,9 @@ class App:
         elif self.config.get("SPECIAL_RUN_MODE") == "RESUME":
             logger.info("Resuming chained crawl")
             self.celery_app.send_task("tasks.chained_crawl")
+        elif self.config.get("SPECIAL_RUN_MODE") == "ONE_OFF_SNAPSHOTS":
+            logger.info("Running one-off snapshot task")
+            self.celery_app.send_task("tasks.write_snapshots", kwargs={ "force": True })
 
 container = build_container_for_crawler()
 
@@ -62,6 +65,9 @@ logger.info(f"Daily scheduled crawl crontab args: {crontab_args_schedule_crawl}"
 crontab_args_post_processors = string_to_crontab_kwargs(config.get("START_POST_PROCESSORS_AT"))
 logger.info(f"Daily post processor run crontab args: {crontab_args_post_processors}")
 
+crontab_args_snapshots = string_to_crontab_kwargs(config.get("WRITE_SNAPSHOTS_AT"))
+logger.info(f"Daily snapshot crontab args: {crontab_args_snapshots}")
+
 celery_app.conf.beat_schedule = {
     'daily_randomize_schedule': {
         'task': 'tasks.schedule_crawl',
@@ -72,6 +78,10 @@ celery_app.conf.beat_schedule = {
         'task': 'tasks.post_processors',
         'schedule': crontab(**crontab_args_post_processors),
     },
+    'daily_snapshots': {
+        'task': 'tasks.write_snapshots',
+        'schedule': crontab(**crontab_args_snapshots),
+    },
 }
 
 def run_app():
@@ -13,19 +13,25 @@ from sqlalchemy.orm import Session
 from py_reportit.crawler.celery.tasks import chained_crawl
 from py_reportit.crawler.service.photo import PhotoService
 from py_reportit.crawler.service.reportit_api import ReportItService
-from py_reportit.crawler.util.reportit_utils import extract_ids, filter_reports_by_state, \
-    generate_random_times_between, generate_time_graph, pretty_format_time
+from py_reportit.crawler.util.reportit_utils import ReportsDataIndex, extract_ids, filter_reports_by_state, \
+    generate_random_times_between, generate_time_graph, pretty_format_time, report_content_hash
 from py_reportit.shared.model.crawl import Crawl
 from py_reportit.shared.model.crawl_item import CrawlItem, CrawlItemState
 from py_reportit.shared.model.report import Report
+from py_reportit.shared.model.report_changes import ReportChanges
 from py_reportit.shared.repository.crawl import CrawlRepository
 from py_reportit.shared.repository.crawl_item import CrawlItemRepository
 from py_reportit.shared.repository.meta import MetaRepository
 from py_reportit.shared.repository.report import ReportRepository
 from py_reportit.shared.repository.report_answer import ReportAnswerRepository
+from py_reportit.shared.service.cache_service import CacheService, REPORT_DATA
 
 logger = logging.getLogger(f"py_reportit.{__name__}")
 
+# Index over the raw reports data of the latest crawl processed by this process, by crawl id. It is only of use to the
+# crawl tasks run by this process, so it is kept in process memory rather than in the shared cache.
+reports_data_indexes: dict[int, ReportsDataIndex] = {}
+
 
 class CrawlerService:
 
@@ -38,6 +44,7 @@ class CrawlerService:
                  report_answer_repository: ReportAnswerRepository,
                  crawl_repository: CrawlRepository,
                  crawl_item_repository: CrawlItemRepository,
+                 cache_service: CacheService,
                  timezone: tzinfo
                  ):
         self.config = config
@@ -48,20 +55,84 @@ class CrawlerService:
         self.photo_service = photo_service
         self.crawl_repository = crawl_repository
         self.crawl_item_repository = crawl_item_repository
+        self.cache_service = cache_service
         self.timezone = timezone
 
     @staticmethod
-    def filter_updated_reports(existing_reports: list[Report], new_reports: list[Report]) -> list[Report]:
-        get_existing_report = lambda new_report: next(
-            filter(lambda existing_report: existing_report.id == new_report.id, existing_reports),
-            None
-        )
+    def get_content_hash(report: Report) -> str:
+        # Reports persisted before content hashes were introduced have none stored yet
+        return report.content_hash or report_content_hash(report)
+
+    @staticmethod
+    def diff_reports(existing_reports: list[Report], new_reports: list[Report]) -> ReportChanges:
+        existing_reports_by_id = {existing_report.id: existing_report for existing_report in existing_reports}
+        changes: ReportChanges = {"new": [], "updated": [], "unchanged": []}
+
+        for new_report in new_reports:
+            existing_report = existing_reports_by_id.get(new_report.id)
+
+            if existing_report is None:
+                changes["new"].append(new_report)
+            elif CrawlerService.get_content_hash(existing_report) != report_content_hash(new_report):
+                changes["updated"].append(new_report)
+            else:
+                changes["unchanged"].append(new_report)
+
+        return changes
+
+    def persist_reports(self, session: Session, reports: list[Report]) -> None:
+        """Upserts the given reports and all of their answers with one statement per table and a single commit."""
+        answers = [answer for report in reports for answer in report.answers]
+
+        for report in reports:
+            report.content_hash = report_content_hash(report)
+
+        try:
+            self.report_repository.upsert_many(session, reports, commit=False)
+            self.meta_repository.create_missing_for_reports(session, reports, commit=False)
+            self.report_answer_repository.upsert_many(session, answers, commit=False)
+            self.report_answer_repository.create_missing_metas(session, answers, commit=False)
+            session.commit()
+        except:
+            session.rollback()
+            raise
 
-        report_is_new_or_updated = \
-            lambda new_report: get_existing_report(
-                new_report).updated_at < new_report.updated_at if get_existing_report(new_report) else True
+        # Invalidates cached counts and responses
+        self.cache_service.bump_generation(REPORT_DATA)
 
-        return list(filter(lambda report: report_is_new_or_updated(report), new_reports))
+    def persist_changed_reports(
+            self,
+            session: Session,
+            existing_reports: list[Report],
+            fetched_reports: list[Report]
+    ) -> ReportChanges:
+        """Persists fetched reports that are new or whose content differs from the existing ones, skips the rest."""
+        changes = self.diff_reports(existing_reports, fetched_reports)
+
+        if changes["unchanged"]:
+            logger.info(f"Skipping persistence of {len(changes['unchanged'])} unchanged report(s): "
+                        f"{extract_ids(changes['unchanged'])}")
+            self.store_missing_content_hashes(session, existing_reports, changes["unchanged"])
+
+        if changes["new"] or changes["updated"]:
+            self.persist_reports(session, changes["new"] + changes["updated"])
+
+        return changes
+
+    def store_missing_content_hashes(
+            self,
+            session: Session,
+            existing_reports: list[Report],
+            unchanged_reports: list[Report]
+    ) -> None:
+        """Stores the content hashes of unchanged reports persisted before hashes existed, with a single commit."""
+        unchanged_ids = set(extract_ids(unchanged_reports))
+
+        self.report_repository.update_many_by_id(session, [
+            {"id": existing_report.id, "content_hash": report_content_hash(existing_report)}
+            for existing_report in existing_reports
+            if existing_report.id in unchanged_ids and not existing_report.content_hash
+        ])
 
     def get_active_crawl(self, session: Session) -> Optional[Crawl]:
         crawls = self.crawl_repository.get_by(session, Crawl.finished == False)
@@ -101,6 +172,23 @@ class CrawlerService:
 
         return crawl
 
+    def get_reports_data_index(self, crawl: Crawl) -> ReportsDataIndex:
+        """
+        Returns the index over the crawl's raw reports data, built only once per crawl and process. Every chained
+        crawl task of the same crawl reuses it instead of loading and scanning the raw reports data again.
+        """
+        index = reports_data_indexes.get(crawl.id)
+
+        if index is None:
+            logger.debug(f"Building reports data index for crawl {crawl.id}")
+            index = ReportsDataIndex(crawl.reports_data or [])
+
+            # Indexes of previous crawls are not needed anymore
+            reports_data_indexes.clear()
+            reports_data_indexes[crawl.id] = index
+
+        return index
+
     def get_next_waiting_crawl_item(self, session: Session, crawl: Crawl) -> Optional[CrawlItem]:
         return self.crawl_item_repository.get_next_waiting(session, crawl.id)
 
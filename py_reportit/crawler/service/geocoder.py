@@ -2,21 +2,49 @@ import re
 import logging
 
 from string import Template
+from typing import Optional
 from requests.sessions import Session
 
+from py_reportit.crawler.service.offline_geocoder import OfflineReverseGeocoder
 from py_reportit.shared.model.geocode_result import GeocodeResult
 
 logger = logging.getLogger(f"py_reportit.{__name__}")
 
 class GeocoderService:
 
-    def __init__(self, config: dict, requests_session: Session):
+    def __init__(
+            self,
+            config: dict,
+            requests_session: Session,
+            offline_geocoder: Optional[OfflineReverseGeocoder] = None,
+    ):
         self.config = config
         self.request_uri_template = Template(self.config.get('GEOCODE_REQUEST_URI_TEMPLATE'))
         self.api_key = self.config.get('GEOCODE_API_KEY')
         self.requests_session = requests_session
+        self.offline_geocoder = offline_geocoder
 
     def get_neighbourhood_and_street(self, latitude: float, longitude: float) -> GeocodeResult:
+        """Uses the offline geocoder if configured, the remote API only if it knows no address close enough."""
+        return self.get_neighbourhood_and_street_offline(latitude, longitude) \
+            or self.get_neighbourhood_and_street_remotely(latitude, longitude)
+
+    def get_neighbourhood_and_street_offline(self, latitude: float, longitude: float) -> Optional[GeocodeResult]:
+        if not self.offline_geocoder:
+            return None
+
+        offline_result = self.offline_geocoder.get_neighbourhood_and_street(latitude, longitude)
+
+        if not offline_result:
+            logger.debug(f"No offline geolocation for latitude {latitude} and longitude {longitude}")
+            return None
+
+        if offline_result["postcode"]:
+            offline_result["postcode"] = self.trim_postcode(offline_result["postcode"])
+
+        return offline_result
+
+    def get_neighbourhood_and_street_remotely(self, latitude: float, longitude: float) -> GeocodeResult:
         logger.debug(f"Geolocating for latitude {latitude} and longitude {longitude}")
 
         request_url = self.request_uri_template.substitute({
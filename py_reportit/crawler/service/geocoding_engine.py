@@ -0,0 +1,145 @@
+import logging
+
+from arrow import Arrow
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy.orm import Session
+
+from py_reportit.crawler.service.geocoder import GeocoderService
+from py_reportit.shared.model.geocode_cell import GeocodeCell
+from py_reportit.shared.model.geocode_result import GeocodeResult
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.report import Report
+from py_reportit.shared.repository.geocode_cell import GeocodeCellRepository
+from py_reportit.shared.util.rate_limiter import TokenBucket
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class GeocodingEngine:
+    """
+    Geocodes batches of reports. Coordinates are rounded to cells of GEOCODE_CELL_PRECISION decimals (4 decimals
+    being roughly 10 metres), each distinct cell of a batch is resolved once, and resolved cells are persisted so
+    that later reports nearby need no request at all. Remaining cells are resolved by up to GEOCODE_WORKERS threads,
+    which share a rate limit of GEOCODE_REQUESTS_PER_SECOND (by default one request per GEOCODE_DELAY_SECONDS).
+    Cells the offline geocoder resolves are neither rate limited nor persisted.
+    """
+
+    DEFAULT_PRECISION = 4
+    DEFAULT_WORKERS = 4
+
+    def __init__(self, config: dict, geocoder_service: GeocoderService, geocode_cell_repository: GeocodeCellRepository):
+        self.geocoder_service = geocoder_service
+        self.geocode_cell_repository = geocode_cell_repository
+        self.precision = int(config.get("GEOCODE_CELL_PRECISION") or self.DEFAULT_PRECISION)
+        self.workers = int(config.get("GEOCODE_WORKERS") or self.DEFAULT_WORKERS)
+
+        requests_per_second = float(config.get("GEOCODE_REQUESTS_PER_SECOND") or 0)
+
+        if not requests_per_second:
+            requests_per_second = 1 / max(0.01, float(config.get("GEOCODE_DELAY_SECONDS") or 1))
+
+        self.token_bucket = TokenBucket(requests_per_second)
+
+    def get_cell_id(self, latitude: float, longitude: float) -> str:
+        return f"{float(latitude):.{self.precision}f},{float(longitude):.{self.precision}f}"
+
+    @staticmethod
+    def to_geocode_result(cell: GeocodeCell) -> GeocodeResult:
+        return GeocodeResult(
+            street=cell.street,
+            postcode=str(cell.postcode) if cell.postcode else None,
+            neighbourhood=cell.neighbourhood
+        )
+
+    def to_geocode_cell(self, cell_id: str, geocode_result: GeocodeResult) -> GeocodeCell:
+        return GeocodeCell(
+            id=cell_id,
+            street=geocode_result["street"],
+            postcode=int(geocode_result["postcode"]) if geocode_result["postcode"] else None,
+            neighbourhood=geocode_result["neighbourhood"],
+            created_at=Arrow.now()
+        )
+
+    def geocode_remote(self, latitude: float, longitude: float) -> GeocodeResult:
+        self.token_bucket.acquire()
+
+        return self.geocoder_service.get_neighbourhood_and_street_remotely(latitude, longitude)
+
+    def resolve_cells(
+            self,
+            session: Session,
+            coordinates_by_cell: dict[str, tuple[float, float]]
+    ) -> dict[str, GeocodeResult | Exception]:
+        """
+        Resolves every given cell, from the persisted cells or else by geocoding the coordinates given for it, offline
+        if possible. Remotely resolved cells are added to the session, failures are returned in place of the result.
+        """
+        results: dict[str, GeocodeResult | Exception] = {
+            cell_id: self.to_geocode_result(cell)
+            for cell_id, cell in self.geocode_cell_repository.get_by_ids(session, list(coordinates_by_cell)).items()
+        }
+
+        for cell_id, coordinates in coordinates_by_cell.items():
+            if cell_id not in results and (offline_result := self.geocoder_service.get_neighbourhood_and_street_offline(*coordinates)):
+                results[cell_id] = offline_result
+
+        missing_cells = {cell_id: coordinates for cell_id, coordinates in coordinates_by_cell.items() if cell_id not in results}
+
+        logger.info(f"Resolving {len(coordinates_by_cell)} cells, {len(missing_cells)} of them remotely")
+
+        if not missing_cells:
+            return results
+
+        resolved_cells = []
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(missing_cells))) as executor:
+            futures = {
+                executor.submit(self.geocode_remote, *coordinates): cell_id for cell_id, coordinates in missing_cells.items()
+            }
+
+            for future in as_completed(futures):
+                cell_id = futures[future]
+
+                try:
+                    results[cell_id] = future.result()
+                    resolved_cells.append(self.to_geocode_cell(cell_id, results[cell_id]))
+                except Exception as e:
+                    logger.error(f"Could not geocode cell {cell_id}: {e}")
+                    results[cell_id] = e
+
+        self.geocode_cell_repository.upsert_many(session, resolved_cells, commit=False)
+
+        return results
+
+    @staticmethod
+    def get_address_values(geocode_result: GeocodeResult) -> dict:
+        return {
+            "address_polled": True,
+            "address_street": geocode_result["street"],
+            "address_postcode": int(geocode_result["postcode"]) if geocode_result["postcode"] else None,
+            "address_neighbourhood": geocode_result["neighbourhood"],
+        }
+
+    def apply_geocode_result(self, meta: Meta, geocode_result: GeocodeResult) -> None:
+        for column, value in self.get_address_values(geocode_result).items():
+            setattr(meta, column, value)
+
+    def geocode_reports(self, session: Session, reports: list[Report]) -> list[Report]:
+        """Sets the address of the given reports' metas, without committing. Returns the reports that failed."""
+        coordinates_by_cell: dict[str, tuple[float, float]] = {}
+
+        for report in reports:
+            coordinates_by_cell.setdefault(self.get_cell_id(report.latitude, report.longitude), (report.latitude, report.longitude))
+
+        results = self.resolve_cells(session, coordinates_by_cell)
+        failed_reports = []
+
+        for report in reports:
+            geocode_result = results[self.get_cell_id(report.latitude, report.longitude)]
+
+            if isinstance(geocode_result, Exception):
+                failed_reports.append(report)
+            else:
+                self.apply_geocode_result(report.meta, geocode_result)
+
+        return failed_reports
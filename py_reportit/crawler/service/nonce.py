@@ -0,0 +1,67 @@
+import logging
+
+from typing import Optional, TypedDict
+
+from py_reportit.shared.service.cache_service import CacheService
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class FormTokens(TypedDict):
+    report_id_input_field_name: str
+    nonces: dict
+
+
+class NonceService:
+    """
+    Lifecycle of the tokens needed to submit the report retrieval form: the name of its report id input field and its
+    nonces. Tokens are only cached once a submission using them returned a report page, and expire after the TTL.
+    The website answers a failed nonce verification just like an unknown report id, so a submission with cached tokens
+    not returning a report page is considered rejected and has to be retried with fresh tokens before being trusted.
+    """
+
+    DEFAULT_TTL_SECONDS = 900
+    COUNTERS = ["reused", "fetched", "rejected"]
+
+    def __init__(self, config: dict, cache_service: CacheService):
+        self.cache_service = cache_service.namespaced("nonces")
+        self.ttl_seconds = int(config.get("REPORTIT_NONCE_CACHE_SECONDS") or self.DEFAULT_TTL_SECONDS)
+
+    def get_cached_tokens(self) -> Optional[FormTokens]:
+        tokens = self.cache_service.get("form_tokens")
+
+        if tokens:
+            self.count("reused")
+
+        return tokens
+
+    def cache_tokens(self, tokens: FormTokens) -> None:
+        self.cache_service.set("form_tokens", tokens, self.ttl_seconds)
+
+    def invalidate(self) -> None:
+        self.cache_service.unset("form_tokens")
+
+    @staticmethod
+    def is_report_page(html: Optional[str]) -> bool:
+        return bool(html) and html.find("Sent on :") >= 0
+
+    def is_rejected(self, status_code: int, html: Optional[str], from_cache: bool) -> bool:
+        """
+        Whether a form submission may have failed because of its tokens.
+        Fresh tokens are trusted, so that genuinely unknown report ids are not fetched twice.
+        """
+        if status_code != 200:
+            return True
+
+        return from_cache and not self.is_report_page(html)
+
+    def count(self, counter: str) -> None:
+        self.cache_service.increment(f"counters:{counter}")
+
+    @property
+    def counters_available(self) -> bool:
+        """Counters are incremented by the crawler process, so other processes can only read them from a shared cache."""
+        return self.cache_service.shared
+
+    def get_counters(self) -> dict[str, int]:
+        return {counter: self.cache_service.get_counter(f"counters:{counter}") for counter in self.COUNTERS}
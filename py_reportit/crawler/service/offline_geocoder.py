@@ -0,0 +1,116 @@
+import gzip
+import json
+import logging
+
+from math import cos, floor, radians
+from typing import Iterable, Optional, TypedDict
+
+from py_reportit.shared.model.geocode_result import GeocodeResult
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+EARTH_RADIUS_METERS = 6371000
+
+
+class AddressPoint(TypedDict):
+    latitude: float
+    longitude: float
+    street: Optional[str]
+    postcode: Optional[str]
+    neighbourhood: Optional[str]
+
+
+class OfflineReverseGeocoder:
+    """
+    Reverse geocodes against a local set of address points, e.g. exported from an OSM extract of Luxembourg.
+    Points are indexed in a uniform grid with cells as large as the maximum distance, so that the nearest point within
+    that distance is always found among the points of the 3 x 3 cells around the queried coordinates.
+    Coordinates are projected equirectangularly, which is accurate to far below a metre over an area of a city's size.
+    """
+
+    DEFAULT_MAX_DISTANCE_METERS = 50
+
+    def __init__(self, points: Iterable[AddressPoint], max_distance_meters: float = DEFAULT_MAX_DISTANCE_METERS):
+        points = list(points)
+
+        self.max_distance_meters = max_distance_meters
+        self.cell_size_meters = max_distance_meters
+        self.reference_latitude = sum(point["latitude"] for point in points) / len(points) if points else 0
+        self.cells: dict[tuple[int, int], list[tuple[float, float, AddressPoint]]] = {}
+
+        for point in points:
+            x, y = self.project(point["latitude"], point["longitude"])
+            self.cells.setdefault(self.get_cell(x, y), []).append((x, y, point))
+
+        self.size = len(points)
+
+    @classmethod
+    def from_geojson(cls, path: str, max_distance_meters: float = DEFAULT_MAX_DISTANCE_METERS) -> "OfflineReverseGeocoder":
+        """
+        Loads a GeoJSON FeatureCollection (gzipped if the path ends with .gz) of Point features, whose properties
+        hold the street, postcode and neighbourhood of the address.
+        """
+        with (gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, encoding="utf-8")) as file:
+            features = json.load(file)["features"]
+
+        points = [
+            AddressPoint(
+                latitude=float(feature["geometry"]["coordinates"][1]),
+                longitude=float(feature["geometry"]["coordinates"][0]),
+                street=feature["properties"].get("street"),
+                postcode=str(feature["properties"]["postcode"]) if feature["properties"].get("postcode") else None,
+                neighbourhood=feature["properties"].get("neighbourhood"),
+            )
+            for feature in features if feature.get("geometry") and feature["geometry"]["type"] == "Point"
+        ]
+
+        logger.info(f"Loaded {len(points)} address points for offline geocoding from {path}")
+
+        return cls(points, max_distance_meters)
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["OfflineReverseGeocoder"]:
+        path = config.get("GEOCODE_OFFLINE_DATASET")
+
+        if not path:
+            return None
+
+        max_distance_meters = float(config.get("GEOCODE_OFFLINE_MAX_DISTANCE_METERS") or cls.DEFAULT_MAX_DISTANCE_METERS)
+
+        return cls.from_geojson(path, max_distance_meters)
+
+    def project(self, latitude: float, longitude: float) -> tuple[float, float]:
+        return (
+            radians(longitude) * cos(radians(self.reference_latitude)) * EARTH_RADIUS_METERS,
+            radians(latitude) * EARTH_RADIUS_METERS,
+        )
+
+    def get_cell(self, x: float, y: float) -> tuple[int, int]:
+        return floor(x / self.cell_size_meters), floor(y / self.cell_size_meters)
+
+    def get_nearest(self, latitude: float, longitude: float) -> Optional[tuple[AddressPoint, float]]:
+        """Returns the nearest address point within the maximum distance along with its distance in metres."""
+        x, y = self.project(float(latitude), float(longitude))
+        cell_x, cell_y = self.get_cell(x, y)
+        nearest = None
+        nearest_squared_distance = self.max_distance_meters ** 2
+
+        for neighbour_x in range(cell_x - 1, cell_x + 2):
+            for neighbour_y in range(cell_y - 1, cell_y + 2):
+                for point_x, point_y, point in self.cells.get((neighbour_x, neighbour_y), []):
+                    squared_distance = (point_x - x) ** 2 + (point_y - y) ** 2
+
+                    if squared_distance <= nearest_squared_distance:
+                        nearest, nearest_squared_distance = point, squared_distance
+
+        return (nearest, nearest_squared_distance ** 0.5) if nearest else None
+
+    def get_neighbourhood_and_street(self, latitude: float, longitude: float) -> Optional[GeocodeResult]:
+        nearest = self.get_nearest(latitude, longitude)
+
+        if not nearest:
+            return None
+
+        point, _ = nearest
+
+        return GeocodeResult(street=point["street"], postcode=point["postcode"], neighbourhood=point["neighbourhood"])
@@ -1,42 +1,263 @@
 import logging
+import os
 
 from base64 import b64decode
+from concurrent.futures import Future, ProcessPoolExecutor
+from enum import Enum
 from PIL import Image
 from PIL import ImageOps
 from io import BytesIO
-from os.path import isfile
-
-from py_reportit.shared.model.report import Report
+from os.path import dirname, isfile
+from tempfile import NamedTemporaryFile
+from typing import Optional
 
 logger = logging.getLogger(f"py_reportit.{__name__}")
 
+MAX_SIZE = 1200
+
+
+class PhotoSize(str, Enum):
+    THUMBNAIL = "thumbnail"
+    MEDIUM = "medium"
+    FULL = "full"
+
+    @property
+    def max_size(self) -> int:
+        return {PhotoSize.THUMBNAIL: 320, PhotoSize.MEDIUM: 640, PhotoSize.FULL: MAX_SIZE}[self]
+
+
+class PhotoFormat(str, Enum):
+    JPEG = "jpeg"
+    WEBP = "webp"
+
+    @property
+    def extension(self) -> str:
+        return "jpg" if self == PhotoFormat.JPEG else self.value
+
+    @property
+    def media_type(self) -> str:
+        return f"image/{self.value}"
+
+
+def get_photo_filename(reportId: int, size: PhotoSize = PhotoSize.FULL, photo_format: PhotoFormat = PhotoFormat.JPEG) -> str:
+    """The full size JPEG keeps its historical name, {reportId}.jpg, derivatives are suffixed with their size."""
+    suffix = "" if size == PhotoSize.FULL else f"_{size.value}"
+
+    return f"{reportId}{suffix}.{photo_format.extension}"
+
+
+def open_downscaled(photo_bytes: bytes, max_size: int = MAX_SIZE) -> Image.Image:
+    """
+    Opens a photo, letting the JPEG decoder downscale it by a power of two while decoding (see Image.draft), which is
+    much faster than decoding the full resolution. The result is never smaller than max_size, but usually still larger.
+    """
+    photo = Image.open(BytesIO(photo_bytes))
+
+    if photo.format == "JPEG":
+        photo.draft("RGB", (max_size, max_size))
+
+    return photo
+
+
+def save_atomically(img: Image.Image, filename: str, quality: int, photo_format: PhotoFormat = PhotoFormat.JPEG) -> None:
+    """Saves to a temporary file next to filename first, so that readers never see a partially written photo."""
+    with NamedTemporaryFile(dir=dirname(filename) or ".", suffix=".tmp", delete=False) as file:
+        temporary_filename = file.name
+
+        try:
+            if photo_format == PhotoFormat.WEBP:
+                img.save(file, format="WEBP", quality=quality, method=4)
+            else:
+                img.save(file, format="JPEG", optimize=True, quality=quality)
+        except Exception:
+            file.close()
+            os.unlink(temporary_filename)
+            raise
+
+    # Temporary files are only readable by their owner, the API serving the photos may run as another user
+    os.chmod(temporary_filename, 0o644)
+    os.replace(temporary_filename, filename)
+
+
+def save_derivatives(
+        photo: Image.Image,
+        folder: str,
+        reportId: int,
+        quality: int,
+        formats: list[PhotoFormat],
+        overwrite: bool = True
+) -> None:
+    """
+    Saves every size of the photo in the given formats. Sizes are downscaled from the next larger one, which is
+    cheaper than downscaling each from the original. The full size JPEG is saved last, as its presence marks the
+    photo as processed.
+    """
+    img = ImageOps.exif_transpose(photo)
+    if img.mode in ("RGBA", "P"):
+        img = img.convert("RGB")
+
+    derivatives = []
+
+    for size in (PhotoSize.FULL, PhotoSize.MEDIUM, PhotoSize.THUMBNAIL):
+        img = img.copy()
+        img.thumbnail(size=(size.max_size, size.max_size))
+        derivatives.append((size, img))
+
+    for size, derivative in reversed(derivatives):
+        for photo_format in sorted(formats, key=lambda photo_format: photo_format == PhotoFormat.JPEG):  # JPEG last
+            filename = f"{folder}/{get_photo_filename(reportId, size, photo_format)}"
+
+            if not overwrite and isfile(filename):
+                continue
+
+            logger.debug(f"Saving photo with filename {filename} and quality {quality}")
+            save_atomically(derivative, filename, quality, photo_format)
+
+
+def process_photo_bytes(photo_bytes: bytes, folder: str, reportId: int, quality: int, formats: list[PhotoFormat]) -> None:
+    """Module level, so that it can be sent to the worker processes of a photo pool."""
+    save_derivatives(open_downscaled(photo_bytes, MAX_SIZE), folder, reportId, quality, formats)
+
+
+def generate_missing_derivatives(folder: str, reportId: int, quality: int, formats: list[PhotoFormat]) -> None:
+    """Derives the smaller sizes and other formats from a full size JPEG saved before they existed."""
+    with Image.open(f"{folder}/{get_photo_filename(reportId)}") as photo:
+        save_derivatives(photo, folder, reportId, quality, formats, overwrite=False)
+
+
 class PhotoService:
+    """
+    Decodes, downscales and saves the photos of reports, in every PhotoSize as JPEG and, if PHOTO_WEBP is set, as WebP.
+    Crawl tasks spool the decoded photos to PHOTO_DOWNLOAD_FOLDER and hand their path over to the tasks.process_photo
+    Celery task (routed to the PHOTO_TASK_QUEUE queue), standalone crawls to a pool of PHOTO_WORKERS processes.
+    """
+
+    DEFAULT_WORKERS = 2
 
     def __init__(self, config: dict):
         self.config = config
+        self.workers = int(config.get("PHOTO_WORKERS") or self.DEFAULT_WORKERS)
+        self.formats = [PhotoFormat.JPEG] + ([PhotoFormat.WEBP] if int(config.get("PHOTO_WEBP") or 0) else [])
 
-    def get_photo_path(self, reportId: int) -> str:
-        return f"{self.config.get('PHOTO_DOWNLOAD_FOLDER')}/{reportId}.jpg"
+    @property
+    def folder(self) -> str:
+        return self.config.get('PHOTO_DOWNLOAD_FOLDER')
+
+    @property
+    def quality(self) -> int:
+        return int(self.config.get('PHOTO_DOWNLOAD_QUALITY'))
+
+    def get_photo_path(
+            self,
+            reportId: int,
+            size: PhotoSize = PhotoSize.FULL,
+            photo_format: PhotoFormat = PhotoFormat.JPEG
+    ) -> str:
+        return f"{self.folder}/{get_photo_filename(reportId, size, photo_format)}"
 
     def photo_exists_for_report_id(self, reportId: int) -> bool:
         return isfile(self.get_photo_path(reportId))
 
-    def process_base64_photo_if_not_downloaded_yet(self, report: Report, base_64_photo: str) -> None:
-        if not self.photo_exists_for_report_id(report.id):
-            logger.info(f"Photo does not exist yet for report {report.id}, processing ...")
-            self.process_base64_photo(report, base_64_photo)
+    def get_servable_photo(
+            self,
+            reportId: int,
+            size: PhotoSize = PhotoSize.FULL,
+            photo_format: PhotoFormat = PhotoFormat.JPEG
+    ) -> Optional[tuple[str, PhotoFormat]]:
+        """
+        Returns the path and format of the requested photo. Falls back to the JPEG of the same size if the format was
+        not generated, and to the full size JPEG for photos saved before derivatives existed.
+        """
+        for candidate_size, candidate_format in ((size, photo_format), (size, PhotoFormat.JPEG), (PhotoSize.FULL, PhotoFormat.JPEG)):
+            path = self.get_photo_path(reportId, candidate_size, candidate_format)
+
+            if isfile(path):
+                return path, candidate_format
+
+        return None
+
+    def get_spool_path(self, reportId: int) -> str:
+        return f"{self.folder}/{reportId}.spool"
+
+    def photo_pending_for_report_id(self, reportId: int) -> bool:
+        """Whether a spooled photo of the report is waiting to be processed."""
+        return isfile(self.get_spool_path(reportId))
+
+    def spool_base64_photo_if_not_downloaded_yet(self, reportId: int, base_64_photo: str) -> Optional[str]:
+        """
+        Writes the decoded photo next to the processed ones, so that only its path has to be sent to the photo task.
+        Returns the path of the spooled photo, or None if it already exists.
+        """
+        if self.photo_exists_for_report_id(reportId):
+            logger.info(f"Photo already exists for report {reportId}, skipping")
+            return None
+
+        spool_path = self.get_spool_path(reportId)
+        logger.info(f"Photo does not exist yet for report {reportId}, spooling to {spool_path} ...")
+
+        with NamedTemporaryFile(dir=self.folder, suffix=".tmp", delete=False) as file:
+            file.write(b64decode(base_64_photo))
+
+        os.replace(file.name, spool_path)
+
+        return spool_path
+
+    def process_spooled_photo(self, reportId: int, spool_path: str) -> None:
+        """Processes a photo spooled by spool_base64_photo_if_not_downloaded_yet, removing the spooled file once done."""
+        if not isfile(spool_path):
+            logger.info(f"Spooled photo {spool_path} of report {reportId} was already processed, skipping")
+            return
+
+        with open(spool_path, "rb") as file:
+            process_photo_bytes(file.read(), self.folder, reportId, self.quality, self.formats)
+
+        self.discard_spooled_photo(spool_path)
+
+    def discard_spooled_photo(self, spool_path: str) -> None:
+        try:
+            os.unlink(spool_path)
+        except FileNotFoundError:
+            pass
+
+    def process_base64_photo_if_not_downloaded_yet(self, reportId: int, base_64_photo: str) -> None:
+        if not self.photo_exists_for_report_id(reportId):
+            logger.info(f"Photo does not exist yet for report {reportId}, processing ...")
+            self.process_base64_photo(reportId, base_64_photo)
         else:
-            logger.info(f"Photo already exists for report {report.id}, skipping")
-
-    def process_base64_photo(self, report: Report, base_64_photo: str) -> None:
-        logger.debug(f"Processing base64 encoded photo for report {report.id}")
-        photo = Image.open(BytesIO(b64decode(base_64_photo)))
-        self.resize_and_save_photo(photo, self.get_photo_path(report.id), int(self.config.get('PHOTO_DOWNLOAD_QUALITY')))
-
-    def resize_and_save_photo(self, photo: Image, filename: str, quality: int) -> None:
-        logger.debug(f"Resizing and saving photo with filename {filename} and quality {quality}")
-        img = ImageOps.exif_transpose(photo)
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-        img.thumbnail(size=(1200,1200))
-        img.save(filename, optimize=True, quality=quality)
+            logger.info(f"Photo already exists for report {reportId}, skipping")
+
+    def process_base64_photo(self, reportId: int, base_64_photo: str) -> None:
+        logger.debug(f"Processing base64 encoded photo for report {reportId}")
+        process_photo_bytes(b64decode(base_64_photo), self.folder, reportId, self.quality, self.formats)
+
+    def derivatives_exist_for_report_id(self, reportId: int) -> bool:
+        return all(
+            isfile(self.get_photo_path(reportId, size, photo_format)) for size in PhotoSize for photo_format in self.formats
+        )
+
+    def create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit_base64_photo_if_not_downloaded_yet(
+            self,
+            pool: ProcessPoolExecutor,
+            reportId: int,
+            base_64_photo: str
+    ) -> Optional[Future]:
+        """Processes the photo in the given pool. Returns the future of its processing, or None if it already exists."""
+        if self.photo_exists_for_report_id(reportId):
+            logger.info(f"Photo already exists for report {reportId}, skipping")
+            return None
+
+        logger.info(f"Photo does not exist yet for report {reportId}, submitting to photo pool ...")
+
+        return pool.submit(
+            process_photo_bytes, b64decode(base_64_photo), self.folder, reportId, self.quality, self.formats
+        )
+
+    def submit_missing_derivatives(self, pool: ProcessPoolExecutor, reportId: int) -> Optional[Future]:
+        """Generates the derivatives of an existing full size photo in the given pool, unless they all exist already."""
+        if not self.photo_exists_for_report_id(reportId) or self.derivatives_exist_for_report_id(reportId):
+            return None
+
+        return pool.submit(generate_missing_derivatives, self.folder, reportId, self.quality, self.formats)
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+
+from typing import Callable, Iterable, Optional
+
+from py_reportit.crawler.service.nonce import FormTokens, NonceService
+from py_reportit.crawler.service.reportit_api import ReportItService, ReportFetchException
+from py_reportit.shared.config.async_http_client import AsyncCrawlerClient
+from py_reportit.shared.config.requests_session import UpstreamGuard
+from py_reportit.shared.util.rate_limiter import PerHostRateLimiter
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class AsyncReportFetcher:
+    """
+    Fetches report pages concurrently, so that backfills and catch-up crawls overlap network latency instead of
+    waiting on one report at a time. Follows the nonce lifecycle of ReportItService.fetch_report_page, the returned
+    pages are meant to be passed to ReportItService.get_report_with_answers as pre_fetched_page.
+    """
+
+    DEFAULT_CONCURRENCY = 8
+
+    def __init__(
+            self,
+            config: dict,
+            reportit_service: ReportItService,
+            nonce_service: NonceService,
+            upstream_guard: Optional[UpstreamGuard] = None,
+            client_factory: Optional[Callable[[], AsyncCrawlerClient]] = None,
+    ):
+        self.config = config
+        self.reportit_service = reportit_service
+        self.nonce_service = nonce_service
+        self.client_factory = client_factory or (lambda: AsyncCrawlerClient(config, upstream_guard=upstream_guard))
+        self.concurrency = int(config.get("FETCH_REPORTS_CONCURRENCY") or self.DEFAULT_CONCURRENCY)
+
+    async def fetch_many(
+            self,
+            report_ids: Iterable[int],
+            concurrency: Optional[int] = None,
+            rate_limiter: Optional[PerHostRateLimiter] = None,
+    ) -> dict[int, str | Exception]:
+        """
+        Fetches the pages of the given reports with at most `concurrency` requests in flight, paced by the optional
+        rate limiter. Failures are returned in place of the page, so that one failed report does not abort the others.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        # Fresh tokens are fetched by one request at a time, the others wait for them to be validated and cached
+        tokens_lock = asyncio.Lock()
+        target_url = self.config.get("REPORTIT_API_ANSWER_URL")
+        results: dict[int, str | Exception] = {}
+
+        async with self.client_factory() as client:
+            async def fetch_one(report_id: int) -> None:
+                async with semaphore:
+                    if rate_limiter:
+                        await rate_limiter.acquire_async(target_url)
+
+                    try:
+                        results[report_id] = await self.fetch_report_page(client, report_id, tokens_lock)
+                    except Exception as e:
+                        logger.warning(f"Failed to fetch report page for {report_id}: {e}")
+                        results[report_id] = e
+
+            await asyncio.gather(*(fetch_one(report_id) for report_id in report_ids))
+
+        return results
+
+    async def fetch_report_page(self, client: AsyncCrawlerClient, report_id: int, tokens_lock: asyncio.Lock) -> str:
+        tokens = self.nonce_service.get_cached_tokens()
+
+        if tokens is None:
+            async with tokens_lock:
+                tokens = self.nonce_service.get_cached_tokens()
+
+                if tokens is None:
+                    tokens = await self.fetch_form_tokens(client, report_id)
+                    r = await self.submit_report_form(client, report_id, tokens)
+
+                    return await self.validate_response(client, report_id, tokens, r, from_cache=False)
+
+        r = await self.submit_report_form(client, report_id, tokens)
+
+        return await self.validate_response(client, report_id, tokens, r, from_cache=True)
+
+    async def validate_response(self, client: AsyncCrawlerClient, report_id: int, tokens: FormTokens, r, from_cache: bool) -> str:
+        if self.nonce_service.is_rejected(r.status_code, r.text, from_cache):
+            logger.warning(f"Failed to retrieve report page for {report_id} with {'cached' if from_cache else 'fresh'} "
+                           f"nonce(s), status was {r.status_code}, clearing cache and retrying ...")
+            self.nonce_service.count("rejected")
+            self.nonce_service.invalidate()
+
+            tokens = await self.fetch_form_tokens(client, report_id)
+            from_cache = False
+            r = await self.submit_report_form(client, report_id, tokens)
+
+            if r.status_code != 200:
+                raise ReportFetchException(f"Failed while retrying to retrieve report page for {report_id}, status was {r.status_code}")
+
+        if not from_cache and self.nonce_service.is_report_page(r.text):
+            self.nonce_service.cache_tokens(tokens)
+
+        return r.text
+
+    async def fetch_form_tokens(self, client: AsyncCrawlerClient, report_id: int) -> FormTokens:
+        r = await client.crawler_get(self.config.get("REPORTIT_API_ANSWER_URL"), params={ "session_number": report_id })
+
+        tokens = FormTokens(
+            report_id_input_field_name=self.reportit_service.extract_report_id_input_field(r.text),
+            nonces=self.reportit_service.extract_nonces(r.text),
+        )
+        self.nonce_service.count("fetched")
+
+        return tokens
+
+    async def submit_report_form(self, client: AsyncCrawlerClient, report_id: int, tokens: FormTokens):
+        return await client.crawler_post(
+            self.config.get("REPORTIT_API_ANSWER_URL"),
+            data=self.reportit_service.build_form_data(report_id, tokens),
+        )
@@ -0,0 +1,119 @@
+import logging
+import re
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+from bs4.element import Tag
+
+from py_reportit.shared.model.parsed_report_page import ParsedAnswer, ParsedReportPage
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class ReportPageParser(ABC):
+
+    DATE_FORMAT_WEB = '%d.%m.%Y %H:%M'
+
+    @abstractmethod
+    def parse(self, html: str) -> ParsedReportPage:
+        pass
+
+
+class SoupReportPageParser(ReportPageParser):
+    """
+    Builds a single tree per report page and extracts the report fields and all answers from it.
+    Only the <main> element is parsed, which skips the inline scripts surrounding the actual content.
+    """
+
+    DEFAULT_FEATURES = "html.parser"
+
+    def __init__(self, features: Optional[str] = None):
+        self.features = self.resolve_features(features or self.DEFAULT_FEATURES)
+        self.strainer = SoupStrainer("main")
+
+    @classmethod
+    def resolve_features(cls, features: str) -> str:
+        try:
+            BeautifulSoup("", features)
+            return features
+        except FeatureNotFound:
+            logger.warning(f"HTML parser backend {features} is not available, falling back to {cls.DEFAULT_FEATURES}")
+            return cls.DEFAULT_FEATURES
+
+    def parse(self, html: str) -> ParsedReportPage:
+        soup = BeautifulSoup(html, self.features, parse_only=self.strainer)
+
+        for br in soup.find_all("br"):
+            br.replace_with("\n")
+
+        latitude, longitude = None, None
+        gps_and_image_urls_selection = soup.select(".img-thumbnail")
+
+        if len(gps_and_image_urls_selection) >= 1:
+            # Only GPS position
+            latitude, longitude = self.extract_gps(gps_and_image_urls_selection[0]['src'])
+
+        # Both GPS position and image
+        has_photo = len(gps_and_image_urls_selection) == 2
+        base64_photo = gps_and_image_urls_selection[1]["src"].split("base64,")[1] if has_photo else None
+
+        return {
+            "title": self.extract_title(soup),
+            "description": self.extract_description(soup),
+            "status": self.extract_status(html),
+            "created_at": self.extract_created_at(soup),
+            "latitude": latitude,
+            "longitude": longitude,
+            "has_photo": has_photo,
+            "base64_photo": base64_photo,
+            "answers": list(map(self.extract_answer, soup.select(".card-body .row:nth-child(2) .card"))),
+        }
+
+    @staticmethod
+    def extract_title(soup: BeautifulSoup) -> Optional[str]:
+        header_selection = soup.select(".card-header b")
+        raw_header = header_selection[0].text.strip() if len(header_selection) else ""
+        title_regex = re.search(r"(?<=\d\s:).*", raw_header)
+        return title_regex.group().strip() if title_regex else None
+
+    @staticmethod
+    def extract_description(soup: BeautifulSoup) -> Optional[str]:
+        description_selection = soup.select(".card-body .row .card .card-body")
+        raw_description = description_selection[0].text.strip() if len(description_selection) else ""
+        description_regex = re.search(r"Description\s:\n(.*)", raw_description, re.DOTALL)
+        return description_regex.group(1).strip() if description_regex else None
+
+    @staticmethod
+    def extract_status(html: str) -> str:
+        status_regex = re.search(r".*badge\sbg-success.*", html)
+        return "finished" if status_regex else "accepted"
+
+    def extract_created_at(self, soup: BeautifulSoup) -> Optional[datetime]:
+        created_selection = soup.select("table tbody tr:last-child td")
+        raw_created = created_selection[0].text.strip() if len(created_selection) else None
+        return datetime.strptime(raw_created, self.DATE_FORMAT_WEB) if raw_created else None
+
+    @staticmethod
+    def extract_gps(gps_url: str) -> tuple[Optional[str], Optional[str]]:
+        gps_regex = re.search(r"center=(\d*\.\d*,\d*\.\d*)", gps_url)
+        gps = gps_regex.group(1).strip() if gps_regex else None
+        return tuple(gps.split(',')) if gps else (None, None)
+
+    def extract_answer(self, block: Tag) -> ParsedAnswer:
+        author = block.select(".card-header i")[0].text.strip()
+        raw_header = block.select(".card-header")[0].text.strip()
+        raw_timestamp = re.search(r"(\d{2}\.\d{2}\.\d{4} \d{2}:\d{2})", raw_header).group()
+        created_at = datetime.strptime(raw_timestamp, self.DATE_FORMAT_WEB)
+        closing = raw_header.split()[0].lower() == "closed"
+        raw_text = block.select(".card-body")
+        text = raw_text[0].text.strip() if len(raw_text) else ""
+
+        return {
+            "author": author,
+            "created_at": created_at,
+            "closing": closing,
+            "text": text
+        }
@@ -2,20 +2,20 @@ import json
 import logging
 import re
 from base64 import b64decode
-from datetime import datetime
 from typing import Callable, Optional
 
 from bs4 import BeautifulSoup
-from bs4.element import ResultSet
 from requests.models import Response
 from requests.sessions import Session
 
 from py_reportit.shared.model.answer_meta import ReportAnswerMeta
 from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.parsed_report_page import ParsedAnswer
 from py_reportit.shared.model.report import Report
 from py_reportit.shared.model.report_answer import ReportAnswer
-from py_reportit.shared.service.cache_service import CacheService
-from py_reportit.crawler.util.reportit_utils import find_in_reports_data
+from py_reportit.crawler.service.nonce import FormTokens, NonceService
+from py_reportit.crawler.service.report_page_parser import ReportPageParser
+from py_reportit.crawler.util.reportit_utils import ReportsDataIndex, find_in_reports_data
 
 logger = logging.getLogger(f"py_reportit.{__name__}")
 
@@ -24,10 +24,17 @@ class ReportItService:
     DATE_FORMAT_API = '%Y-%m-%d %H:%M:%S'
     DATE_FORMAT_WEB = '%d.%m.%Y %H:%M'
 
-    def __init__(self, config: dict, requests_session: Session, cache_service: CacheService):
+    def __init__(
+            self,
+            config: dict,
+            requests_session: Session,
+            report_page_parser: ReportPageParser,
+            nonce_service: NonceService,
+    ):
         self.config = config
         self.requests_session = requests_session
-        self.cache_service = cache_service
+        self.report_page_parser = report_page_parser
+        self.nonce_service = nonce_service
 
     def get_raw_reports_data(self):
         r = self.requests_session.crawler_get(self.config.get('REPORTIT_API_URL'))
@@ -42,59 +49,32 @@ class ReportItService:
             self,
             reportId: int,
             existing_report: Optional[Report] = None,
-            reports_data: list[dict] = [],
+            reports_data: list[dict] | ReportsDataIndex = [],
             photo_callback: Optional[Callable[[Report, str], None]] = None,
+            pre_fetched_page: Optional[str] = None,
             ) -> Report:
-        r = self.fetch_report_page(reportId)
+        page = pre_fetched_page if pre_fetched_page is not None else self.fetch_report_page(reportId).text
 
-        if r.text.find("Sent on :") < 0:
-            if r.text.find(f"{reportId} could not be found") >= 0:
-                raise ReportNotFoundException(f"No report found with id {reportId} (this can hide a failed nonce verification!)")
+        if not self.nonce_service.is_report_page(page):
+            if page.find(f"{reportId} could not be found") >= 0:
+                raise ReportNotFoundException(f"No report found with id {reportId}")
             else:
-                logger.error(f"Failed to process report with id {reportId}, received: \n{r.text}")
+                logger.error(f"Failed to process report with id {reportId}, received: \n{page}")
                 raise ReportProcessingException(f"Failed to process report with id {reportId}")
 
-        soup = BeautifulSoup(r.text, 'html.parser')
-
-        for br in soup.find_all("br"):
-            br.replace_with("\n")
-
-        report_properties = { "id": reportId }
-
-        # Get title
-        header_selection = soup.select(".card-header b")
-        raw_header = header_selection[0].text.strip() if len(header_selection) else ""
-        title_regex = re.search(r"(?<=\d\s:).*", raw_header)
-        report_properties["title"] = title_regex.group().strip() if title_regex else None
-
-        # Get description
-        description_selection = soup.select(".card-body .row .card .card-body")
-        raw_description = description_selection[0].text.strip() if len(description_selection) else ""
-        description_regex = re.search(r"Description\s:\n(.*)", raw_description, re.DOTALL)
-        report_properties["description"] = description_regex.group(1).strip() if description_regex else None
-
-        # Get status
-        status_regex = re.search(r".*badge\sbg-success.*", r.text)
-        report_properties["status"] = "finished" if status_regex else "accepted"
-
-        # Get created datetime
-        created_selection = soup.select("table tbody tr:last-child td")
-        raw_created = created_selection[0].text.strip() if len(created_selection) else None
-        report_properties["created_at"] = datetime.strptime(raw_created, self.DATE_FORMAT_WEB) if raw_created else None
-
-        # Get GPS, image url
-        gps_and_image_urls_selection = soup.select(".img-thumbnail")
-        report_properties["latitude"], report_properties["longitude"], report_properties["has_photo"] = None, None, False
-        if len(gps_and_image_urls_selection) >= 1:
-            # Only GPS position
-            gps_url = gps_and_image_urls_selection[0]['src']
-            gps_regex = re.search(r"center=(\d*\.\d*,\d*\.\d*)", gps_url)
-            gps = gps_regex.group(1).strip() if gps_regex else None
-            report_properties["latitude"], report_properties["longitude"] = gps.split(',') if gps else (None, None)
-        if len(gps_and_image_urls_selection) == 2:
-            # Both GPS position and image
-            report_properties["has_photo"] = True
-        
+        parsed_page = self.report_page_parser.parse(page)
+
+        report_properties = {
+            "id": reportId,
+            "title": parsed_page["title"],
+            "description": parsed_page["description"],
+            "status": parsed_page["status"],
+            "created_at": parsed_page["created_at"],
+            "latitude": parsed_page["latitude"],
+            "longitude": parsed_page["longitude"],
+            "has_photo": parsed_page["has_photo"],
+        }
+
         if report_properties["latitude"] == None or report_properties["longitude"] == None:
             if existing_report and existing_report.latitude != None and existing_report.longitude != None:
                 report_properties["latitude"] = existing_report.latitude
@@ -107,7 +87,7 @@ class ReportItService:
                     report_properties["longitude"] = report_from_reports_data.get("longitude")
 
         report = Report(**report_properties, meta=Meta())
-        answers = self.get_answers(reportId, pre_fetched_page=r)
+        answers = self.build_answers(reportId, parsed_page["answers"])
         report.answers = answers
 
         if len(answers):
@@ -118,8 +98,7 @@ class ReportItService:
                 report.meta.closed_without_answer = True
 
         if report_properties["has_photo"] and photo_callback:
-            base64photo = gps_and_image_urls_selection[1]["src"].split("base64,")[1]
-            photo_callback(report, base64photo)
+            photo_callback(report, parsed_page["base64_photo"])
 
         return report
 
@@ -127,50 +106,70 @@ class ReportItService:
     def get_answers(self, reportId: int, pre_fetched_page: Response = None) -> list[ReportAnswer]:
         r = pre_fetched_page or self.fetch_report_page(reportId)
 
-        soup = BeautifulSoup(r.text, 'html.parser')
+        return self.build_answers(reportId, self.report_page_parser.parse(r.text)["answers"])
+
+    @staticmethod
+    def build_answers(reportId: int, parsed_answers: list[ParsedAnswer]) -> list[ReportAnswer]:
+        return [ReportAnswer(**parsed_answer, order=order, report_id=reportId, meta=ReportAnswerMeta()) for order, parsed_answer in enumerate(parsed_answers)]
+
+    def fetch_report_page(self, reportId: int) -> Response:
+        tokens = self.nonce_service.get_cached_tokens()
+        from_cache = tokens is not None
 
-        for br in soup.find_all("br"):
-            br.replace_with("\n")
+        if from_cache:
+            logger.debug(f"Using cached nonce(s) {tokens['nonces']} and report id input field name "
+                         f"{tokens['report_id_input_field_name']}")
+        else:
+            tokens = self.fetch_form_tokens(reportId)
 
-        message_blocks = soup.select(".card-body .row:nth-child(2) .card")
-        message_dicts = map(self.extract_from_message_block, message_blocks)
+        r = self.submit_report_form(reportId, tokens)
 
-        return [ReportAnswer(**message_dict, order=order, report_id=reportId, meta=ReportAnswerMeta()) for order, message_dict in enumerate(message_dicts)]
+        if self.nonce_service.is_rejected(r.status_code, r.text, from_cache):
+            logger.warning(f"Failed to retrieve report page for {reportId} with {'cached' if from_cache else 'fresh'} "
+                           f"nonce(s), status was {r.status_code}, clearing cache and retrying ...")
+            self.nonce_service.count("rejected")
+            self.nonce_service.invalidate()
 
-    def fetch_report_page(self, reportId: int, is_retry: bool = False) -> Response:
-        report_id_input_field_name, nonces = self.get_report_id_input_field_name_and_nonces_from_cache()
+            tokens = self.fetch_form_tokens(reportId)
+            from_cache = False
+            r = self.submit_report_form(reportId, tokens)
 
-        if report_id_input_field_name and nonces:
-            logger.info(f"Using CACHED nonce(s) {nonces} and report id input field name {report_id_input_field_name}")
-        else:
-            r = self.requests_session.crawler_get(
-                self.config.get("REPORTIT_API_ANSWER_URL"),
-                params={ "session_number": reportId }
-            )
+            if r.status_code != 200:
+                raise ReportFetchException(f"Failed while retrying to retrieve report page for {reportId}, status was {r.status_code}")
+
+        # Only tokens proven valid are cached, reused ones keep their original expiry
+        if not from_cache and self.nonce_service.is_report_page(r.text):
+            self.nonce_service.cache_tokens(tokens)
+
+        return r
 
-            nonces = self.extract_nonces(r.text)
-            report_id_input_field_name = self.extract_report_id_input_field(r.text)
+    def fetch_form_tokens(self, reportId: int) -> FormTokens:
+        r = self.requests_session.crawler_get(
+            self.config.get("REPORTIT_API_ANSWER_URL"),
+            params={ "session_number": reportId }
+        )
+
+        tokens = FormTokens(
+            report_id_input_field_name=self.extract_report_id_input_field(r.text),
+            nonces=self.extract_nonces(r.text),
+        )
+        self.nonce_service.count("fetched")
 
-            logger.info(f"Using UNCACHED nonce(s) {nonces} and report id input field name {report_id_input_field_name}")
+        logger.info(f"Using fresh nonce(s) {tokens['nonces']} and report id input field name "
+                    f"{tokens['report_id_input_field_name']}")
 
-            # HOTFIX
-            #self.cache_report_id_input_field_name_and_nonces(report_id_input_field_name, nonces)
+        return tokens
 
-        r = self.requests_session.crawler_post(
+    def submit_report_form(self, reportId: int, tokens: FormTokens) -> Response:
+        return self.requests_session.crawler_post(
             self.config.get("REPORTIT_API_ANSWER_URL"),
-            { report_id_input_field_name: reportId, **nonces, "session_number": reportId },
+            self.build_form_data(reportId, tokens),
             timeout=int(self.config.get("FETCH_REPORTS_TIMEOUT_SECONDS"))
         )
 
-        if r.status_code != 200 and not is_retry:
-            logger.warning(f"Failed to retrieve report page for {reportId}, status was {r.status_code},"
-                           "clearing cache and retrying ...")
-            self.clear_report_id_input_field_name_and_nonces_cache()
-            return self.fetch_report_page(reportId, True)
-        elif r.status_code != 200 and is_retry:
-            raise ReportFetchException(f"Failed while retrying to retrieve report page for {reportId}, status was {r.status_code}")
-        else:
-            return r
+    @staticmethod
+    def build_form_data(reportId: int, tokens: FormTokens) -> dict:
+        return { tokens["report_id_input_field_name"]: reportId, **tokens["nonces"], "session_number": reportId }
 
     def extract_report_id_input_field(self, html) -> str:
         soup = BeautifulSoup(html, 'html.parser')
@@ -197,37 +196,6 @@ class ReportItService:
 
         return { field["name"]: field["value"] for field in hidden_fields }
 
-    def cache_report_id_input_field_name_and_nonces(
-            self, report_id_input_field_name: str | None,
-            nonces: dict | None
-    ) -> None:
-        self.cache_service.set("report_id_input_field_name", report_id_input_field_name)
-        self.cache_service.set("nonces", nonces)
-
-    def get_report_id_input_field_name_and_nonces_from_cache(self) -> tuple[str | None, str | None]:
-        return self.cache_service.get("report_id_input_field_name"), self.cache_service.get("nonces")
-
-    def clear_report_id_input_field_name_and_nonces_cache(self) -> None:
-        self.cache_service.unset("report_id_input_field_name")
-        self.cache_service.unset("nonces")
-
-    @staticmethod
-    def extract_from_message_block(block: ResultSet) -> dict:
-        author = block.select(".card-header i")[0].text.strip()
-        raw_header = block.select(".card-header")[0].text.strip()
-        raw_timestamp = re.search(r"(\d{2}\.\d{2}\.\d{4} \d{2}:\d{2})", raw_header).group()
-        created_at = datetime.strptime(raw_timestamp, '%d.%m.%Y %H:%M')
-        closing = raw_header.split()[0].lower() == "closed"
-        raw_text = block.select(".card-body")
-        text = raw_text[0].text.strip() if len(raw_text) else ""
-
-        return {
-            "author": author,
-            "created_at": created_at,
-            "closing": closing,
-            "text": text
-        }
-
 class ReportNotFoundException(Exception):
     pass
 
@@ -0,0 +1,215 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+from datetime import datetime, timezone
+from tempfile import NamedTemporaryFile
+from typing import Iterable, Optional
+from sqlalchemy import Column, Table, select
+from sqlalchemy.orm import Session
+
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.report import Report
+from py_reportit.shared.model.report_answer import ReportAnswer
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class SnapshotService:
+    """
+    Dumps the report, answer and meta tables to gzipped NDJSON files, one row per line, for bulk consumers.
+    Tables are partitioned by report id ranges of SNAPSHOT_PARTITION_SIZE reports, each partition being fingerprinted
+    separately from a scan of a few narrow columns, so that only partitions whose data changed are dumped again.
+    Files are named after their partition's fingerprint and a manifest listing them with their checksums is written
+    last, so readers resolving files through the manifest never see a partial snapshot.
+    """
+
+    MANIFEST_FILENAME = "manifest.json"
+    BATCH_SIZE = 1000
+    DEFAULT_PARTITION_SIZE = 10000
+
+    tables: dict[str, Table] = {
+        "reports": Report.__table__,
+        "report_answers": ReportAnswer.__table__,
+        "metas": Meta.__table__,
+    }
+
+    # Columns holding the id of the report each row of a table belongs to, by which rows are partitioned
+    partition_columns: dict[str, Column] = {
+        "reports": Report.__table__.c.id,
+        "report_answers": ReportAnswer.__table__.c.report_id,
+        "metas": Meta.__table__.c.report_id,
+    }
+
+    # Columns whose changes warrant a new snapshot: every dumped meta column, as metas are narrow, and the report
+    # columns not covered by the content hash, which stands for the crawled content of reports and their answers
+    fingerprint_columns = [
+        Report.id, Report.content_hash, Report.updated_at, Report.key_category, Report.id_service,
+        *Meta.__table__.columns,
+    ]
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.partition_size = int(config.get("SNAPSHOT_PARTITION_SIZE") or self.DEFAULT_PARTITION_SIZE)
+
+    @property
+    def folder(self) -> str:
+        return self.config.get("SNAPSHOT_FOLDER")
+
+    @staticmethod
+    def get_name(table_name: str, partition: int) -> str:
+        return f"{table_name}.{partition:05d}"
+
+    @staticmethod
+    def get_filename(name: str, fingerprint: str) -> str:
+        return f"{name}.{fingerprint[:16]}.ndjson.gz"
+
+    def get_path(self, filename: str) -> str:
+        return os.path.join(self.folder, filename)
+
+    def get_partition_range(self, partition: int) -> tuple[int, int]:
+        """First and last report id of the partition."""
+        return partition * self.partition_size, (partition + 1) * self.partition_size - 1
+
+    def get_manifest(self) -> Optional[dict]:
+        try:
+            with open(self.get_path(self.MANIFEST_FILENAME)) as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            return None
+
+    def compute_fingerprints(self, session: Session) -> dict[int, str]:
+        """Fingerprints of all partitions holding reports, computed in a single pass over the fingerprint columns."""
+        digests = {}
+        rows = session.execute(
+            select(*self.fingerprint_columns)
+            .outerjoin(Meta, Meta.report_id == Report.id)
+            .order_by(Report.id)
+            .execution_options(yield_per=self.BATCH_SIZE)
+        )
+
+        for row in rows:
+            partition = row[0] // self.partition_size
+            digests.setdefault(partition, hashlib.sha256()).update(repr(tuple(row)).encode("utf-8"))
+
+        return {partition: digest.hexdigest() for partition, digest in digests.items()}
+
+    def write_snapshots(self, session: Session, force: bool = False) -> bool:
+        """
+        Dumps the partitions whose data changed since the last snapshot (or all of them if forced), carrying over the
+        files of the others. Returns whether anything was written.
+        """
+        fingerprints = self.compute_fingerprints(session)
+        manifest = self.get_manifest()
+        previous_partitions = manifest.get("partitions", {}) if manifest and not force else {}
+        previous_files = manifest.get("files", {}) if manifest else {}
+
+        if manifest and manifest.get("partition_size") != self.partition_size:
+            previous_partitions = {}
+
+        changed_partitions = sorted(
+            partition for partition, fingerprint in fingerprints.items()
+            if previous_partitions.get(str(partition)) != fingerprint
+        )
+        removed_partitions = set(map(int, previous_partitions)) - set(fingerprints)
+
+        if manifest and not force and not changed_partitions and not removed_partitions:
+            logger.info("Data did not change since the last snapshot, skipping")
+            return False
+
+        logger.info(f"Writing snapshots of {len(changed_partitions)} of {len(fingerprints)} partitions")
+
+        os.makedirs(self.folder, exist_ok=True)
+
+        files = {}
+
+        for partition in sorted(fingerprints):
+            for table_name, table in self.tables.items():
+                name = self.get_name(table_name, partition)
+
+                if partition in changed_partitions or name not in previous_files:
+                    files[name] = self.write_partition(session, table_name, table, partition, fingerprints[partition])
+                else:
+                    files[name] = previous_files[name]
+
+        self.write_atomically(
+            self.MANIFEST_FILENAME,
+            lambda manifest_file: manifest_file.write(json.dumps({
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "partition_size": self.partition_size,
+                "partitions": {str(partition): fingerprint for partition, fingerprint in sorted(fingerprints.items())},
+                "files": files,
+            }, indent=2).encode("utf-8"))
+        )
+
+        if manifest:
+            self.remove_outdated_files(manifest, files)
+
+        return True
+
+    def write_partition(self, session: Session, table_name: str, table: Table, partition: int, fingerprint: str) -> dict:
+        name = self.get_name(table_name, partition)
+        filename = self.get_filename(name, fingerprint)
+        start_id, end_id = self.get_partition_range(partition)
+        partition_column = self.partition_columns[table_name]
+        rows = session.execute(
+            select(table)
+            .where(partition_column >= start_id, partition_column <= end_id)
+            .order_by(*table.primary_key)
+            .execution_options(yield_per=self.BATCH_SIZE)
+        )
+        file = {
+            "filename": filename,
+            "table": table_name,
+            "start_report_id": start_id,
+            "end_report_id": end_id,
+            **self.write_file(filename, map(dict, rows.mappings())),
+        }
+
+        logger.info(f"Wrote snapshot of {file['row_count']} {table_name} of partition {partition} to {filename}")
+
+        return file
+
+    def remove_outdated_files(self, previous_manifest: dict, files: dict) -> None:
+        current_filenames = {file["filename"] for file in files.values()}
+
+        for file in previous_manifest.get("files", {}).values():
+            if file["filename"] not in current_filenames:
+                try:
+                    os.unlink(self.get_path(file["filename"]))
+                except FileNotFoundError:
+                    pass
+
+    def write_file(self, filename: str, rows: Iterable[dict]) -> dict:
+        digest = hashlib.sha256()
+        row_count = 0
+
+        def write_rows(tmp_file) -> None:
+            nonlocal row_count
+
+            # Fixed mtime keeps the output, and thus the checksum, identical for identical data
+            with gzip.GzipFile(fileobj=tmp_file, mode="wb", mtime=0) as gzip_file:
+                for row in rows:
+                    gzip_file.write((json.dumps(row, default=str, ensure_ascii=False) + "\n").encode("utf-8"))
+                    row_count += 1
+
+        self.write_atomically(filename, write_rows)
+
+        with open(self.get_path(filename), "rb") as written_file:
+            for chunk in iter(lambda: written_file.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        return {"sha256": digest.hexdigest(), "size": os.path.getsize(self.get_path(filename)), "row_count": row_count}
+
+    def write_atomically(self, filename: str, write) -> None:
+        with NamedTemporaryFile("wb", dir=self.folder, delete=False, suffix=".tmp") as tmp_file:
+            try:
+                write(tmp_file)
+            except:
+                os.unlink(tmp_file.name)
+                raise
+
+        os.chmod(tmp_file.name, 0o644)
+        os.replace(tmp_file.name, self.get_path(filename))
@@ -0,0 +1,62 @@
+import json
+import logging
+import os
+import threading
+
+from tempfile import NamedTemporaryFile
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class BackfillCheckpoint:
+    """
+    Records which report ids of a backfill range have been settled, so that an interrupted run can be resumed.
+    Only settled outcomes (found or not found) are recorded, failed ids are retried on the next run.
+    """
+
+    def __init__(self, path: str, start_id: int, end_id: int, save_every: int = 25):
+        self.path = path
+        self.start_id = start_id
+        self.end_id = end_id
+        self.save_every = max(1, save_every)
+        self.settled: dict[int, str] = {}
+        self.unsaved_count = 0
+        self.lock = threading.Lock()
+
+    def load(self) -> None:
+        if not os.path.isfile(self.path):
+            return
+
+        with open(self.path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+
+        if checkpoint.get("start_id") != self.start_id or checkpoint.get("end_id") != self.end_id:
+            logger.warning(f"Ignoring checkpoint {self.path}, it was written for range "
+                           f"{checkpoint.get('start_id')}-{checkpoint.get('end_id')}")
+            return
+
+        self.settled = {int(report_id): outcome for report_id, outcome in checkpoint.get("settled", {}).items()}
+
+    def pending_ids(self) -> list[int]:
+        return [report_id for report_id in range(self.start_id, self.end_id + 1) if report_id not in self.settled]
+
+    def mark(self, report_id: int, outcome: str) -> None:
+        with self.lock:
+            self.settled[report_id] = outcome
+            self.unsaved_count += 1
+
+            if self.unsaved_count >= self.save_every:
+                self.save_unlocked()
+
+    def save(self) -> None:
+        with self.lock:
+            self.save_unlocked()
+
+    def save_unlocked(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+
+        with NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as tmp_file:
+            json.dump({"start_id": self.start_id, "end_id": self.end_id, "settled": self.settled}, tmp_file)
+
+        os.replace(tmp_file.name, self.path)
+        self.unsaved_count = 0
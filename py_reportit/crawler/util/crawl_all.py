@@ -1,22 +1,43 @@
+import asyncio
 import sys
+import threading
 
-from time import sleep
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from time import monotonic
+from typing import Optional
 
 from dependency_injector.wiring import Provide, inject
+from requests.models import HTTPError
+from sqlalchemy.orm import sessionmaker
 
 from py_reportit.shared.config.container import run_with_container
 from py_reportit.shared.config import config
+from py_reportit.crawler.service.crawler import CrawlerService
+from py_reportit.crawler.service.photo import PhotoService
+from py_reportit.crawler.service.report_fetcher import AsyncReportFetcher
 from py_reportit.crawler.service.reportit_api import ReportItService, ReportNotFoundException
+from py_reportit.crawler.util.backfill_checkpoint import BackfillCheckpoint
+from py_reportit.crawler.util.reportit_utils import ReportsDataIndex
+from py_reportit.shared.model.report import Report
 from py_reportit.shared.repository.report import ReportRepository
-from py_reportit.shared.repository.report_answer import ReportAnswerRepository
+from py_reportit.shared.util.rate_limiter import PerHostRateLimiter
+
+print_lock = threading.Lock()
+
+def log(message: str) -> None:
+    with print_lock:
+        print(message)
+        sys.stdout.flush()
 
-# TODO: Fix - most notably, session injection in repo and reports_data, photo callback
 @inject
 def crawl_all(
     config: dict = Provide["config"],
     service: ReportItService = Provide["reportit_service"],
+    fetcher: AsyncReportFetcher = Provide["async_report_fetcher"],
+    photo_service: PhotoService = Provide["photo_service"],
+    crawler: CrawlerService = Provide["crawler_service"],
     report_repository: ReportRepository = Provide["report_repository"],
-    answer_repository: ReportAnswerRepository = Provide["report_answer_repository"],
+    session_maker: sessionmaker = Provide["sessionmaker"],
 ):
     success = []
     repository_errors = []
@@ -27,37 +48,130 @@ def crawl_all(
     dry_run = bool(int(config.get("CRAWL_ALL_DRY_RUN", 0)))
     print_success = bool(int(config.get("CRAWL_ALL_PRINT_SUCCESS", 0)))
 
-    sleep_seconds = int(config.get("CRAWL_SLEEP", 1))
+    workers = int(config.get("CRAWL_ALL_WORKERS", 4))
+    reports_per_second = float(config.get("CRAWL_ALL_REPORTS_PER_SECOND", 1))
+    burst = int(config.get("CRAWL_ALL_BURST", 1))
+    checkpoint_path = config.get("CRAWL_ALL_CHECKPOINT_FILE") or f"crawl_all_{start_id}-{end_id}.checkpoint.json"
+    checkpoint_every = int(config.get("CRAWL_ALL_CHECKPOINT_EVERY", 25))
+    # If set, pages are fetched concurrently in batches and the workers only parse and persist them
+    fetch_concurrency = int(config.get("CRAWL_ALL_FETCH_CONCURRENCY", 0))
 
     if start_id < 0 or end_id < 0:
         print("No start and / or end ID set, aborting.")
         quit()
 
-    for id in range(start_id, end_id+1):
-        try:
-            print(f"Parsing report {id}")
-            report = service.get_report_with_answers(id)
+    checkpoint = BackfillCheckpoint(checkpoint_path, start_id, end_id, checkpoint_every)
+    checkpoint.load()
+    pending_ids = checkpoint.pending_ids()
+
+    print(f"{end_id - start_id + 1 - len(pending_ids)} reports already settled according to {checkpoint_path}, "
+          f"{len(pending_ids)} remaining. Using {workers} workers at {reports_per_second} reports per second.")
+
+    try:
+        reports_data = ReportsDataIndex(service.get_raw_reports_data())
+    except HTTPError as e:
+        print(f"Could not fetch raw reports data, coordinates of reports without GPS data will be missing: {e}")
+        reports_data = ReportsDataIndex([])
+
+    rate_limiter = PerHostRateLimiter(reports_per_second, burst)
+    target_url = config.get("REPORTIT_API_ANSWER_URL")
+
+    def crawl_one(report_id: int, pre_fetched_page: Optional[str | Exception] = None) -> None:
+        if isinstance(pre_fetched_page, Exception):
+            raise pre_fetched_page
+
+        if pre_fetched_page is None:
+            rate_limiter.acquire(target_url)
+
+        log(f"Parsing report {report_id}")
+
+        fetched_photos: list[tuple[Report, str]] = []
+
+        # Sessions are not thread-safe, each item gets its own one within the worker thread
+        with session_maker() as session:
+            existing_report = report_repository.get_by_id(session, report_id)
+            report = service.get_report_with_answers(
+                report_id,
+                existing_report,
+                reports_data,
+                lambda report, base64_photo: fetched_photos.append((report, base64_photo)),
+                pre_fetched_page
+            )
             report.meta.do_tweet = False
             for answer in report.answers:
                 answer.meta.do_tweet = False
+
             if not dry_run:
-                report_repository.update_or_create(report)
-                answer_repository.update_or_create_all(report.answers)
-            if print_success:
-                print(report)
-            success.append(report.id)
-            sys.stdout.flush()
-            sleep(sleep_seconds)
-        except ReportNotFoundException as e:
-            print(f"Report with id {id} does not exist")
-            sys.stdout.flush()
-            non_existent_reports.append(id)
+                crawler.persist_changed_reports(session, [existing_report] if existing_report else [], [report])
+
+                # Also for unchanged reports, whose photo may have failed in a previous run. Existing ones are skipped.
+                for photo_report, base64_photo in fetched_photos:
+                    photo_future = photo_service.submit_base64_photo_if_not_downloaded_yet(
+                        photo_pool, photo_report.id, base64_photo
+                    )
+
+                    if photo_future:
+                        photo_futures[photo_future] = photo_report.id
+
+        if print_success:
+            log(str(report))
+
+    # Photos are decoded and resized in separate processes, so that they hold up neither the GIL nor the workers
+    photo_pool = photo_service.create_pool()
+    photo_futures: dict[Future, int] = {}
+
+    started_at = monotonic()
+
+    batch_size = fetch_concurrency * 10 if fetch_concurrency else max(1, len(pending_ids))
+    done_count = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for batch_start in range(0, len(pending_ids), batch_size):
+                batch = pending_ids[batch_start:batch_start + batch_size]
+                pages = asyncio.run(fetcher.fetch_many(batch, fetch_concurrency, rate_limiter)) if fetch_concurrency else {}
+                futures = {executor.submit(crawl_one, report_id, pages.get(report_id)): report_id for report_id in batch}
+
+                for future in as_completed(futures):
+                    report_id = futures[future]
+                    done_count += 1
+
+                    try:
+                        future.result()
+                        success.append(report_id)
+                        checkpoint.mark(report_id, "success")
+                    except ReportNotFoundException:
+                        log(f"Report with id {report_id} does not exist")
+                        non_existent_reports.append(report_id)
+                        checkpoint.mark(report_id, "not_found")
+                    except Exception as e:
+                        log(f"Failed parsing or saving report {report_id}: {e}")
+                        repository_errors.append([report_id, e])
+
+                    if done_count % 100 == 0:
+                        rate = done_count / (monotonic() - started_at)
+                        log(f"{done_count}/{len(pending_ids)} reports processed ({rate:.2f} reports per second)")
+        except KeyboardInterrupt:
+            print("Interrupted, cancelling pending reports and saving checkpoint ...")
+            executor.shutdown(wait=True, cancel_futures=True)
+        finally:
+            checkpoint.save()
+
+    if photo_futures:
+        log(f"Waiting for {len(photo_futures)} photos to be processed ...")
+
+    photo_errors = []
+
+    for future in as_completed(photo_futures):
+        try:
+            future.result()
         except Exception as e:
-            if not dry_run:
-                report_repository.session.rollback()
-            print(f"Failed parsing or saving report {id}: {e}")
-            sys.stdout.flush()
-            repository_errors.append([id, e])
+            photo_errors.append([photo_futures[future], e])
+
+    photo_pool.shutdown()
+
+    success.sort()
+    non_existent_reports.sort()
 
     print()
     print("=== SUMMARY ===")
@@ -65,11 +179,16 @@ def crawl_all(
     print(", ".join(map(str, non_existent_reports)))
     print()
 
-    print(f"{len(repository_errors)} failures:")
+    print(f"{len(repository_errors)} failures (will be retried when resuming from {checkpoint_path}):")
     for err in repository_errors:
         print(err)
     print()
 
+    print(f"{len(photo_errors)} photo failures:")
+    for err in photo_errors:
+        print(err)
+    print()
+
     print(f"{len(success)} successes:")
     print(", ".join(map(str, success)))
 
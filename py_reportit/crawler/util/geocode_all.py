@@ -1,71 +1,91 @@
 import sys
 
-from time import sleep
+from time import monotonic
 from dependency_injector.wiring import Provide, inject
+from sqlalchemy.orm import sessionmaker
 
 from py_reportit.shared.config.container import run_with_container
-from py_reportit.shared.model.report import Report
-from py_reportit.shared.model.meta import Meta
 from py_reportit.shared.config import config
-from py_reportit.crawler.service.geocoder import GeocoderService
+from py_reportit.crawler.service.geocoding_engine import GeocodingEngine
+from py_reportit.shared.repository.meta import MetaRepository
 from py_reportit.shared.repository.report import ReportRepository
-from py_reportit.crawler.post_processors.geocode_pp import Geocode
 
 @inject
 def geocode_all(
     config: dict = Provide["config"],
-    geocoder_service: GeocoderService = Provide["geocoder_service"],
+    geocoding_engine: GeocodingEngine = Provide["geocoding_engine"],
     report_repository: ReportRepository = Provide["report_repository"],
-    geocode_pp: Geocode = Provide["geocode_pp"]
+    meta_repository: MetaRepository = Provide["meta_repository"],
+    session_maker: sessionmaker = Provide["sessionmaker"],
 ):
     success = []
-    repository_errors = []
+    geocode_errors = []
 
     start_id = int(config.get("START", -1))
     end_id = int(config.get("END", -1))
     only_missing_addresses = bool(int(config.get("ONLY_MISSING", 0)))
     print_success = bool(int(config.get("PRINT_SUCCESS", 0)))
-
-    sleep_seconds = float(config.get("GEOCODE_DELAY_SECONDS", 0.5))
+    chunk_size = int(config.get("GEOCODE_ALL_CHUNK_SIZE", 500))
 
     if start_id < 0 or end_id < 0:
         print("No start and / or end ID set, aborting.")
         quit()
 
-    filter_criteria = [Report.id >= start_id, Report.id <= end_id, Report.meta.has(Meta.address_polled==False)] if only_missing_addresses else [Report.id >= start_id, Report.id <= end_id]
-    reports = report_repository.get_by(*filter_criteria)
-
-    for report in reports:
-        id = report.id
-        if not report.latitude or not report.longitude:
-            print(f"Report {id} has no coordinates, skipping")
-            continue
-        try:
-            print(f"Geocoding report {id}")
-            print(geocoder_service.get_neighbourhood_and_street(report.latitude, report.longitude))
-            geocode_pp.process_report(report)
-
-            if print_success:
-                print(report)
-            success.append(report.id)
-            sys.stdout.flush()
-        except Exception as e:
-            report_repository.session.rollback()
-            print(f"Failed parsing or saving report {id}: {e}")
+    with session_maker() as session:
+        coordinates = report_repository.get_coordinates_in_range(session, start_id, end_id, only_missing_addresses)
+
+        # Sorted by cell, so that reports sharing a cell end up in the same chunk and the cell is resolved once
+        coordinates = sorted(coordinates, key=lambda row: geocoding_engine.get_cell_id(row.latitude, row.longitude))
+        cell_count = len({geocoding_engine.get_cell_id(row.latitude, row.longitude) for row in coordinates})
+
+        print(f"Geocoding {len(coordinates)} reports with coordinates in {cell_count} distinct cells, "
+              f"in chunks of {chunk_size} reports")
+
+        started_at = monotonic()
+
+        for chunk_start in range(0, len(coordinates), chunk_size):
+            chunk = coordinates[chunk_start:chunk_start + chunk_size]
+            cell_ids = [geocoding_engine.get_cell_id(row.latitude, row.longitude) for row in chunk]
+            coordinates_by_cell = {cell_id: (row.latitude, row.longitude) for cell_id, row in zip(cell_ids, chunk)}
+
+            results = geocoding_engine.resolve_cells(session, coordinates_by_cell)
+            address_rows = []
+            chunk_success = []
+            chunk_errors = []
+
+            for cell_id, row in zip(cell_ids, chunk):
+                if isinstance(results[cell_id], Exception):
+                    chunk_errors.append([row.report_id, results[cell_id]])
+                else:
+                    address_rows.append({"id": row.id, **geocoding_engine.get_address_values(results[cell_id])})
+                    chunk_success.append(row.report_id)
+
+            try:
+                # Resolved cells and addresses of a chunk are committed together
+                meta_repository.update_many_by_id(session, address_rows)
+                success.extend(chunk_success)
+                geocode_errors.extend(chunk_errors)
+            except Exception as e:
+                session.rollback()
+                print(f"Failed saving chunk starting at report {chunk[0].report_id}: {e}")
+                geocode_errors.extend([row.report_id, e] for row in chunk)
+
+            processed = chunk_start + len(chunk)
+            elapsed = max(monotonic() - started_at, 1e-6)
+            print(f"{processed}/{len(coordinates)} reports processed, {len(geocode_errors)} failures "
+                  f"({processed / elapsed:.1f} reports per second)")
             sys.stdout.flush()
-            repository_errors.append([id, e])
-        finally:
-            sleep(sleep_seconds)
 
     print()
     print("=== SUMMARY ===")
-    print(f"{len(repository_errors)} failures:")
-    for err in repository_errors:
+    print(f"{len(geocode_errors)} failures:")
+    for err in geocode_errors:
         print(err)
     print()
 
-    print(f"{len(success)} successes:")
-    print(", ".join(map(str, success)))
+    print(f"{len(success)} successes")
+    if print_success:
+        print(", ".join(map(str, sorted(success))))
 
     print("=== FINISHED ===")
 
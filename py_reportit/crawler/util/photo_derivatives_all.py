@@ -0,0 +1,59 @@
+import re
+
+from concurrent.futures import as_completed
+from os import listdir
+from dependency_injector.wiring import Provide, inject
+
+from py_reportit.shared.config.container import run_with_container
+from py_reportit.shared.config import config
+from py_reportit.crawler.service.photo import PhotoService
+
+FULL_SIZE_PHOTO_REGEX = re.compile(r"^(\d+)\.jpg$")
+
+@inject
+def photo_derivatives_all(photo_service: PhotoService = Provide["photo_service"]):
+    success = []
+    errors = []
+
+    report_ids = sorted(
+        int(match.group(1)) for match in map(FULL_SIZE_PHOTO_REGEX.match, listdir(photo_service.folder)) if match
+    )
+
+    print(f"Found {len(report_ids)} photos in {photo_service.folder}, generating missing derivatives "
+          f"using {photo_service.workers} workers")
+
+    with photo_service.create_pool() as pool:
+        futures = {}
+
+        for report_id in report_ids:
+            future = photo_service.submit_missing_derivatives(pool, report_id)
+
+            if future:
+                futures[future] = report_id
+
+        print(f"{len(report_ids) - len(futures)} photos already have all derivatives")
+
+        for future in as_completed(futures):
+            try:
+                future.result()
+                success.append(futures[future])
+            except Exception as e:
+                print(f"Failed generating derivatives for report {futures[future]}: {e}")
+                errors.append([futures[future], e])
+
+    print()
+    print("=== SUMMARY ===")
+    print(f"{len(errors)} failures:")
+    for err in errors:
+        print(err)
+    print()
+
+    print(f"{len(success)} successes:")
+    print(", ".join(map(str, sorted(success))))
+
+    print("=== FINISHED ===")
+
+if __name__ == "__main__":
+    run_with_container(config, lambda: photo_derivatives_all())
+else:
+    print("Main module was imported, but is meant to run as standalone")
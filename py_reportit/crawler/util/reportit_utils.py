@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import re
 import pytz
 
@@ -7,6 +8,7 @@ from textwrap import TextWrapper
 from typing import Callable, Optional
 from unicodedata import normalize
 from datetime import datetime
+from hashlib import sha256
 from random import uniform
 from arrow import Arrow
 from math import ceil, floor
@@ -29,22 +31,72 @@ def extract_ids(reports: list[Report]) -> list[int]:
 def filter_reports_by_state(reports: list[Report], finished: bool) -> list[Report]:
     return list(filter(lambda report: report.status == 'finished' if finished else 'accepted', reports))
 
+def report_content_hash(report: Report) -> str:
+    """
+    Stable fingerprint of the crawled content of a report, ie its title, description, status, creation date, photo
+    flag, position and answers. Coordinates are rounded to the precision they are stored with.
+    """
+    answers = sorted(report.answers or [], key=lambda answer: answer.order)
+    round_coordinate = lambda coordinate: round(float(coordinate), 6) if coordinate is not None else None
+
+    content = [
+        report.title,
+        report.description,
+        report.status,
+        report.created_at,
+        bool(report.has_photo),
+        round_coordinate(report.latitude),
+        round_coordinate(report.longitude),
+        [[answer.order, answer.author, answer.created_at, bool(answer.closing), answer.text] for answer in answers]
+    ]
+
+    return sha256(json.dumps(content, default=str, ensure_ascii=False).encode("utf-8")).hexdigest()
+
 def only_alphas(value: str) -> str:
     return ''.join(filter(str.isalpha, value))
 
-def find_in_reports_data(title: Optional[str], description: Optional[str], reports_data: list[dict]) -> Optional[dict]:
-    def is_match(report_data: dict):
-        return only_alphas(report_data.get("title")) == only_alphas(title) \
-            and only_alphas(report_data.get("description")) == only_alphas(description)
-    
-    return next(filter(is_match, reports_data), None)
-
-def is_last_in_reports_data(report: Report, reports_data: list[dict]) -> bool:
-    try:
-        return bool(find_in_reports_data(report.title, report.description, [reports_data[-1]]))
-    except IndexError:
+def reports_data_key(title: Optional[str], description: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    return (
+        only_alphas(title) if title is not None else None,
+        only_alphas(description) if description is not None else None
+    )
+
+class ReportsDataIndex:
+    """Normalized (title, description) lookup over the raw reports data, keeping the first entry for each key."""
+
+    def __init__(self, reports_data: list[dict]):
+        self.reports_data = reports_data
+        self.index: dict[tuple[Optional[str], Optional[str]], dict] = {}
+
+        for report_data in reports_data:
+            self.index.setdefault(reports_data_key(report_data.get("title"), report_data.get("description")), report_data)
+
+    def find(self, title: Optional[str], description: Optional[str]) -> Optional[dict]:
+        return self.index.get(reports_data_key(title, description))
+
+    def __len__(self) -> int:
+        return len(self.reports_data)
+
+def find_in_reports_data(
+        title: Optional[str],
+        description: Optional[str],
+        reports_data: list[dict] | ReportsDataIndex
+) -> Optional[dict]:
+    if isinstance(reports_data, ReportsDataIndex):
+        return reports_data.find(title, description)
+
+    key = reports_data_key(title, description)
+
+    return next(filter(lambda report_data: reports_data_key(report_data.get("title"), report_data.get("description")) == key, reports_data), None)
+
+def is_last_in_reports_data(report: Report, reports_data: list[dict] | ReportsDataIndex) -> bool:
+    raw_reports_data = reports_data.reports_data if isinstance(reports_data, ReportsDataIndex) else reports_data
+
+    if not raw_reports_data:
         return False
 
+    return bool(find_in_reports_data(report.title, report.description, [raw_reports_data[-1]]))
+
 def get_last_tweet_id(report: Report) -> str:
     if report.answers and len(report.answers):
         all_answers: list[ReportAnswer] = report.answers
@@ -0,0 +1,103 @@
+import httpx
+import logging
+import requests
+
+from string import Template
+from time import monotonic
+from typing import Optional
+from urllib.parse import urlparse
+
+from py_reportit.shared.config.requests_session import UpstreamGuard, get_random_scraper_api_from_config, \
+    get_scraper_base_url_and_params
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class AsyncCrawlerClient:
+    """
+    Asynchronous counterpart of the crawler's requests session, with the same scraper API rewrite, proxy settings,
+    upstream pacing and circuit breaking, and retries of failed connections and 429 / 5xx responses.
+    Meant to be used as an async context manager.
+    """
+
+    RETRIES = 3
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+            self,
+            config: dict,
+            client: Optional[httpx.AsyncClient] = None,
+            upstream_guard: Optional[UpstreamGuard] = None,
+    ):
+        self.config = config
+        self.use_scraper_api = bool(int(config.get("USE_SCRAPER_API", 0)))
+        self.client = client or self.build_client(config)
+        self.upstream_guard = upstream_guard or UpstreamGuard(config)
+
+    @classmethod
+    def build_client(cls, config: dict) -> httpx.AsyncClient:
+        proxy_url = None
+
+        if int(config.get("USE_PROXY", 0)):
+            logger.debug("Setting proxy and disabling SSL cert verification ...")
+            proxy_url = Template(config.get("PROXY_URL")).substitute({
+                "PROXY_SCHEME": config.get("PROXY_SCHEME"),
+                "PROXY_USER": config.get("PROXY_USER"),
+                "PROXY_PASS": config.get("PROXY_PASS"),
+                "PROXY_HOST": config.get("PROXY_HOST"),
+                "PROXY_PORT": config.get("PROXY_PORT"),
+            })
+
+        timeout = config.get("FETCH_REPORTS_TIMEOUT_SECONDS")
+
+        return httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(retries=cls.RETRIES, proxy=proxy_url, verify=proxy_url is None),
+            timeout=int(timeout) if timeout else None,
+            follow_redirects=True,
+            # Randomized per process by requests_random_user_agent, like the requests session's
+            headers={"User-Agent": requests.utils.default_user_agent()},
+        )
+
+    def get_upstream_url_and_request_args(self, url: str, params: dict) -> tuple[str, str, dict]:
+        if not self.use_scraper_api:
+            return url, url, params
+
+        scraper_api_url = get_random_scraper_api_from_config(self.config, self.upstream_guard)
+        scraper_args = get_scraper_base_url_and_params(url, params, urlparse(scraper_api_url))
+
+        return scraper_api_url, scraper_args.get("base_url"), scraper_args.get("params")
+
+    async def request(self, method: str, url: str, params: dict, **kwargs) -> httpx.Response:
+        for attempt in range(self.RETRIES + 1):
+            upstream_url, request_url, request_params = self.get_upstream_url_and_request_args(url, params)
+            upstream = self.upstream_guard.before_request(upstream_url)
+            await upstream.token_bucket.acquire_async()
+            started_at = monotonic()
+
+            try:
+                response = await self.client.request(method, request_url, params=request_params, **kwargs)
+            except httpx.HTTPError:
+                self.upstream_guard.after_request(upstream, None)
+                raise
+
+            self.upstream_guard.after_request(upstream, response.status_code, monotonic() - started_at)
+
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.RETRIES:
+                return response
+
+            logger.debug(f"{method} {url} returned {response.status_code}, retrying ...")
+
+    async def crawler_get(self, url: str, params={}, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, params, **kwargs)
+
+    async def crawler_post(self, url: str, data=None, params={}, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, params, data=data, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncCrawlerClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
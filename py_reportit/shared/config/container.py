@@ -1,10 +1,12 @@
+from typing import Any, Callable
+
 from dependency_injector import containers, providers
 
 from pytz import timezone as pytz_timezone
 
 from py_reportit.shared.config import config
 from py_reportit.shared.config.db import Database
-from py_reportit.shared.config.requests_session import get_requests_session
+from py_reportit.shared.config.requests_session import get_requests_session, get_upstream_guard
 from py_reportit.shared.repository.category import CategoryRepository
 from py_reportit.shared.repository.category_vote import CategoryVoteRepository
 from py_reportit.shared.repository.crawl import CrawlRepository
@@ -13,15 +15,25 @@ from py_reportit.shared.repository.report import ReportRepository
 from py_reportit.shared.repository.meta import MetaRepository
 from py_reportit.shared.repository.report_answer import ReportAnswerRepository
 from py_reportit.shared.repository.user import UserRepository
+from py_reportit.shared.repository.geocode_cell import GeocodeCellRepository
 from py_reportit.crawler.service.crawler import CrawlerService
 from py_reportit.crawler.service.reportit_api import ReportItService
+from py_reportit.crawler.service.nonce import NonceService
+from py_reportit.crawler.service.report_fetcher import AsyncReportFetcher
+from py_reportit.crawler.service.report_page_parser import SoupReportPageParser
 from py_reportit.crawler.service.geocoder import GeocoderService
+from py_reportit.crawler.service.geocoding_engine import GeocodingEngine
+from py_reportit.crawler.service.offline_geocoder import OfflineReverseGeocoder
 from py_reportit.crawler.service.photo import PhotoService
+from py_reportit.crawler.service.snapshot import SnapshotService
 from py_reportit.crawler.post_processors.abstract_pp import PostProcessorDispatcher
 from py_reportit.crawler.post_processors.twitter_pp import Twitter
 from py_reportit.crawler.post_processors.geocode_pp import Geocode
 from py_reportit.shared.service.vote_service import VoteService
-from py_reportit.shared.service.cache_service import CacheService
+from py_reportit.shared.service.vote_candidate_service import VoteCandidateService
+from py_reportit.shared.service.cache_service import build_cache_service
+from py_reportit.shared.service.report_count_service import ReportCountService
+from py_reportit.shared.service.response_cache_service import ResponseCacheService
 
 
 post_processors = [Geocode, Twitter]
@@ -37,12 +49,18 @@ class Container(containers.DeclarativeContainer):
         db_host=config.DB_HOST,
         db_port=config.DB_PORT,
         db_database=config.DB_DATABASE,
-        log_db=config.LOG_DB
+        log_db=config.LOG_DB,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING
     )
 
     sessionmaker = providers.Singleton(db.provided.sqlalchemy_sessionmaker)
 
-    requests_session = providers.Resource(get_requests_session, config=config)
+    upstream_guard = providers.Resource(get_upstream_guard, config=config)
+    requests_session = providers.Resource(get_requests_session, config=config, upstream_guard=upstream_guard)
 
     timezone = providers.Factory(pytz_timezone, zone=config.TIMEZONE)
 
@@ -55,24 +73,58 @@ class Container(containers.DeclarativeContainer):
     category_repository = providers.Factory(CategoryRepository)
     category_vote_repository = providers.Factory(CategoryVoteRepository)
     user_repository = providers.Factory(UserRepository)
+    geocode_cell_repository = providers.Factory(GeocodeCellRepository)
 
     # Services
-    cache_service = providers.Singleton(CacheService)
+    cache_service = providers.Singleton(build_cache_service, config=config)
+    report_count_service = providers.Factory(
+        ReportCountService,
+        config=config,
+        cache_service=cache_service,
+        report_repository=report_repository
+    )
+    response_cache_service = providers.Factory(ResponseCacheService, config=config, cache_service=cache_service)
+    report_page_parser = providers.Singleton(SoupReportPageParser, features=config.REPORT_PARSER_BACKEND)
+    nonce_service = providers.Factory(NonceService, config=config, cache_service=cache_service)
     reportit_service = providers.Factory(
         ReportItService,
         config=config,
         requests_session=requests_session,
-        cache_service=cache_service
+        report_page_parser=report_page_parser,
+        nonce_service=nonce_service
+    )
+    async_report_fetcher = providers.Factory(
+        AsyncReportFetcher,
+        config=config,
+        reportit_service=reportit_service,
+        nonce_service=nonce_service,
+        upstream_guard=upstream_guard
+    )
+    # Loaded once per process, as building the index takes a while
+    offline_geocoder = providers.Singleton(OfflineReverseGeocoder.from_config, config=config)
+    geocoder_service = providers.Factory(
+        GeocoderService,
+        config=config,
+        requests_session=requests_session,
+        offline_geocoder=offline_geocoder
+    )
+    geocoding_engine = providers.Factory(
+        GeocodingEngine,
+        config=config,
+        geocoder_service=geocoder_service,
+        geocode_cell_repository=geocode_cell_repository
     )
-    geocoder_service = providers.Factory(GeocoderService, config=config, requests_session=requests_session)
     photo_service = providers.Factory(PhotoService, config=config)
+    snapshot_service = providers.Factory(SnapshotService, config=config)
     vote_service = providers.Factory(
         VoteService,
         config=config,
         meta_repository=meta_repository,
         category_vote_repository=category_vote_repository,
-        category_repository=category_repository
+        category_repository=category_repository,
+        report_count_service=report_count_service
     )
+    vote_candidate_service = providers.Factory(VoteCandidateService, meta_repository=meta_repository)
 
     # Helper function to work around scope limitations with class variables and list comprehension
     # see https://stackoverflow.com/questions/13905741/accessing-class-variables-from-a-list-comprehension-in-the-class-definition
@@ -80,6 +132,7 @@ class Container(containers.DeclarativeContainer):
         config,
         reportit_service,
         geocoder_service,
+        geocoding_engine,
         report_repository,
         meta_repository,
         report_answer_repository,
@@ -89,6 +142,7 @@ class Container(containers.DeclarativeContainer):
             config=config,
             api_service=reportit_service,
             geocoder_service=geocoder_service,
+            geocoding_engine=geocoding_engine,
             report_repository=report_repository,
             meta_repository=meta_repository,
             report_answer_repository=report_answer_repository,
@@ -102,6 +156,7 @@ class Container(containers.DeclarativeContainer):
                 config=config,
                 reportit_service=reportit_service,
                 geocoder_service=geocoder_service,
+                geocoding_engine=geocoding_engine,
                 report_repository=report_repository,
                 meta_repository=meta_repository,
                 report_answer_repository=report_answer_repository,
@@ -115,6 +170,7 @@ class Container(containers.DeclarativeContainer):
         config=config,
         api_service=reportit_service,
         geocoder_service=geocoder_service,
+        geocoding_engine=geocoding_engine,
         report_repository=report_repository,
         meta_repository=meta_repository,
         report_answer_repository=report_answer_repository,
@@ -130,6 +186,7 @@ class Container(containers.DeclarativeContainer):
         report_answer_repository=report_answer_repository,
         crawl_repository=crawl_repository,
         crawl_item_repository=crawl_item_repository,
+        cache_service=cache_service,
         timezone=timezone
     )
 
@@ -141,3 +198,16 @@ def build_container_for_crawler() -> Container:
     container.wire(modules=["__main__", ".py_reportit", ".celery.tasks"], from_package="py_reportit.crawler")
 
     return container
+
+def run_with_container(config: dict, runnable: Callable[[], Any]) -> Any:
+    """Wires a fresh container into the calling script's __main__ module and runs the given callable with it."""
+    container = Container()
+
+    container.config.from_dict(config)
+
+    container.wire(modules=["__main__"])
+
+    try:
+        return runnable()
+    finally:
+        container.shutdown_resources()
@@ -1,6 +1,7 @@
 import logging
+import os
 
-from typing import Iterable
+from typing import Iterable, Optional
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker as sqlalchemy_sessionmaker
 from sqlalchemy.orm.session import Session
@@ -9,11 +10,48 @@ logger = logging.getLogger(f"py_reportit.{__name__}")
 
 class Database:
 
-    def __init__(self, log_db, **kwargs):
+    DEFAULT_POOL_SIZE = 5
+    DEFAULT_MAX_OVERFLOW = 10
+    DEFAULT_POOL_TIMEOUT = 30
+    DEFAULT_POOL_RECYCLE = 400
+
+    def __init__(
+            self,
+            log_db,
+            pool_size: Optional[int] = None,
+            max_overflow: Optional[int] = None,
+            pool_timeout: Optional[int] = None,
+            pool_recycle: Optional[int] = None,
+            pool_pre_ping: Optional[bool] = None,
+            **kwargs
+    ):
         self.db_url = self.get_db_url(**kwargs)
-        self.engine = create_engine(self.db_url, pool_recycle=400, echo=int(log_db), future=True)
+        self.engine = create_engine(
+            self.db_url,
+            pool_size=self.int_or_default(pool_size, self.DEFAULT_POOL_SIZE),
+            max_overflow=self.int_or_default(max_overflow, self.DEFAULT_MAX_OVERFLOW),
+            pool_timeout=self.int_or_default(pool_timeout, self.DEFAULT_POOL_TIMEOUT),
+            pool_recycle=self.int_or_default(pool_recycle, self.DEFAULT_POOL_RECYCLE),
+            # Checks connections on checkout, so connections killed by a database restart are replaced transparently
+            pool_pre_ping=bool(self.int_or_default(pool_pre_ping, 1)),
+            echo=int(log_db),
+            future=True
+        )
         self.sqlalchemy_sessionmaker = sqlalchemy_sessionmaker(self.engine)
 
+        # Connections must never be shared between processes, eg celery's prefork pool workers
+        os.register_at_fork(after_in_child=self.dispose_pool_after_fork)
+
+    def dispose_pool_after_fork(self) -> None:
+        """Drops the pooled connections inherited from the parent process without closing them for the parent."""
+        logger.debug(f"Resetting database connection pool in forked process {os.getpid()}")
+        self.engine.dispose(close=False)
+
+    @staticmethod
+    def int_or_default(value, default: int) -> int:
+        # Unset config values arrive as None or empty strings
+        return int(value) if value not in (None, "") else default
+
     @staticmethod
     def get_db_url(db_user, db_password, db_host, db_port, db_database) -> str:
         return f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_database}?charset=utf8mb4"
@@ -1,13 +1,20 @@
 import requests
 import logging
+import threading
 
-from typing import Iterable
+from typing import Callable, Iterable, Optional
+from requests.models import Response
 from requests.sessions import Session
 from string import Template
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse, parse_qs, ParseResult
 from random import choice
+from time import monotonic, sleep
+
+from py_reportit.shared.config.scraper_endpoint_pool import ScraperEndpointPool, ScraperEndpointProber
+from py_reportit.shared.util.circuit_breaker import CircuitBreaker, CircuitOpenException
+from py_reportit.shared.util.rate_limiter import TokenBucket
 
 logger = logging.getLogger(f"py_reportit.{__name__}")
 
@@ -19,19 +26,175 @@ retry_strategy = Retry(
 
 adapter = HTTPAdapter(max_retries=retry_strategy)
 
-def get_requests_session(config: dict) -> Iterable[Session]:
+class Upstream:
+    """A scraper API endpoint or a target host, with its own request pacing and circuit breaker."""
+
+    def __init__(self, name: str, token_bucket: TokenBucket, circuit_breaker: CircuitBreaker):
+        self.name = name
+        self.token_bucket = token_bucket
+        self.circuit_breaker = circuit_breaker
+
+    @property
+    def health(self) -> float:
+        """1 for healthy upstreams, decreasing with consecutive failures, 0 while they are not available."""
+        if not self.circuit_breaker.is_available():
+            return 0
+
+        return 1 / (1 + self.circuit_breaker.consecutive_failures)
+
+
+class UpstreamGuard:
+    """
+    Paces crawler requests per upstream, which is the entry of SCRAPER_API_BASE_URLS in use or else the target host,
+    and stops sending requests to upstreams whose circuit breaker opened after repeated failures.
+    Scraper API endpoints are picked by the scraper endpoint pool among those whose circuit is not open, and probed in
+    the background between start_probing and stop_probing.
+    """
+
+    FAILURE_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, config: dict, clock: Callable[[], float] = monotonic, sleeper: Callable[[float], None] = sleep):
+        self.scraper_endpoint_pool = ScraperEndpointPool.from_config(config, lambda url: self.get_upstream(url).health)
+        self.scraper_api_base_urls = self.scraper_endpoint_pool.base_urls
+        self.requests_per_second = float(config.get("CRAWLER_REQUESTS_PER_SECOND") or 5)
+        self.burst = int(config.get("CRAWLER_REQUESTS_BURST") or 5)
+        self.failure_threshold = int(config.get("CIRCUIT_BREAKER_FAILURE_THRESHOLD") or 5)
+        self.reset_seconds = float(config.get("CIRCUIT_BREAKER_RESET_SECONDS") or 60)
+        self.clock = clock
+        self.sleeper = sleeper
+        self.upstreams: dict[str, Upstream] = {}
+        self.lock = threading.Lock()
+        self.config = config
+        self.scraper_endpoint_prober: Optional[ScraperEndpointProber] = None
+        self.probe_session: Optional[Session] = None
+
+    def get_upstream(self, url: str) -> Upstream:
+        name = url if url in self.scraper_api_base_urls else urlparse(url).netloc or url
+
+        with self.lock:
+            if name not in self.upstreams:
+                self.upstreams[name] = Upstream(
+                    name,
+                    TokenBucket(self.requests_per_second, self.burst, clock=self.clock, sleeper=self.sleeper),
+                    CircuitBreaker(self.failure_threshold, self.reset_seconds, clock=self.clock),
+                )
+
+            return self.upstreams[name]
+
+    def choose_scraper_api(self) -> str:
+        scraper_api_url = self.scraper_endpoint_pool.choose()
+
+        if not scraper_api_url:
+            raise CircuitOpenException("No scraper API is available, all circuits are open")
+
+        return scraper_api_url
+
+    def before_request(self, url: str) -> Upstream:
+        upstream = self.get_upstream(url)
+
+        if not upstream.circuit_breaker.allow_request():
+            raise CircuitOpenException(f"Circuit for {upstream.name} is open, not sending request")
+
+        return upstream
+
+    def after_request(self, upstream: Upstream, status_code: Optional[int], latency_seconds: Optional[float] = None) -> None:
+        """Records the outcome of a request, a missing status code meaning that no response was received."""
+        success = status_code is not None and status_code not in self.FAILURE_STATUSES
+
+        if success:
+            upstream.circuit_breaker.record_success()
+        else:
+            logger.debug(f"Request to {upstream.name} failed with status {status_code}")
+            upstream.circuit_breaker.record_failure()
+
+        if upstream.name in self.scraper_endpoint_pool:
+            self.scraper_endpoint_pool.record(upstream.name, latency_seconds, success, billable=status_code is not None)
+
+    def send_tracked(self, upstream: Upstream, send: Callable[[], Response]) -> Response:
+        upstream.token_bucket.acquire()
+        started_at = self.clock()
+
+        try:
+            response = send()
+        except requests.RequestException:
+            self.after_request(upstream, None)
+            raise
+
+        self.after_request(upstream, response.status_code, self.clock() - started_at)
+
+        return response
+
+    def send(self, url: str, send: Callable[[], Response]) -> Response:
+        return self.send_tracked(self.before_request(url), send)
+
+    def probe(self, scraper_api_url: str, send: Callable[[], Response]) -> Response:
+        """Sends a probe request through a scraper endpoint regardless of its circuit, which the outcome updates."""
+        return self.send_tracked(self.get_upstream(scraper_api_url), send)
+
+    def start_probing(self) -> None:
+        """
+        Starts probing the scraper endpoints every SCRAPER_API_PROBE_INTERVAL_SECONDS, unless disabled or already
+        started. Probes use a session of their own, as requests sessions are not safe to share with the crawl's threads.
+        """
+        probe_interval_seconds = float(self.config.get("SCRAPER_API_PROBE_INTERVAL_SECONDS") or 0)
+
+        if not int(self.config.get("USE_SCRAPER_API", 0)) or probe_interval_seconds <= 0 or self.scraper_endpoint_prober:
+            return
+
+        probe_url = self.config.get("SCRAPER_API_PROBE_URL") or self.config.get("REPORTIT_API_URL")
+        probe_timeout = int(self.config.get("FETCH_REPORTS_TIMEOUT_SECONDS") or 30)
+
+        self.probe_session = requests.Session()
+        configure_transport(self.probe_session, self.config)
+
+        def probe(scraper_api_url: str) -> None:
+            scraper_args = get_scraper_base_url_and_params(probe_url, {}, urlparse(scraper_api_url))
+            self.probe(
+                scraper_api_url,
+                lambda: self.probe_session.get(url=scraper_args.get("base_url"), params=scraper_args.get("params"), timeout=probe_timeout)
+            )
+
+        self.scraper_endpoint_prober = ScraperEndpointProber(self.scraper_api_base_urls, probe, probe_interval_seconds)
+        self.scraper_endpoint_prober.start()
+
+    def stop_probing(self) -> None:
+        if not self.scraper_endpoint_prober:
+            return
+
+        self.scraper_endpoint_prober.stop()
+        self.scraper_endpoint_prober = None
+        self.probe_session.close()
+        self.probe_session = None
+
+        logger.info(f"Scraper endpoint statistics: {self.scraper_endpoint_pool.get_stats()}")
+
+def get_requests_session(config: dict, upstream_guard: Optional[UpstreamGuard] = None) -> Iterable[Session]:
+    upstream_guard = upstream_guard or UpstreamGuard(config)
+
     with requests.Session() as session:
         logger.debug("Opening requests-session")
 
         def crawler_get(self: requests.Session, url: str, params={}, **kwargs):
-            parsed_scraper_url = urlparse(get_random_scraper_api_from_config(config))
-            scraper_args = get_scraper_base_url_and_params(url, params, parsed_scraper_url)
-            return self.get(url=scraper_args.get("base_url"), params=scraper_args.get("params"), **kwargs)
+            scraper_api_url = get_random_scraper_api_from_config(config, upstream_guard)
+            scraper_args = get_scraper_base_url_and_params(url, params, urlparse(scraper_api_url))
+            return upstream_guard.send(
+                scraper_api_url,
+                lambda: self.get(url=scraper_args.get("base_url"), params=scraper_args.get("params"), **kwargs)
+            )
 
         def crawler_post(self: requests.Session, url: str, data=None, json=None, params={}, **kwargs):
-            parsed_scraper_url = urlparse(get_random_scraper_api_from_config(config))
-            scraper_args = get_scraper_base_url_and_params(url, params, parsed_scraper_url)
-            return self.post(url=scraper_args.get("base_url"), data=data, json=json, params=scraper_args.get("params"), **kwargs)
+            scraper_api_url = get_random_scraper_api_from_config(config, upstream_guard)
+            scraper_args = get_scraper_base_url_and_params(url, params, urlparse(scraper_api_url))
+            return upstream_guard.send(
+                scraper_api_url,
+                lambda: self.post(url=scraper_args.get("base_url"), data=data, json=json, params=scraper_args.get("params"), **kwargs)
+            )
+
+        def direct_get(self: requests.Session, url: str, params={}, **kwargs):
+            return upstream_guard.send(url, lambda: self.get(url, params=params, **kwargs))
+
+        def direct_post(self: requests.Session, url: str, data=None, json=None, **kwargs):
+            return upstream_guard.send(url, lambda: self.post(url, data=data, json=json, **kwargs))
 
         if int(config.get("USE_SCRAPER_API", 0)):
             logger.debug("Using Scraper API ...")
@@ -39,29 +202,45 @@ def get_requests_session(config: dict) -> Iterable[Session]:
             session.crawler_post = crawler_post.__get__(session, requests.Session)
         else:
             logger.debug("Not using Scraper API")
-            session.crawler_get = session.get
-            session.crawler_post = session.post
-
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-
-        if int(config.get("USE_PROXY", 0)):
-            logger.debug("Setting proxy and disabling SSL cert verification ...")
-            proxy_url = Template(config.get("PROXY_URL")).substitute({
-                "PROXY_SCHEME": config.get("PROXY_SCHEME"),
-                "PROXY_USER": config.get("PROXY_USER"),
-                "PROXY_PASS": config.get("PROXY_PASS"),
-                "PROXY_HOST": config.get("PROXY_HOST"),
-                "PROXY_PORT": config.get("PROXY_PORT"),
-            })
-            proxies = { "http": proxy_url, "https": proxy_url }
-            session.proxies.update(proxies)
-            session.verify = False
+            session.crawler_get = direct_get.__get__(session, requests.Session)
+            session.crawler_post = direct_post.__get__(session, requests.Session)
+
+        configure_transport(session, config)
 
         yield session
     logger.debug("Closing requests session")
 
-def get_random_scraper_api_from_config(config: dict) -> str:
+def configure_transport(session: Session, config: dict) -> None:
+    """Mounts the retrying adapter and, if USE_PROXY is set, routes the session through the configured proxy."""
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    if int(config.get("USE_PROXY", 0)):
+        logger.debug("Setting proxy and disabling SSL cert verification ...")
+        proxy_url = Template(config.get("PROXY_URL")).substitute({
+            "PROXY_SCHEME": config.get("PROXY_SCHEME"),
+            "PROXY_USER": config.get("PROXY_USER"),
+            "PROXY_PASS": config.get("PROXY_PASS"),
+            "PROXY_HOST": config.get("PROXY_HOST"),
+            "PROXY_PORT": config.get("PROXY_PORT"),
+        })
+        proxies = { "http": proxy_url, "https": proxy_url }
+        session.proxies.update(proxies)
+        session.verify = False
+
+def get_upstream_guard(config: dict) -> Iterable[UpstreamGuard]:
+    """Resource of the guard shared by all crawler sessions and clients, probing scraper endpoints while it lives."""
+    upstream_guard = UpstreamGuard(config)
+    upstream_guard.start_probing()
+
+    yield upstream_guard
+
+    upstream_guard.stop_probing()
+
+def get_random_scraper_api_from_config(config: dict, upstream_guard: Optional[UpstreamGuard] = None) -> str:
+    if upstream_guard:
+        return upstream_guard.choose_scraper_api()
+
     return choice(config.get('SCRAPER_API_BASE_URLS').split(","))
 
 def get_scraper_base_url_and_params(url: str, params: dict, parsed_scraper_url: ParseResult) -> dict:
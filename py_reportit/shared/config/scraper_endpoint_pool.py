@@ -0,0 +1,166 @@
+import logging
+import threading
+
+from enum import Enum
+from random import choice, choices
+from typing import Callable, Optional
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class SelectionPolicy(str, Enum):
+    WEIGHTED = "weighted"
+    LEAST_LATENCY = "least_latency"
+
+
+class EndpointStats:
+    """Exponentially weighted latency and error rate of an endpoint, along with its request count and spent cost."""
+
+    SMOOTHING = 0.3
+
+    def __init__(self, cost_per_request: float = 1):
+        self.cost_per_request = cost_per_request
+        self.latency_seconds: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.total_cost = 0.0
+
+    def record(self, latency_seconds: Optional[float], success: bool, billable: bool = True) -> None:
+        self.requests += 1
+        self.failures += 0 if success else 1
+        self.error_rate += self.SMOOTHING * ((0 if success else 1) - self.error_rate)
+
+        if billable:
+            self.total_cost += self.cost_per_request
+
+        # Latencies of failed requests say little about the endpoint's speed, timeouts would dominate them
+        if success and latency_seconds is not None:
+            if self.latency_seconds is None:
+                self.latency_seconds = latency_seconds
+            else:
+                self.latency_seconds += self.SMOOTHING * (latency_seconds - self.latency_seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "latency_seconds": self.latency_seconds,
+            "error_rate": self.error_rate,
+            "requests": self.requests,
+            "failures": self.failures,
+            "cost_per_request": self.cost_per_request,
+            "total_cost": self.total_cost,
+        }
+
+
+class ScraperEndpointPool:
+    """
+    The entries of SCRAPER_API_BASE_URLS, split once, with their latency, error rate and cost.
+    The weighted policy picks endpoints at random, favouring healthy, reliable, fast and cheap ones. The least latency
+    policy picks the fastest available endpoint, trying endpoints without latency samples first.
+    Endpoints with a health of 0, e.g. because their circuit is open, are never picked.
+    """
+
+    def __init__(
+            self,
+            base_urls: list[str],
+            get_health: Callable[[str], float],
+            costs: Optional[list[float]] = None,
+            policy: SelectionPolicy = SelectionPolicy.WEIGHTED,
+    ):
+        costs = costs or []
+        self.base_urls = base_urls
+        self.get_health = get_health
+        self.policy = policy
+        self.stats = {
+            url: EndpointStats(costs[index] if index < len(costs) else 1) for index, url in enumerate(base_urls)
+        }
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict, get_health: Callable[[str], float]) -> "ScraperEndpointPool":
+        base_urls = [url.strip() for url in (config.get("SCRAPER_API_BASE_URLS") or "").split(",") if url.strip()]
+        costs = [float(cost) for cost in (config.get("SCRAPER_API_COSTS") or "").split(",") if cost.strip()]
+        policy = SelectionPolicy((config.get("SCRAPER_API_SELECTION_POLICY") or SelectionPolicy.WEIGHTED.value).lower())
+
+        return cls(base_urls, get_health, costs, policy)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.stats
+
+    def record(self, url: str, latency_seconds: Optional[float], success: bool, billable: bool = True) -> None:
+        with self.lock:
+            self.stats[url].record(latency_seconds, success, billable)
+
+    def get_weight(self, url: str, health: float, typical_latency_seconds: float) -> float:
+        stats = self.stats[url]
+        latency_seconds = stats.latency_seconds if stats.latency_seconds is not None else typical_latency_seconds
+
+        # Floors keep endpoints with perfect statistics from monopolizing the traffic
+        return health * max(0.05, 1 - stats.error_rate) / (max(0.01, latency_seconds) * max(0.01, stats.cost_per_request))
+
+    def choose(self) -> Optional[str]:
+        """Returns the endpoint to use for the next request, or None if no endpoint is available."""
+        health = {url: self.get_health(url) for url in self.base_urls}
+        available = [url for url in self.base_urls if health[url] > 0]
+
+        if not available:
+            return None
+
+        with self.lock:
+            if self.policy == SelectionPolicy.LEAST_LATENCY:
+                untried = [url for url in available if self.stats[url].latency_seconds is None]
+
+                if untried:
+                    return choice(untried)
+
+                return min(available, key=lambda url: self.stats[url].latency_seconds)
+
+            latencies = [self.stats[url].latency_seconds for url in available if self.stats[url].latency_seconds is not None]
+            typical_latency_seconds = sum(latencies) / len(latencies) if latencies else 1
+
+            weights = [self.get_weight(url, health[url], typical_latency_seconds) for url in available]
+
+            return choices(available, weights)[0]
+
+    def get_stats(self) -> dict[str, dict]:
+        with self.lock:
+            return {url: {**stats.as_dict(), "health": self.get_health(url)} for url, stats in self.stats.items()}
+
+
+class ScraperEndpointProber:
+    """
+    Periodically sends a probe request through every scraper endpoint in a background thread, so that latencies stay
+    current and endpoints recover from an open circuit without a crawl request being spent on them.
+    `probe` sends the request and returns its outcome, see UpstreamGuard.probe.
+    """
+
+    def __init__(self, base_urls: list[str], probe: Callable[[str], None], interval_seconds: float):
+        self.base_urls = base_urls
+        self.probe = probe
+        self.interval_seconds = interval_seconds
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def probe_all(self) -> None:
+        for url in self.base_urls:
+            try:
+                self.probe(url)
+            except Exception as e:
+                logger.debug(f"Probing scraper endpoint {url} failed: {e}")
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval_seconds):
+            self.probe_all()
+
+    def start(self) -> None:
+        logger.debug(f"Probing scraper endpoints every {self.interval_seconds} seconds")
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name="scraper-endpoint-prober", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+        if self.thread:
+            self.thread.join(timeout=self.interval_seconds)
+            self.thread = None
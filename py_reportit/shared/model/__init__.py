@@ -11,5 +11,6 @@ __all__ = [
     "crawl",
     "category",
     "meta_category_vote",
-    "user"
+    "user",
+    "geocode_cell"
 ]
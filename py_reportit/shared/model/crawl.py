@@ -1,4 +1,4 @@
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy import Column, Integer, Numeric, Unicode, JSON, select, not_, exists
 
@@ -14,7 +14,8 @@ class Crawl(Base):
     id = Column(Integer, primary_key=True)
     scheduled_at = Column(LocalizedArrow, nullable=False)
     items = relationship("CrawlItem", cascade="save-update, merge, delete, delete-orphan", uselist=True, backref="crawl")
-    reports_data = Column(JSON, nullable=True)
+    # Potentially large, only loaded when a worker builds its reports data index
+    reports_data = deferred(Column(JSON, nullable=True))
     current_task_id = Column(Unicode(50), nullable=True)
 
     @hybrid_property
@@ -0,0 +1,17 @@
+from arrow import Arrow
+from sqlalchemy import Column, Integer, String
+
+from py_reportit.shared.model.orm_base import Base
+from py_reportit.shared.util.localized_arrow import LocalizedArrow
+
+
+class GeocodeCell(Base):
+    """Reverse geocoding result shared by all coordinates rounded to the same cell, see GeocodingEngine."""
+
+    __tablename__ = 'geocode_cell'
+
+    id = Column(String(40), primary_key=True)
+    street = Column(String(100))
+    postcode = Column(Integer)
+    neighbourhood = Column(String(100))
+    created_at = Column(LocalizedArrow, nullable=False, default=Arrow.now)
@@ -14,4 +14,4 @@ class MetaCategoryVote(Base):
     user_id = Column(UUIDType(binary=False), primary_key=True)
     category_id = Column(Integer, ForeignKey('category.id'), nullable=False)
     category = relationship("Category")
-    timestamp = Column(LocalizedArrow, default=Arrow.now(), nullable=False)
+    timestamp = Column(LocalizedArrow, default=Arrow.now, nullable=False)
@@ -1,6 +1,6 @@
-from typing import TypedDict
+from typing import Optional, TypedDict
 from sqlakeyset import Page
 
 class PageWithCount(TypedDict):
     page: Page
-    total_count: int
+    total_count: Optional[int]
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional, TypedDict
+
+
+class ParsedAnswer(TypedDict):
+    author: str
+    created_at: datetime
+    closing: bool
+    text: str
+
+class ParsedReportPage(TypedDict):
+    title: Optional[str]
+    description: Optional[str]
+    status: str
+    created_at: Optional[datetime]
+    latitude: Optional[str]
+    longitude: Optional[str]
+    has_photo: bool
+    base64_photo: Optional[str]
+    answers: list[ParsedAnswer]
@@ -2,7 +2,7 @@ from typing import Optional
 
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy import Column, Integer, String, Unicode, UnicodeText, Numeric, DateTime, SmallInteger, Boolean, select
+from sqlalchemy import Column, Integer, String, Unicode, UnicodeText, Numeric, DateTime, SmallInteger, Boolean, Index, select
 
 from py_reportit.shared.model.orm_base import Base
 from py_reportit.shared.model.report_answer import ReportAnswer
@@ -11,6 +11,7 @@ from py_reportit.shared.util.anonymiser import anonymise
 class Report(Base):
 
     __tablename__ = 'report'
+    __table_args__ = (Index('ft_report_title_description', 'title', 'description', mysql_prefix='FULLTEXT'),)
 
     id = Column(Integer, primary_key=True)
     title = Column(Unicode(255))
@@ -23,6 +24,7 @@ class Report(Base):
     key_category = Column(String(100))
     id_service = Column(SmallInteger)
     status = Column(Unicode(50))
+    content_hash = Column(String(64))
     answers = relationship("ReportAnswer", uselist=True, backref="report")
     meta = relationship("Meta", uselist=False, backref="report")
 
@@ -1,6 +1,6 @@
 from sqlalchemy.sql.sqltypes import Unicode
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, DateTime, Boolean, SmallInteger, Integer, UnicodeText, ForeignKey
+from sqlalchemy import Column, DateTime, Boolean, SmallInteger, Integer, UnicodeText, ForeignKey, UniqueConstraint, Index
 
 from py_reportit.shared.model.orm_base import Base
 from py_reportit.shared.util.anonymiser import anonymise
@@ -8,6 +8,10 @@ from py_reportit.shared.util.anonymiser import anonymise
 
 class ReportAnswer(Base):
     __tablename__ = 'report_answer'
+    __table_args__ = (
+        UniqueConstraint('report_id', 'order', name='uq_report_answer_report_id_order'),
+        Index('ft_report_answer_text', 'text', mysql_prefix='FULLTEXT'),
+    )
 
     id = Column(Integer, primary_key=True)
     report_id = Column(Integer, ForeignKey('report.id'), nullable=False)
@@ -0,0 +1,9 @@
+from typing import TypedDict
+
+from py_reportit.shared.model.report import Report
+
+
+class ReportChanges(TypedDict):
+    new: list[Report]
+    updated: list[Report]
+    unchanged: list[Report]
@@ -1,7 +1,9 @@
 from typing import Generic, Type, TypeVar
 from abc import ABC
 
-from sqlalchemy import select, update, Column, delete
+from sqlalchemy import select, update, Column, delete, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.query import Query
 from sqlalchemy.sql.expression import or_
@@ -17,6 +19,18 @@ class AbstractRepository(ABC, Generic[Model]):
 
     model: Type[Model] = None
 
+    # Columns identifying an existing row for upserts (must be backed by a unique constraint), and columns never
+    # written by upserts
+    upsert_key_columns: list[str] = ["id"]
+    upsert_excluded_columns: list[str] = []
+
+    def get_paged_load_options(self) -> list:
+        """
+        Loader options applied to paged queries, so that relationships needed for serialization are fetched per page
+        instead of lazily per entity. Built on demand, as building them configures all mappers.
+        """
+        return []
+
     def get_all(self, session: Session, offset=None, limit=None) -> list[Model]:
         with_offset = lambda statement: statement.offset(offset) if (offset and offset >= 0) else statement
         with_limit = lambda statement: statement.limit(limit) if (limit and limit > 0) else statement
@@ -27,9 +41,9 @@ class AbstractRepository(ABC, Generic[Model]):
 
     def build_filter_query(self, session: Session, by: Column = None, asc: bool = True, and_cond = None, or_cond = None) -> Query:
         # Using SQLAlchemy 1.x style select due to limitation of sqlakeyset
-        by_column = by if by else self.model.id
+        by_column = by if by is not None else self.model.id
         order_by = by_column.asc() if asc else by_column.desc()
-        processed_order_by = [order_by, self.model.id.asc() if asc else self.model.id.desc()] if by_column != self.model.id else [order_by]
+        processed_order_by = [order_by, self.model.id.asc() if asc else self.model.id.desc()] if by_column is not self.model.id else [order_by]
         query = session.query(self.model).order_by(*processed_order_by)
 
         if and_cond and len(and_cond):
@@ -41,10 +55,29 @@ class AbstractRepository(ABC, Generic[Model]):
         return query
 
 
-    def get_paged(self, session: Session, page_size: int = 100, page=None, **filter_Args) -> PageWithCount:
+    def get_paged(self, session: Session, page_size: int = 100, page=None, with_count: bool = True, **filter_Args) -> PageWithCount:
         q = self.build_filter_query(session, **filter_Args)
 
-        return PageWithCount(page=get_page(q, per_page=page_size, page=page), total_count=q.count())
+        return PageWithCount(
+            page=get_page(q.options(*self.get_paged_load_options()), per_page=page_size, page=page),
+            total_count=q.count() if with_count else None
+        )
+
+    def count_filtered(self, session: Session, and_cond = None, or_cond = None) -> int:
+        return self.build_filter_query(session, and_cond=and_cond, or_cond=or_cond).order_by(None).count()
+
+    def get_estimated_row_count(self, session: Session) -> int:
+        """Row count from the table statistics where available, which may be off by some percent on InnoDB."""
+        if session.get_bind().dialect.name == "mysql":
+            estimate = session.execute(
+                text("SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"),
+                {"table_name": self.model.__tablename__}
+            ).scalar()
+
+            if estimate is not None:
+                return estimate
+
+        return self.count_by(session)
 
     def get_by_id(self, session: Session, id: int) -> Model:
         return session.execute(select(self.model).where(self.model.id==id)).scalar()
@@ -68,6 +101,40 @@ class AbstractRepository(ABC, Generic[Model]):
         for entity in entities:
             self.update_or_create(session, entity)
 
+    def to_upsert_row(self, entity: Model) -> dict:
+        return {
+            column: getattr(entity, column)
+            for column in self.model.__table__.columns.keys() if column not in self.upsert_excluded_columns
+        }
+
+    def build_upsert_statement(self, dialect_name: str, rows: list[dict]):
+        update_columns = [column for column in rows[0].keys() if column not in self.upsert_key_columns]
+
+        if dialect_name == "mysql":
+            statement = mysql_insert(self.model.__table__).values(rows)
+            return statement.on_duplicate_key_update({column: statement.inserted[column] for column in update_columns})
+
+        if dialect_name == "sqlite":
+            statement = sqlite_insert(self.model.__table__).values(rows)
+            return statement.on_conflict_do_update(
+                index_elements=self.upsert_key_columns,
+                set_={column: statement.excluded[column] for column in update_columns}
+            )
+
+        raise UpsertNotSupportedException(f"Upserts are not supported for dialect {dialect_name}")
+
+    def upsert_many(self, session: Session, entities: list[Model], commit: bool = True) -> None:
+        """Inserts or updates all given entities with a single statement. Relationships are not persisted."""
+        if not entities:
+            return
+
+        rows = list(map(self.to_upsert_row, entities))
+
+        session.execute(self.build_upsert_statement(session.get_bind().dialect.name, rows))
+
+        if commit:
+            session.commit()
+
     def create(self, session: Session, entity: Model) -> None:
         session.add(entity)
         session.commit()
@@ -88,6 +155,16 @@ class AbstractRepository(ABC, Generic[Model]):
         session.commit()
         return result.rowcount
 
+    def update_many_by_id(self, session: Session, rows: list[dict], commit: bool = True) -> None:
+        """Updates the given columns of many entities, each row holding the entity's id, in a single executemany."""
+        if not rows:
+            return
+
+        session.execute(update(self.model), rows)
+
+        if commit:
+            session.commit()
+
     def get_most_recent(self, session: Session) -> Model:
         return session.execute(select(self.model).filter(self.model.id == session.query(func.max(self.model.id)).scalar())).scalar()
 
@@ -104,3 +181,7 @@ class AbstractRepository(ABC, Generic[Model]):
             return sorted(entities, key=lambda entity: entity.id)
 
         return entities
+
+
+class UpsertNotSupportedException(Exception):
+    pass
@@ -1,4 +1,5 @@
-from sqlalchemy import select
+from typing import Optional
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -10,4 +11,21 @@ class CategoryVoteRepository(AbstractRepository[MetaCategoryVote]):
     model = MetaCategoryVote
 
     def get_for_meta_and_user_id(self, session: Session, meta_id: int, user_id: UUID) -> MetaCategoryVote:
-        return session.execute(select(MetaCategoryVote).where(MetaCategoryVote.meta_id==meta_id, MetaCategoryVote.user_id==user_id)).scalar()
\ No newline at end of file
+        return session.execute(select(MetaCategoryVote).where(MetaCategoryVote.meta_id==meta_id, MetaCategoryVote.user_id==user_id)).scalar()
+
+    def get_most_frequent_category_id(self, session: Session, meta_id: int, latest: int = 50) -> Optional[int]:
+        """Most voted category among the latest votes for a meta, ties going to the most recently voted one."""
+        latest_votes = (
+            select(MetaCategoryVote.category_id, MetaCategoryVote.timestamp)
+            .where(MetaCategoryVote.meta_id == meta_id)
+            .order_by(MetaCategoryVote.timestamp.desc())
+            .limit(latest)
+            .subquery()
+        )
+
+        return session.execute(
+            select(latest_votes.c.category_id)
+            .group_by(latest_votes.c.category_id)
+            .order_by(func.count().desc(), func.max(latest_votes.c.timestamp).desc())
+            .limit(1)
+        ).scalar()
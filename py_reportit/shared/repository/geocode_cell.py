@@ -0,0 +1,15 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from py_reportit.shared.repository.abstract_repository import AbstractRepository
+from py_reportit.shared.model.geocode_cell import GeocodeCell
+
+class GeocodeCellRepository(AbstractRepository[GeocodeCell]):
+
+    model = GeocodeCell
+
+    def get_by_ids(self, session: Session, ids: list[str]) -> dict[str, GeocodeCell]:
+        if not ids:
+            return {}
+
+        return {cell.id: cell for cell in session.execute(select(GeocodeCell).where(GeocodeCell.id.in_(ids))).scalars()}
@@ -1,14 +1,14 @@
 import logging
 
-from sqlalchemy import select, func
-from sqlalchemy.sql import not_
+from typing import Optional
+from sqlalchemy import select, func, insert, exists
 from sqlalchemy.orm import Session
-from random import choice
 from uuid import UUID
 
 from py_reportit.shared.repository.abstract_repository import AbstractRepository
 from py_reportit.shared.model.meta import Meta
 from py_reportit.shared.model.meta_category_vote import MetaCategoryVote
+from py_reportit.shared.model.report import Report
 
 
 logger = logging.getLogger(f"py_reportit.{__name__}")
@@ -20,20 +20,73 @@ class MetaRepository(AbstractRepository[Meta]):
     def get_for_report_id(self, session: Session, report_id: int) -> Meta:
         return session.execute(select(Meta).where(Meta.report_id==report_id)).scalar()
 
-    def get_random_among_lowest_votes(self, session: Session, user_id: UUID) -> Meta:
-        metas_with_zero_votes = self.get_by(session, Meta.vote_count == 0, not_(Meta.category_votes.any(MetaCategoryVote.user_id == user_id)))
+    def create_missing_for_reports(self, session: Session, reports: list[Report], commit: bool = True) -> None:
+        """Creates meta rows for persisted reports lacking one, taking over flags set on the given reports' metas."""
+        if not reports:
+            return
 
-        if metas_with_zero_votes and len(metas_with_zero_votes):
-            logger.debug(f"Returning random report meta with lowest votes (vote count: 0) for user {user_id}")
-            return choice(metas_with_zero_votes)
+        report_ids_with_meta = set(session.execute(
+            select(Meta.report_id).where(Meta.report_id.in_([report.id for report in reports]))
+        ).scalars().all())
 
-        lowest_vote_count = session.execute(select(func.min(Meta.vote_count)).where(not_(Meta.category_votes.any(MetaCategoryVote.user_id == user_id)))).scalar()
+        new_meta_rows = [
+            self.build_meta_row(report) for report in reports if report.id not in report_ids_with_meta
+        ]
 
-        if not lowest_vote_count:
-            logger.debug(f"No random report meta could be found user {user_id}, returning random choice ...")
+        if new_meta_rows:
+            session.execute(insert(Meta), new_meta_rows)
 
-            return session.execute(select(Meta).order_by(func.rand()).limit(1)).scalar()
+        if commit:
+            session.commit()
 
-        logger.debug(f"Returning random report meta among selection of vote count {lowest_vote_count} for user {user_id}")
+    @staticmethod
+    def build_meta_row(report: Report) -> dict:
+        row = {"report_id": report.id}
 
-        return choice(self.get_by(session, Meta.vote_count == lowest_vote_count, not_(Meta.category_votes.any(MetaCategoryVote.user_id == user_id))))
+        if report.meta:
+            for column in ["do_tweet", "closed_without_answer"]:
+                if getattr(report.meta, column) is not None:
+                    row[column] = getattr(report.meta, column)
+
+        return row
+
+    @staticmethod
+    def not_voted_by(user_id: Optional[UUID]) -> list:
+        # Anti-join resolved through category_vote's (meta_id, user_id) primary key
+        if user_id is None:
+            return []
+
+        return [~exists().where(MetaCategoryVote.meta_id == Meta.id, MetaCategoryVote.user_id == user_id)]
+
+    def get_lowest_vote_count(self, session: Session, user_id: Optional[UUID] = None) -> Optional[int]:
+        """Walks the vote count index upwards until the first meta the given user has not voted for yet."""
+        return session.execute(
+            select(Meta.vote_count)
+            .where(*self.not_voted_by(user_id))
+            .order_by(Meta.vote_count)
+            .limit(1)
+        ).scalar()
+
+    def get_id_range_for_vote_count(self, session: Session, vote_count: int) -> tuple[Optional[int], Optional[int]]:
+        min_id, max_id = session.execute(
+            select(func.min(Meta.id), func.max(Meta.id)).where(Meta.vote_count == vote_count)
+        ).one()
+
+        return min_id, max_id
+
+    def get_first_with_vote_count(
+            self,
+            session: Session,
+            vote_count: int,
+            user_id: Optional[UUID] = None,
+            from_id: Optional[int] = None,
+            before_id: Optional[int] = None,
+    ) -> Optional[Meta]:
+        query = select(Meta).where(Meta.vote_count == vote_count, *self.not_voted_by(user_id))
+
+        if from_id is not None:
+            query = query.where(Meta.id >= from_id)
+        if before_id is not None:
+            query = query.where(Meta.id < before_id)
+
+        return session.execute(query.order_by(Meta.id).limit(1)).scalar()
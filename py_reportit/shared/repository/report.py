@@ -1,6 +1,95 @@
+from typing import Iterator, Optional
+from sqlalchemy import select, ColumnElement
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session, selectinload
+
 from py_reportit.shared.repository.abstract_repository import AbstractRepository
+from py_reportit.shared.model.meta import Meta
 from py_reportit.shared.model.report import Report
+from py_reportit.shared.model.report_answer import ReportAnswer
+
+
+class RelevanceMatch(match):
+    """
+    MySQL's MATCH ... AGAINST, which can also be stringified without a MySQL dialect. sqlakeyset stringifies the
+    ordering columns of paged queries, which fails for the plain match construct.
+    """
+    stringify_dialect = "mysql"
+    inherit_cache = True
+
 
 class ReportRepository(AbstractRepository[Report]):
 
     model = Report
+
+    def get_paged_load_options(self) -> list:
+        # Everything touched by the report schema: answers with their metas (language), the service (derived from the
+        # answers) and the meta with its category
+        return [
+            selectinload(Report.answers).selectinload(ReportAnswer.meta),
+            selectinload(Report.meta).selectinload(Meta.category),
+        ]
+
+    def stream_all(self, session: Session, batch_size: int = 500, descending: bool = False) -> Iterator[Report]:
+        """
+        Yields all reports, paging through them by id and loading each batch with its relationships in buffered queries.
+        Unlike a server side cursor, this leaves MySQL free to run the relationship queries of a batch on the same
+        connection. Reports are only referenced weakly by the session, so memory stays constant as long as callers
+        drop them.
+        """
+        last_id = None
+
+        while True:
+            query = select(Report).options(*self.get_paged_load_options())
+
+            if last_id is not None:
+                query = query.where(Report.id < last_id if descending else Report.id > last_id)
+
+            batch = session.scalars(query.order_by(Report.id.desc() if descending else Report.id).limit(batch_size)).all()
+
+            yield from batch
+
+            if len(batch) < batch_size:
+                return
+
+            last_id = batch[-1].id
+
+    def get_coordinates_in_range(self, session: Session, start_id: int, end_id: int, only_unpolled: bool = False) -> list:
+        """Meta id, report id, latitude and longitude of reports in the id range having coordinates, as plain rows."""
+        where_clauses = [Report.id >= start_id, Report.id <= end_id, Report.latitude != None, Report.longitude != None]
+
+        if only_unpolled:
+            where_clauses.append(Meta.address_polled == False)
+
+        return session.execute(
+            select(Meta.id, Report.id.label("report_id"), Report.latitude, Report.longitude).join(Report.meta).where(*where_clauses).order_by(Report.id)
+        ).all()
+
+    @staticmethod
+    def supports_fulltext_search(session: Session) -> bool:
+        return session.get_bind().dialect.name == "mysql"
+
+    def build_search_conditions(self, session: Session, search_text: str) -> list:
+        """
+        Conditions of which any must hold for a report to match the search text in its title, description or answers.
+        Resolved through the fulltext indexes on MySQL, other databases fall back to substring matching.
+        """
+        if self.supports_fulltext_search(session):
+            return [
+                self.build_search_relevance(session, search_text),
+                Report.id.in_(select(ReportAnswer.report_id).where(match(ReportAnswer.text, against=search_text))),
+            ]
+
+        return [
+            Report.title.like(f'%{search_text}%'),
+            Report.description.like(f'%{search_text}%'),
+            Report.answers.any(ReportAnswer.text.like(f'%{search_text}%')),
+        ]
+
+    def build_search_relevance(self, session: Session, search_text: str) -> Optional[ColumnElement]:
+        """Relevance of a report's title and description for the search text, None if it can't be ranked."""
+        if self.supports_fulltext_search(session):
+            # Labelled, so that it can be used as ordering column of keyset paged queries
+            return RelevanceMatch(Report.title, Report.description, against=search_text).label("relevance")
+
+        return None
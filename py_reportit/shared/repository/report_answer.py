@@ -1,4 +1,4 @@
-from sqlalchemy import update, select
+from sqlalchemy import update, select, insert, tuple_
 from sqlalchemy.orm import Session
 
 from py_reportit.shared.repository.abstract_repository import AbstractRepository
@@ -9,6 +9,9 @@ class ReportAnswerRepository(AbstractRepository[ReportAnswer]):
 
     model = ReportAnswer
 
+    upsert_key_columns = ["report_id", "order"]
+    upsert_excluded_columns = ["id"]
+
     def update(self, session: Session, entity: ReportAnswer) -> int:
         result = session.execute(
             update(ReportAnswer)
@@ -24,3 +27,34 @@ class ReportAnswerRepository(AbstractRepository[ReportAnswer]):
 
     def get_services(self, session: Session) -> list[str]:
         return session.execute(select(ReportAnswer.author).order_by(ReportAnswer.author.asc()).distinct()).scalars().all()
+
+    def create_missing_metas(self, session: Session, answers: list[ReportAnswer], commit: bool = True) -> None:
+        """Creates meta rows for persisted answers lacking one, taking over flags set on the given answers' metas."""
+        if not answers:
+            return
+
+        answers_by_key = {(answer.report_id, answer.order): answer for answer in answers}
+
+        answers_without_meta = session.execute(
+            select(ReportAnswer.id, ReportAnswer.report_id, ReportAnswer.order)
+            .where(tuple_(ReportAnswer.report_id, ReportAnswer.order).in_(answers_by_key.keys()))
+            .where(~ReportAnswer.meta.has())
+        ).all()
+
+        if answers_without_meta:
+            session.execute(insert(ReportAnswerMeta), [
+                self.build_meta_row(answer_id, answers_by_key[(report_id, order)].meta)
+                for answer_id, report_id, order in answers_without_meta
+            ])
+
+        if commit:
+            session.commit()
+
+    @staticmethod
+    def build_meta_row(answer_id: int, meta: ReportAnswerMeta | None) -> dict:
+        row = {"report_answer_id": answer_id}
+
+        if meta and meta.do_tweet is not None:
+            row["do_tweet"] = meta.do_tweet
+
+        return row
@@ -1,17 +1,224 @@
-from typing import Optional
+import logging
+import pickle
+import threading
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+# Generation of everything derived from crawled report data, bumped by the crawler whenever it writes reports
+REPORT_DATA = "report_data"
+
+
+class CacheBackend(ABC):
+    """Storage of a CacheService. Keys arrive fully namespaced, values may be any picklable object."""
+
+    # Whether the stored values are visible to other processes, e.g. counters incremented by the crawler to the API
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def increment(self, key: str) -> int:
+        """Atomically increments an integer counter, starting at 0, and returns the new value."""
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Per-process LRU cache, evicting the least recently used entries beyond max_entries and expired ones on access.
+    Counters are kept apart from the entries and never evicted, so that generations and metrics do not reset.
+    """
+
+    def __init__(self, max_entries: int = 10000, clock: Callable[[], float] = monotonic):
+        self.max_entries = max(1, max_entries)
+        self.clock = clock
+        self.entries: OrderedDict[str, tuple[Optional[float], Any]] = OrderedDict()
+        self.counters: dict[str, int] = {}
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            if key in self.counters:
+                return self.counters[key]
+
+            entry = self.entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+
+            if expires_at is not None and expires_at <= self.clock():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        with self.lock:
+            self.counters.pop(key, None)
+            self.entries[key] = (self.clock() + ttl_seconds if ttl_seconds else None, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+            self.counters.pop(key, None)
+
+    def increment(self, key: str) -> int:
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+            return self.counters[key]
+
+    def __len__(self) -> int:
+        return len(self.entries) + len(self.counters)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared between processes, through any client implementing the redis-py API for get, set, delete and incr.
+    Values are pickled, counters are stored as plain integers so that Redis can increment them.
+    """
+
+    shared = True
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        try:
+            import redis
+        except ImportError as e:
+            raise CacheBackendException("The redis cache backend requires the redis package to be installed") from e
+
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Optional[Any]:
+        raw_value = self.client.get(key)
+
+        if raw_value is None:
+            return None
+
+        # Counters are not pickled
+        if raw_value.isdigit():
+            return int(raw_value)
+
+        return pickle.loads(raw_value)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        # Redis expiries have millisecond granularity at best, and 0 is not a valid expiry
+        self.client.set(key, pickle.dumps(value), px=max(1, int(ttl_seconds * 1000)) if ttl_seconds else None)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def increment(self, key: str) -> int:
+        return int(self.client.incr(key))
 
 
 class CacheService:
+    """
+    Namespaced cache on top of a pluggable backend, keeping hit and miss counts of the current process.
+    Namespaced views share the backend and the metrics of the cache they were created from.
+    """
+
+    def __init__(
+            self,
+            backend: Optional[CacheBackend] = None,
+            namespace: str = "py_reportit",
+            default_ttl_seconds: Optional[float] = None,
+            metrics: Optional[dict[str, int]] = None,
+    ):
+        self.backend = backend if backend is not None else InMemoryCacheBackend()
+        self.namespace = namespace
+        self.default_ttl_seconds = default_ttl_seconds
+        self.metrics = metrics if metrics is not None else {"hits": 0, "misses": 0, "sets": 0}
+        self.metrics_lock = threading.Lock()
+
+    def namespaced(self, name: str) -> "CacheService":
+        return CacheService(self.backend, f"{self.namespace}:{name}", self.default_ttl_seconds, self.metrics)
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.shared
 
-    def __init__(self):
-        self.cache = {}
+    def get_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
 
-    def set(self, key: str, value: any) -> None:
-        self.cache[key] = value
+    def count(self, metric: str) -> None:
+        with self.metrics_lock:
+            self.metrics[metric] += 1
+
+    def set(self, key: str, value: any, ttl_seconds: Optional[float] = None) -> None:
+        self.backend.set(self.get_key(key), value, ttl_seconds or self.default_ttl_seconds)
+        self.count("sets")
 
     def unset(self, key: str) -> None:
-        if key in self.cache:
-            del self.cache[key]
+        self.backend.delete(self.get_key(key))
 
     def get(self, key: str) -> Optional[any]:
-        return self.cache.get(key)
+        value = self.backend.get(self.get_key(key))
+        self.count("misses" if value is None else "hits")
+
+        return value
+
+    def get_counter(self, key: str) -> int:
+        # Bypasses the hit and miss metrics, counters are not cached values
+        return self.backend.get(self.get_key(key)) or 0
+
+    def increment(self, key: str) -> int:
+        return self.backend.increment(self.get_key(key))
+
+    def get_generation(self, name: str) -> int:
+        """Generations are meant to be part of cache keys, bumping one invalidates all entries keyed by it."""
+        return self.get_counter(f"generation:{name}")
+
+    def bump_generation(self, name: str) -> None:
+        self.increment(f"generation:{name}")
+
+    def get_metrics(self) -> dict:
+        with self.metrics_lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+
+            return {**self.metrics, "hit_ratio": self.metrics["hits"] / lookups if lookups else None}
+
+
+def build_cache_service(config: dict) -> CacheService:
+    backend_name = (config.get("CACHE_BACKEND") or "memory").lower()
+
+    if backend_name == "redis":
+        backend = RedisCacheBackend.from_url(config.get("CACHE_REDIS_URL"))
+    elif backend_name == "memory":
+        backend = InMemoryCacheBackend(int(config.get("CACHE_MAX_ENTRIES") or 10000))
+    else:
+        raise CacheBackendException(f"Unknown cache backend {backend_name}")
+
+    logger.info(f"Using {backend_name} cache backend")
+
+    return CacheService(backend, config.get("CACHE_NAMESPACE") or "py_reportit")
+
+class CacheBackendException(Exception):
+    pass
@@ -0,0 +1,87 @@
+import json
+import logging
+
+from enum import Enum
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from py_reportit.shared.repository.report import ReportRepository
+from py_reportit.shared.service.cache_service import CacheService, REPORT_DATA
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class CountMode(str, Enum):
+    ESTIMATE = "estimate"
+    EXACT = "exact"
+    NONE = "none"
+
+
+class ReportCountService:
+    """
+    Total counts of filtered report queries, cached per normalized filter set.
+    Crawler writes bump the report data generation which is part of every cache key, entries expire after the TTL to
+    bound staleness of other writes.
+    """
+
+    DEFAULT_TTL_SECONDS = 300
+
+    def __init__(self, config: dict, cache_service: CacheService, report_repository: ReportRepository):
+        self.cache_service = cache_service
+        self.report_repository = report_repository
+        self.ttl_seconds = int(config.get("REPORT_COUNT_CACHE_SECONDS") or self.DEFAULT_TTL_SECONDS)
+
+    @staticmethod
+    def normalize_filters(filters: dict) -> str:
+        """Drops unset filters and normalizes the remaining values, so that equivalent requests share a cache entry."""
+        normalized = {}
+
+        for name, value in filters.items():
+            if isinstance(value, Enum):
+                value = value.value
+            if isinstance(value, str):
+                value = value.strip().lower()
+            if value is None or value == "" or value == "all":
+                continue
+
+            normalized[name] = str(value)
+
+        return json.dumps(normalized, sort_keys=True)
+
+    def get_cache_key(self, filters: dict) -> str:
+        return f"report_count:{self.cache_service.get_generation(REPORT_DATA)}:{self.normalize_filters(filters)}"
+
+    def get_total_count(
+            self,
+            session: Session,
+            mode: CountMode,
+            filters: dict,
+            and_cond: Optional[list] = None,
+            or_cond: Optional[list] = None
+    ) -> Optional[int]:
+        """
+        Counts the reports matching the given conditions, described by `filters` for caching purposes.
+        Estimates come from the cache (or table statistics if unfiltered) and fall back to an exact count.
+        """
+        if mode == CountMode.NONE:
+            return None
+
+        cache_key = self.get_cache_key(filters)
+
+        if mode == CountMode.ESTIMATE:
+            cached_count = self.cache_service.get(cache_key)
+
+            if cached_count is not None:
+                return cached_count
+
+            if not and_cond and not or_cond:
+                return self.report_repository.get_estimated_row_count(session)
+
+        total_count = self.report_repository.count_filtered(session, and_cond=and_cond, or_cond=or_cond)
+        self.cache_service.set(cache_key, total_count, self.ttl_seconds)
+
+        return total_count
+
+    def invalidate(self) -> None:
+        logger.debug("Invalidating cached report counts")
+        self.cache_service.bump_generation(REPORT_DATA)
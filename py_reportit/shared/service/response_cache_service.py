@@ -0,0 +1,52 @@
+import hashlib
+import logging
+
+from typing import Optional, TypedDict
+
+from py_reportit.shared.service.cache_service import CacheService, REPORT_DATA
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class CachedResponse(TypedDict):
+    body: bytes
+    etag: str
+
+
+class ResponseCacheService:
+    """
+    Serialized responses of report endpoints, keyed by request and the report data generation, which writes bump.
+    Crawler writes only reach the web process's generation through a shared cache backend (CACHE_BACKEND=redis),
+    with the per-process memory backend entries become stale for up to RESPONSE_CACHE_SECONDS after crawler writes.
+    Bodies beyond RESPONSE_CACHE_MAX_BODY_BYTES are not stored, which together with the entry limit of the cache
+    bounds its memory use.
+    """
+
+    DEFAULT_TTL_SECONDS = 300
+    DEFAULT_MAX_BODY_BYTES = 256 * 1024
+
+    def __init__(self, config: dict, cache_service: CacheService):
+        self.cache_service = cache_service
+        self.ttl_seconds = int(config.get("RESPONSE_CACHE_SECONDS") or self.DEFAULT_TTL_SECONDS)
+        self.max_body_bytes = int(config.get("RESPONSE_CACHE_MAX_BODY_BYTES") or self.DEFAULT_MAX_BODY_BYTES)
+
+    def get_cache_key(self, request_key: str) -> str:
+        return f"response:{self.cache_service.get_generation(REPORT_DATA)}:{request_key}"
+
+    def get(self, request_key: str) -> Optional[CachedResponse]:
+        return self.cache_service.get(self.get_cache_key(request_key))
+
+    @staticmethod
+    def build(body: bytes) -> CachedResponse:
+        # Derived from the body, as updated_at is not maintained for every change to the responses (votes, geocoding)
+        return CachedResponse(body=body, etag=hashlib.sha256(body).hexdigest()[:32])
+
+    def set(self, request_key: str, body: bytes) -> CachedResponse:
+        cached_response = self.build(body)
+
+        if len(body) <= self.max_body_bytes:
+            self.cache_service.set(self.get_cache_key(request_key), cached_response, self.ttl_seconds)
+        else:
+            logger.debug(f"Not caching response of {len(body)} bytes for {request_key}")
+
+        return cached_response
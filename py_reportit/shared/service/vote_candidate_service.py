@@ -0,0 +1,52 @@
+import logging
+
+from random import Random
+from typing import Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.repository.meta import MetaRepository
+
+logger = logging.getLogger(f"py_reportit.{__name__}")
+
+
+class VoteCandidateService:
+    """
+    Picks a random report meta among those with the fewest votes which the user has not voted for yet.
+    Every step is an index lookup: the lowest vote count bucket comes from the vote count index, and a random id
+    within the bucket's id range is used as a keyset probe, wrapping around to the start of the bucket if needed.
+    """
+
+    def __init__(self, meta_repository: MetaRepository, random: Optional[Random] = None):
+        self.meta_repository = meta_repository
+        self.random = random or Random()
+
+    def get_candidate(self, session: Session, user_id: UUID) -> Meta:
+        candidate = self.get_candidate_from_lowest_bucket(session, user_id)
+
+        if not candidate:
+            logger.debug(f"User {user_id} has voted for every report, returning a random one among the lowest votes")
+            candidate = self.get_candidate_from_lowest_bucket(session, None)
+
+        if not candidate:
+            raise NoVoteCandidateException("There are no reports to vote for")
+
+        return candidate
+
+    def get_candidate_from_lowest_bucket(self, session: Session, user_id: Optional[UUID]) -> Optional[Meta]:
+        vote_count = self.meta_repository.get_lowest_vote_count(session, user_id)
+
+        if vote_count is None:
+            return None
+
+        min_id, max_id = self.meta_repository.get_id_range_for_vote_count(session, vote_count)
+        probe_id = self.random.randint(min_id, max_id)
+
+        logger.debug(f"Probing for a candidate with {vote_count} votes from id {probe_id} for user {user_id}")
+
+        return self.meta_repository.get_first_with_vote_count(session, vote_count, user_id, from_id=probe_id) \
+            or self.meta_repository.get_first_with_vote_count(session, vote_count, user_id, before_id=probe_id)
+
+class NoVoteCandidateException(Exception):
+    pass
@@ -3,10 +3,12 @@ import logging
 from uuid import uuid4, UUID
 from sqlalchemy.orm import Session
 
+from py_reportit.shared.model.meta import Meta
 from py_reportit.shared.model.meta_category_vote import MetaCategoryVote
 from py_reportit.shared.repository.category import CategoryRepository
 from py_reportit.shared.repository.category_vote import CategoryVoteRepository
 from py_reportit.shared.repository.meta import MetaRepository
+from py_reportit.shared.service.report_count_service import ReportCountService
 
 logger = logging.getLogger(f"py_reportit.{__name__}")
 
@@ -17,12 +19,14 @@ class VoteService:
                  config: dict,
                  meta_repository: MetaRepository,
                  category_vote_repository: CategoryVoteRepository,
-                 category_repository: CategoryRepository
+                 category_repository: CategoryRepository,
+                 report_count_service: ReportCountService
                  ):
         self.config = config
         self.meta_repository = meta_repository
         self.category_vote_repository = category_vote_repository
         self.category_repository = category_repository
+        self.report_count_service = report_count_service
 
     def cast_vote(self, session: Session, user_id: UUID, report_id: int, category_id: int) -> bool:
         logger.info(f"Casting vote by user {user_id} for report {report_id} and category {category_id}")
@@ -39,19 +43,21 @@ class VoteService:
             logger.info(f"Changing existing vote from {existing_vote.category_id} to {category_id}")
 
             existing_vote.category_id = category_id
-            session.commit()
+        else:
+            logger.info("Casting a new vote")
 
-            return True
+            session.add(MetaCategoryVote(meta_id=report_meta.id, user_id=user_id, category_id=category_id))
+            # Incremented by the database, concurrent votes for the same report must not overwrite each other
+            report_meta.vote_count = Meta.vote_count + 1
 
-        logger.info("Casting a new vote")
+        session.flush()
+        report_meta.category_id = self.category_vote_repository.get_most_frequent_category_id(session, report_meta.id)
+        session.commit()
 
-        new_vote = MetaCategoryVote(meta_id=report_meta.id, user_id=user_id, category_id=category_id)
-        self.category_vote_repository.create(session, new_vote)
+        # Votes change the category of the report, and thereby the counts of category filters
+        self.report_count_service.invalidate()
 
         return True
 
-    def get_random_report_id_for_voting(self, session: Session, user_id: UUID) -> int:
-        return self.meta_repository.get_random_among_lowest_votes(session, user_id).report_id
-
 class VoteException(Exception):
     pass
\ No newline at end of file
@@ -0,0 +1,76 @@
+import threading
+
+from enum import Enum
+from time import monotonic
+from typing import Callable
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops requests to an upstream after `failure_threshold` consecutive failures. Once `reset_seconds` passed, a single
+    trial request is let through: its success closes the circuit again, its failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 60, clock: Callable[[], float] = monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.trial_in_progress = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        if self.opened_at is None:
+            return CircuitState.CLOSED
+
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return CircuitState.HALF_OPEN
+
+        return CircuitState.OPEN
+
+    def is_available(self) -> bool:
+        """Whether a request would currently be allowed, without reserving the half-open trial."""
+        with self.lock:
+            state = self.state
+
+            return state == CircuitState.CLOSED or (state == CircuitState.HALF_OPEN and not self.trial_in_progress)
+
+    def allow_request(self) -> bool:
+        with self.lock:
+            state = self.state
+
+            if state == CircuitState.CLOSED:
+                return True
+
+            if state == CircuitState.HALF_OPEN and not self.trial_in_progress:
+                self.trial_in_progress = True
+                return True
+
+            return False
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_progress = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.consecutive_failures += 1
+
+            if self.trial_in_progress or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+
+            self.trial_in_progress = False
+
+
+class CircuitOpenException(Exception):
+    pass
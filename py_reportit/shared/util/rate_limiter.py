@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+from time import monotonic, sleep
+from typing import Callable
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Blocking token bucket, refilled continuously at `rate` tokens per second up to `capacity`."""
+
+    def __init__(
+            self,
+            rate: float,
+            capacity: float = 1,
+            clock: Callable[[], float] = monotonic,
+            sleeper: Callable[[float], None] = sleep,
+    ):
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.clock = clock
+        self.sleeper = sleeper
+        self.tokens = self.capacity
+        self.last_refill = clock()
+        self.lock = threading.Lock()
+
+    def refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def try_acquire(self) -> float:
+        """Takes a token if one is available and returns 0, otherwise returns the seconds until one will be."""
+        with self.lock:
+            self.refill()
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> None:
+        while (wait_seconds := self.try_acquire()) > 0:
+            self.sleeper(wait_seconds)
+
+    async def acquire_async(self) -> None:
+        while (wait_seconds := self.try_acquire()) > 0:
+            await asyncio.sleep(wait_seconds)
+
+
+class PerHostRateLimiter:
+    """Keeps one token bucket per host so that different upstreams are paced independently."""
+
+    def __init__(self, rate: float, capacity: float = 1, **bucket_kwargs):
+        self.rate = rate
+        self.capacity = capacity
+        self.bucket_kwargs = bucket_kwargs
+        self.buckets: dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def get_bucket(self, url_or_host: str) -> TokenBucket:
+        host = urlparse(url_or_host).netloc or url_or_host
+
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.capacity, **self.bucket_kwargs)
+
+            return self.buckets[host]
+
+    def acquire(self, url_or_host: str) -> None:
+        self.get_bucket(url_or_host).acquire()
+
+    async def acquire_async(self, url_or_host: str) -> None:
+        await self.get_bucket(url_or_host).acquire_async()
@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import zlib
+
+from enum import Enum
+from typing import Iterable, Iterator
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+# Reports are flattened for CSV exports, answers are only counted
+CSV_COLUMNS = [
+    "id", "title", "description", "has_photo", "latitude", "longitude", "created_at", "updated_at", "key_category",
+    "id_service", "service", "status", "language", "address_street", "address_neighbourhood", "address_postcode",
+    "category", "answer_count",
+]
+
+
+def flatten_report(report: dict) -> dict:
+    meta = report.get("meta") or {}
+    category = meta.get("category") or {}
+
+    return {
+        **{column: report.get(column) for column in CSV_COLUMNS},
+        "language": meta.get("language"),
+        "address_street": meta.get("address_street"),
+        "address_neighbourhood": meta.get("address_neighbourhood"),
+        "address_postcode": meta.get("address_postcode"),
+        "category": category.get("label"),
+        "answer_count": len(report.get("answers") or []),
+    }
+
+
+def encode_ndjson(reports: Iterable[dict]) -> Iterator[bytes]:
+    for report in reports:
+        yield (json.dumps(report, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def encode_json_array(reports: Iterable[dict]) -> Iterator[bytes]:
+    separator = b"["
+
+    for report in reports:
+        yield separator + json.dumps(report, ensure_ascii=False).encode("utf-8")
+        separator = b","
+
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def encode_csv(reports: Iterable[dict]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+
+    for report in reports:
+        writer.writerow(flatten_report(report))
+
+        # Only the current row is ever buffered
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def encode_reports(reports: Iterable[dict], export_format: ExportFormat) -> Iterator[bytes]:
+    if export_format == ExportFormat.CSV:
+        return encode_csv(reports)
+
+    return encode_ndjson(reports)
+
+
+def gzip_chunks(chunks: Iterable[bytes], compression_level: int = 6, min_chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Gzips a stream of chunks on the fly, emitting compressed output once at least min_chunk_size is buffered."""
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    pending = []
+    pending_size = 0
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+
+        if compressed:
+            pending.append(compressed)
+            pending_size += len(compressed)
+
+        if pending_size >= min_chunk_size:
+            yield b"".join(pending)
+            pending, pending_size = [], 0
+
+    pending.append(compressor.flush())
+    yield b"".join(pending)
@@ -0,0 +1,29 @@
+from urllib.parse import urlencode
+from fastapi import Request
+from fastapi.responses import Response
+
+from py_reportit.shared.service.response_cache_service import CachedResponse
+from py_reportit.web.static_files import etag_matches
+
+
+def get_request_key(request: Request) -> str:
+    """Path and query parameters in a canonical order, so that equivalent requests share a cache entry."""
+    return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+
+
+def build_cached_response(request: Request, cached_response: CachedResponse) -> Response:
+    """
+    Answers requests with a matching If-None-Match with a 304, otherwise returns the JSON body with its ETag.
+    No Last-Modified is sent, as updated_at does not reflect every change to the body (e.g. votes and geocoding),
+    so that clients revalidate through the ETag only.
+    """
+    headers = {
+        "ETag": f'"{cached_response["etag"]}"',
+        # Clients may store responses, but have to revalidate them on every use
+        "Cache-Control": "no-cache",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), cached_response["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=cached_response["body"], media_type="application/json", headers=headers)
@@ -8,7 +8,32 @@ from enum import Enum
 from py_reportit.web.dependencies import get_session, get_current_active_admin
 from py_reportit.shared.config.container import Container
 from py_reportit.shared.repository.category import CategoryRepository
+from py_reportit.shared.service.cache_service import CacheService
+from py_reportit.crawler.service.nonce import NonceService
 from py_reportit.shared.model import *
 
 
-router = APIRouter(tags=["admin"], prefix="/admin", dependencies=[get_current_active_admin])
+router = APIRouter(tags=["admin"], prefix="/admin", dependencies=[Depends(get_current_active_admin)])
+
+@router.get("/cache/metrics")
+@inject
+def get_cache_metrics(cache_service: CacheService = Depends(Provide[Container.cache_service])):
+    """
+    Retrieve the cache hits and misses of the serving API process.
+    """
+    return cache_service.get_metrics()
+
+@router.get("/crawler/nonces")
+@inject
+def get_nonce_counters(nonce_service: NonceService = Depends(Provide[Container.nonce_service])):
+    """
+    Retrieve how often the crawler reused cached nonces, fetched fresh ones, and had cached ones rejected.
+    The counters live in the crawler process, so they are only available with CACHE_BACKEND=redis.
+    """
+    if not nonce_service.counters_available:
+        raise HTTPException(
+            status_code=503,
+            detail="Nonce counters are only available with a cache backend shared with the crawler (CACHE_BACKEND=redis)"
+        )
+
+    return nonce_service.get_counters()
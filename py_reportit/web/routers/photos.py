@@ -1,20 +1,52 @@
-from fastapi import APIRouter, Path, HTTPException
-from fastapi.responses import FileResponse
-from os import path
+import os
 
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends, Path, HTTPException, Query, Request
+
+from py_reportit.crawler.service.photo import PhotoFormat, PhotoService, PhotoSize
 from py_reportit.shared.config import config
+from py_reportit.shared.config.container import Container
+from py_reportit.web.static_files import build_file_response, get_file_etag
 
 
 router = APIRouter(tags=["photos"], prefix="/photos")
 
+DEFAULT_PHOTO_CACHE_SECONDS = 30 * 24 * 3600
+
 @router.get("/{reportId}")
-async def get_photo(reportId: int = Path(description="The report ID for which the photo should be retrieved")):
+@inject
+def get_photo(
+    request: Request,
+    reportId: int = Path(description="The report ID for which the photo should be retrieved"),
+    size: PhotoSize = Query(PhotoSize.FULL, description="The size of the photo: thumbnail (320px), medium (640px) or full (1200px)"),
+    format: PhotoFormat = Query(PhotoFormat.JPEG, description="The image format, WebP falls back to JPEG where unavailable"),
+    photo_service: PhotoService = Depends(Provide[Container.photo_service])
+):
     """
-    Retrieve the photo related to a given report ID.
+    Retrieve the photo related to a given report ID, optionally downscaled for list and grid views.
+    Responses may be cached for a long time and revalidated through their ETag, except for fallbacks to another size
+    or format, which are revalidated on every use so that clients pick up the requested photo once it is generated.
     \f
     :param reportId: The related report ID
+    :param size: The requested size
+    :param format: The requested format
     """
-    photo_filename = f"{config.get('PHOTO_DOWNLOAD_FOLDER')}/{reportId}.jpg"
-    if not path.isfile(photo_filename):
+    servable_photo = photo_service.get_servable_photo(reportId, size, format)
+
+    if not servable_photo:
         raise HTTPException(status_code=404, detail=f"No photo found for report with id {reportId}")
-    return FileResponse(photo_filename)
+
+    path, photo_format = servable_photo
+
+    if path == photo_service.get_photo_path(reportId, size, format):
+        cache_control = f"public, max-age={int(config.get('PHOTO_CACHE_SECONDS') or DEFAULT_PHOTO_CACHE_SECONDS)}"
+    else:
+        cache_control = "public, no-cache"
+
+    return build_file_response(
+        request,
+        path,
+        etag=get_file_etag(os.stat(path)),
+        media_type=photo_format.media_type,
+        cache_control=cache_control
+    )
@@ -1,15 +1,21 @@
 from dependency_injector.wiring import Provide, inject
-from fastapi import Depends, HTTPException, Query, Path, APIRouter
-from typing import List, Optional
+from fastapi import Depends, HTTPException, Query, Path, APIRouter, Request
+from fastapi.responses import StreamingResponse
+from typing import Iterator, List, Optional
 from datetime import date
+from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.session import Session
 from enum import Enum
 
 from py_reportit.web.dependencies import get_session
+from py_reportit.web.response_cache import build_cached_response, get_request_key
 from py_reportit.shared.config.container import Container
 from py_reportit.web.schema.report import PagedReportList, Report
 from py_reportit.shared.model import *
 from py_reportit.shared.repository.report import ReportRepository
+from py_reportit.shared.service.report_count_service import CountMode, ReportCountService
+from py_reportit.shared.service.response_cache_service import ResponseCacheService
+from py_reportit.shared.util.report_export import ExportFormat, MEDIA_TYPES, encode_json_array, encode_reports, gzip_chunks
 
 
 class ReportState(str, Enum):
@@ -27,9 +33,10 @@ router = APIRouter(tags=["reports"], prefix="/reports")
 @router.get("", response_model=PagedReportList)
 @inject
 def get_reports(
+    request: Request,
     page: str = Query(None, description="The page to retrieve for the paginated query."),
     page_size: int = Query(50, description="The amount of reports per page."),
-    sort_by: str = Query('id', description="The field to sort by."),
+    sort_by: str = Query('id', description="The field to sort by. Use 'relevance' to rank reports by how well they match the search text."),
     asc: bool = Query(False, description="Whether or not to sort reports in ascending order."),
     status: Optional[ReportState] = Query(ReportState.ALL, description="Filter reports based on their status."),
     photo: Optional[PhotoState] = Query(PhotoState.ALL, description="Filter reports based on whether or not they have photos."),
@@ -41,7 +48,10 @@ def get_reports(
     neighbourhood: Optional[str] = Query(None, description="The neighbourhood to search for."),
     postcode: Optional[int] = Query(None, description="The postcode to search for."),
     search_text: Optional[str] = Query(None, description="Only reports matching the given search text in their title or description (or in any of the answers) will be returned."),
+    count: CountMode = Query(CountMode.EXACT, description="How to determine the total count: 'exact' counts on every request (and bypasses the response cache), 'estimate' may return a cached or approximate count, 'none' skips it."),
     report_repository: ReportRepository = Depends(Provide[Container.report_repository]),
+    report_count_service: ReportCountService = Depends(Provide[Container.report_count_service]),
+    response_cache_service: ResponseCacheService = Depends(Provide[Container.response_cache_service]),
     session: Session = Depends(get_session)
 ):
     """
@@ -49,6 +59,14 @@ def get_reports(
     \f
     :param page: The page to retrieve for the paginated query..
     """
+    request_key = get_request_key(request)
+    # Exact counts are made on every request, so responses containing them are never served from the cache
+    use_response_cache = count != CountMode.EXACT
+    cached_response = response_cache_service.get(request_key) if use_response_cache else None
+
+    if cached_response:
+        return build_cached_response(request, cached_response)
+
     boxed_page_size = max(1, min(100, page_size))
 
     and_q = []
@@ -69,7 +87,7 @@ def get_reports(
 
     # 0 might be a legit value
     if category != None:
-        and_q.append(report.Report.meta.has(meta.Meta.category==category))
+        and_q.append(report.Report.meta.has(meta.Meta.category_id==category))
 
     if after:
         and_q.append(report.Report.created_at>=after)
@@ -85,47 +103,113 @@ def get_reports(
     if postcode:
         and_q.append(report.Report.meta.has(meta.Meta.address_postcode == postcode))
 
+    by = None if sort_by == "relevance" else report.Report.__dict__[sort_by]
+
     if search_text:
-        search_attrs = list(map(lambda search_attr: report.Report.__dict__[search_attr], ["title", "description"]))
-        or_q = list(map(lambda col: col.like(f'%{search_text}%'), search_attrs))
-        or_q.append(report.Report.answers.any(report_answer.ReportAnswer.text.like(f'%{search_text}%')))
+        or_q = report_repository.build_search_conditions(session, search_text)
+
+        if sort_by == "relevance":
+            by = report_repository.build_search_relevance(session, search_text)
 
     paged_reports_with_count = report_repository.get_paged(
         session,
         page_size=boxed_page_size,
         page=page,
-        by=report.Report.__dict__[sort_by],
+        by=by,
         asc=asc,
+        with_count=False,
         and_cond=and_q if len(and_q) else None,
         or_cond=or_q if len(or_q) else None
     )
 
     paged_reports = paged_reports_with_count["page"];
 
-    return PagedReportList(
+    total_count = report_count_service.get_total_count(
+        session,
+        count,
+        {
+            "status": status,
+            "photo": photo,
+            "service": service,
+            "category": category,
+            "after": after,
+            "before": before,
+            "street": street,
+            "neighbourhood": neighbourhood,
+            "postcode": postcode,
+            "search_text": search_text,
+        },
+        and_cond=and_q if len(and_q) else None,
+        or_cond=or_q if len(or_q) else None
+    )
+
+    paged_report_list = PagedReportList(
         previous=paged_reports.paging.bookmark_previous if paged_reports.paging.has_previous else None,
         next=paged_reports.paging.bookmark_next if paged_reports.paging.has_next else None,
-        total_count=paged_reports_with_count["total_count"],
+        total_count=total_count,
         reports=paged_reports,
     )
 
+    body = paged_report_list.model_dump_json().encode("utf-8")
+
+    return build_cached_response(
+        request,
+        response_cache_service.set(request_key, body) if use_response_cache else response_cache_service.build(body)
+    )
+
+def serialize_all_reports(
+        session_maker: sessionmaker,
+        report_repository: ReportRepository,
+        descending: bool = False
+) -> Iterator[dict]:
+    # The request's session is closed before a streamed response is sent, so the stream needs its own
+    with session_maker() as session:
+        for streamed_report in report_repository.stream_all(session, descending=descending):
+            yield Report.model_validate(streamed_report).model_dump(mode="json")
+
 @router.get("/all", response_model=List[Report])
 @inject
-def get_reports(
+def get_all_reports(
     report_repository: ReportRepository = Depends(Provide[Container.report_repository]),
-    session: Session = Depends(get_session)
+    session_maker: sessionmaker = Depends(Provide[Container.sessionmaker])
 ):
     """
     Retrieve all reports in the system, basically a database dump.
-    **Using this endpoint is strongly discouraged.** Please consider using the paginated and filtered endpoint instead!
+    **Using this endpoint is strongly discouraged.** Please consider using the paginated and filtered endpoint or the export endpoint instead!
     """
-    return report_repository.get_all(session)
+    return StreamingResponse(
+        # Newest first, as this endpoint always returned them
+        encode_json_array(serialize_all_reports(session_maker, report_repository, descending=True)),
+        media_type="application/json"
+    )
+
+@router.get("/export")
+@inject
+def export_reports(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="The export format, either one report per line as JSON (ndjson) or flattened reports as CSV (csv)."),
+    gzip: bool = Query(False, description="Whether or not to gzip the response body."),
+    report_repository: ReportRepository = Depends(Provide[Container.report_repository]),
+    session_maker: sessionmaker = Depends(Provide[Container.sessionmaker])
+):
+    """
+    Export all reports as a stream, either as newline delimited JSON or as CSV.
+    """
+    body = encode_reports(serialize_all_reports(session_maker, report_repository), format)
+    headers = {"Content-Disposition": f'attachment; filename="reports.{format.value}"'}
+
+    if gzip:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format], headers=headers)
 
 @router.get("/{reportId}", response_model=Report)
 @inject
 def get_report(
+    request: Request,
     reportId: int = Path(description="The ID of the report to retrieve"),
     report_repository: ReportRepository = Depends(Provide[Container.report_repository]),
+    response_cache_service: ResponseCacheService = Depends(Provide[Container.response_cache_service]),
     session: Session = Depends(get_session)
 ):
     """
@@ -133,7 +217,17 @@ def get_report(
     \f
     :param reportId: The report ID
     """
+    request_key = get_request_key(request)
+    cached_response = response_cache_service.get(request_key)
+
+    if cached_response:
+        return build_cached_response(request, cached_response)
+
     report = report_repository.get_by_id(session, reportId)
     if report is None:
         raise HTTPException(status_code=404, detail=f"Report with id {reportId} does not exist")
-    return report
+
+    return build_cached_response(request, response_cache_service.set(
+        request_key,
+        Report.model_validate(report).model_dump_json().encode("utf-8")
+    ))
@@ -0,0 +1,59 @@
+from dependency_injector.wiring import Provide, inject
+from fastapi import Depends, HTTPException, Path, APIRouter, Request
+
+from py_reportit.crawler.service.snapshot import SnapshotService
+from py_reportit.shared.config.container import Container
+from py_reportit.web.static_files import build_file_response
+
+
+router = APIRouter(tags=["snapshots"], prefix="/snapshots")
+
+def get_manifest_or_404(snapshot_service: SnapshotService) -> dict:
+    manifest = snapshot_service.get_manifest()
+
+    if not manifest:
+        raise HTTPException(status_code=404, detail="No snapshot has been generated yet")
+
+    return manifest
+
+@router.get("")
+@inject
+def get_snapshots(snapshot_service: SnapshotService = Depends(Provide[Container.snapshot_service])):
+    """
+    Retrieve the list of available snapshot files, with their checksums, sizes and row counts.
+    Each table is split into files of consecutive report id ranges, named after the table and the range's index, e.g.
+    `reports.00000`. Files of unchanged ranges keep their checksum between snapshots and need not be downloaded again.
+    """
+    manifest = get_manifest_or_404(snapshot_service)
+
+    return {"generated_at": manifest["generated_at"], "files": manifest["files"]}
+
+@router.get("/{name}")
+@inject
+def get_snapshot(
+    request: Request,
+    name: str = Path(description="The name of the snapshot file as listed by the snapshot list, e.g. reports.00000"),
+    snapshot_service: SnapshotService = Depends(Provide[Container.snapshot_service])
+):
+    """
+    Download a snapshot file: gzipped, newline delimited JSON with one table row per line.
+    Supports conditional requests through the file's ETag, and resuming downloads through range requests.
+    \f
+    :param name: The snapshot file name
+    """
+    snapshot_file = get_manifest_or_404(snapshot_service)["files"].get(name)
+
+    if not snapshot_file:
+        raise HTTPException(status_code=404, detail=f"No snapshot named {name} exists")
+
+    try:
+        return build_file_response(
+            request,
+            snapshot_service.get_path(snapshot_file["filename"]),
+            etag=snapshot_file["sha256"],
+            media_type="application/gzip",
+            filename=f"{name}.ndjson.gz"
+        )
+    except FileNotFoundError:
+        # Replaced by a newer snapshot in the meantime
+        raise HTTPException(status_code=404, detail=f"Snapshot {name} is outdated, please retry")
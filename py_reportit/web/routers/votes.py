@@ -1,5 +1,5 @@
 from dependency_injector.wiring import Provide, inject
-from fastapi import Depends, APIRouter
+from fastapi import Depends, APIRouter, HTTPException
 from fastapi import Query, Path
 from sqlalchemy.orm.session import Session
 
@@ -7,6 +7,7 @@ from py_reportit.shared.model.user import User
 from py_reportit.web.dependencies import get_current_active_user, get_session
 from py_reportit.shared.config.container import Container
 from py_reportit.shared.service.vote_service import VoteService
+from py_reportit.shared.service.vote_candidate_service import VoteCandidateService, NoVoteCandidateException
 from py_reportit.web.schema.report import Report
 from py_reportit.shared.model import *
 from py_reportit.shared.repository.report import ReportRepository
@@ -33,11 +34,16 @@ def cast_vote(
 @inject
 def get_candidate(
     current_user: User = Depends(get_current_active_user),
-    vote_service: VoteService = Depends(Provide[Container.vote_service]),
+    vote_candidate_service: VoteCandidateService = Depends(Provide[Container.vote_candidate_service]),
     report_repository: ReportRepository = Depends(Provide[Container.report_repository]),
     session: Session = Depends(get_session)
 ):
     """
     Retrieve a randomly selected report from those with the least amount of total votes and for which the given user id has not yet cast a vote.
     """
-    return report_repository.get_by_id(session, vote_service.get_random_report_id_for_voting(session, current_user.id))
+    try:
+        candidate = vote_candidate_service.get_candidate(session, current_user.id)
+    except NoVoteCandidateException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return report_repository.get_by_id(session, candidate.report_id)
@@ -29,5 +29,5 @@ class Report(BaseModel):
 class PagedReportList(BaseModel):
     previous: Optional[str]
     next: Optional[str]
-    total_count: int
+    total_count: Optional[int]
     reports: list[Report]
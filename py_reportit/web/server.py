@@ -10,8 +10,9 @@ The Report-It Unchained API lets you do awesome stuff based on a repository of a
 
 ### Reports
 
-You can retrieve reports in three different ways:
+You can retrieve reports in four different ways:
 - paginated and using filters (recommended)
+- as a streamed export in NDJSON or CSV format
 - all at once (strongly discouraged)
 - by ID
 
@@ -20,11 +21,12 @@ The `service` key of a report is inferred and a best guess based on the answers
 Reports are enriched with meta data, such as the **language** (guessed using CLD2, `un` stands for unknown), reverse-geolocated **address data** of the report's location, and **all answers** given by the city.
 
 You should **always** prefer the paginated endpoint over the endpoint that delivers all reports (ie a database dump), unless you **really** want to grab a complete copy of all the data at once.
-If you do download the whole database, be warned that it may take some time to process your request.
+If you do need the whole database, please download the latest snapshot instead.
 
 ### Photos
 
 The photo endpoint allows you to download the photo relating to a given report ID.
+Thumbnail and medium sizes, as well as WebP versions, are available for list and grid views.
 """
 
 tags_metadata = [
@@ -44,6 +46,10 @@ tags_metadata = [
         "name": "photos",
         "description": "Retrieve photos based on report IDs.",
     },
+    {
+        "name": "snapshots",
+        "description": "Download periodically generated snapshots of the whole database.",
+    },
 ]
 
 
@@ -54,7 +60,7 @@ def build_app():
 
     container.wire(modules=[__name__, ".dependencies"], packages=[".routers"])
 
-    from py_reportit.web.routers import photos, reports, utilities, votes, authentication, admin
+    from py_reportit.web.routers import photos, reports, utilities, votes, authentication, admin, snapshots
 
     app = FastAPI(
         title="Report-It Unchained API",
@@ -87,6 +93,7 @@ def build_app():
     app.include_router(utilities.router)
     app.include_router(authentication.router)
     app.include_router(admin.router)
+    app.include_router(snapshots.router)
 
     app.container = container
 
@@ -0,0 +1,118 @@
+import os
+import re
+
+from email.utils import formatdate
+from typing import Iterator, Optional
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+RANGE_REGEX = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def etag_matches(header_value: Optional[str], etag: str) -> bool:
+    if not header_value:
+        return False
+
+    candidates = [candidate.strip().removeprefix("W/").strip('"') for candidate in header_value.split(",")]
+
+    return "*" in candidates or etag in candidates
+
+
+def parse_range(range_header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Parses a single byte range into inclusive start and end offsets. Returns None for headers which should be
+    ignored (multiple ranges or other units), raises RangeNotSatisfiableException for ranges outside of the file.
+    """
+    range_match = RANGE_REGEX.match(range_header.strip())
+
+    if not range_match or not any(range_match.groups()):
+        return None
+
+    raw_start, raw_end = range_match.groups()
+
+    if not raw_start:
+        # Suffix range, ie the last n bytes
+        start, end = max(0, size - int(raw_end)), size - 1
+    else:
+        start, end = int(raw_start), min(int(raw_end), size - 1) if raw_end else size - 1
+
+    if start >= size or start > end:
+        raise RangeNotSatisfiableException(f"Range {range_header} is not satisfiable for {size} bytes")
+
+    return start, end
+
+
+def iterate_file_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as file:
+        file.seek(start)
+        remaining = end - start + 1
+
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+
+            if not chunk:
+                break
+
+            remaining -= len(chunk)
+            yield chunk
+
+
+def build_file_response(
+        request: Request,
+        path: str,
+        etag: str,
+        media_type: str,
+        filename: Optional[str] = None,
+        cache_control: Optional[str] = None,
+) -> Response:
+    """Serves a file with ETag based conditional requests and single byte range requests."""
+    stat = os.stat(path)
+    headers = {
+        "ETag": f'"{etag}"',
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+
+    # Ranges of an outdated representation would be stitched together with the current one by the client
+    if range_header and (not if_range or etag_matches(if_range, etag)):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except RangeNotSatisfiableException:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+
+        if byte_range:
+            start, end = byte_range
+
+            return StreamingResponse(
+                iterate_file_range(path, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers={
+                    **headers,
+                    "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+                    "Content-Length": str(end - start + 1),
+                }
+            )
+
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+
+
+def get_file_etag(stat: os.stat_result) -> str:
+    """An ETag for files without a known checksum, derived from their modification time and size."""
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+class RangeNotSatisfiableException(Exception):
+    pass
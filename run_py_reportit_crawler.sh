@@ -5,4 +5,4 @@ if [ -v MIGRATE ]; then
     alembic upgrade head
 fi
 
-exec celery -A py_reportit.crawler.py_reportit:celery_app worker -B --loglevel=INFO
+exec celery -A py_reportit.crawler.py_reportit:celery_app worker -B -Q celery,${PHOTO_TASK_QUEUE:-photos} --loglevel=INFO
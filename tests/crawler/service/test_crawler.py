@@ -0,0 +1,90 @@
+import pytest
+
+from datetime import datetime
+from unittest.mock import Mock
+
+from py_reportit.crawler.service.crawler import CrawlerService
+from py_reportit.crawler.util.reportit_utils import extract_ids, report_content_hash
+from py_reportit.shared.model.crawl import Crawl
+from py_reportit.shared.model.report import Report
+from py_reportit.shared.model.report_answer import ReportAnswer
+from py_reportit.shared.service.cache_service import CacheService
+
+
+@pytest.fixture
+def crawler() -> CrawlerService:
+    return CrawlerService(
+        config={},
+        api_service=None,
+        photo_service=None,
+        report_repository=None,
+        meta_repository=None,
+        report_answer_repository=None,
+        crawl_repository=None,
+        crawl_item_repository=None,
+        cache_service=CacheService(),
+        timezone=None,
+    )
+
+def test_get_reports_data_index_is_built_once_per_crawl(crawler: CrawlerService):
+    crawl = Crawl(id=1, reports_data=[{"title": "a", "description": "b"}])
+
+    index = crawler.get_reports_data_index(crawl)
+
+    assert crawler.get_reports_data_index(crawl) is index
+    assert index.find("a", "b") == {"title": "a", "description": "b"}
+    # Process local, the shared cache is left alone
+    assert len(crawler.cache_service.backend) == 0
+
+    next_crawl = Crawl(id=2, reports_data=None)
+
+    assert crawler.get_reports_data_index(next_crawl) is not index
+    assert len(crawler.get_reports_data_index(next_crawl)) == 0
+
+def build_report(id: int, title: str, answer_texts: list[str] = []) -> Report:
+    return Report(
+        id=id,
+        title=title,
+        description="description",
+        status="accepted",
+        answers=[
+            ReportAnswer(order=order, author="Service", created_at=datetime(2024, 1, 1), closing=False, text=text)
+            for order, text in enumerate(answer_texts)
+        ]
+    )
+
+def test_diff_reports():
+    existing_reports = [build_report(1, "one"), build_report(2, "two", ["answer"]), build_report(3, "three")]
+    new_reports = [build_report(1, "one"), build_report(2, "two", ["answer", "second answer"]), build_report(4, "four")]
+
+    changes = CrawlerService.diff_reports(existing_reports, new_reports)
+
+    assert extract_ids(changes["new"]) == [4]
+    assert extract_ids(changes["updated"]) == [2]
+    assert extract_ids(changes["unchanged"]) == [1]
+
+def test_persist_changed_reports_skips_unchanged(crawler: CrawlerService):
+    persist_mock = Mock()
+    crawler.persist_reports = persist_mock
+    crawler.report_repository = Mock()
+
+    crawler.persist_changed_reports(None, [build_report(1, "one")], [build_report(1, "one")])
+
+    persist_mock.assert_not_called()
+    # The content hash of the legacy report is stored so it does not have to be recomputed next time
+    crawler.report_repository.update_many_by_id.assert_called_once_with(
+        None, [{"id": 1, "content_hash": report_content_hash(build_report(1, "one"))}]
+    )
+
+    existing_report = build_report(1, "one")
+    existing_report.content_hash = report_content_hash(existing_report)
+    crawler.report_repository = Mock()
+
+    crawler.persist_changed_reports(None, [existing_report], [build_report(1, "one")])
+
+    persist_mock.assert_not_called()
+    crawler.report_repository.update_many_by_id.assert_called_once_with(None, [])
+
+    crawler.persist_changed_reports(None, [build_report(1, "one")], [build_report(1, "one", ["answer"])])
+
+    persist_mock.assert_called_once()
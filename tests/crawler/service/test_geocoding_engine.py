@@ -0,0 +1,122 @@
+import pytest
+import threading
+
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from py_reportit.crawler.post_processors.geocode_pp import Geocode
+from py_reportit.shared.config.container import Container
+from py_reportit.shared.model import *
+from py_reportit.shared.model.geocode_cell import GeocodeCell
+from py_reportit.shared.model.geocode_result import GeocodeResult
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.report import Report
+
+
+class FakeGeocoderService:
+
+    def __init__(self, failing_latitudes: set[float] = set()):
+        self.failing_latitudes = failing_latitudes
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get_neighbourhood_and_street_offline(self, latitude: float, longitude: float) -> None:
+        return None
+
+    def get_neighbourhood_and_street_remotely(self, latitude: float, longitude: float) -> GeocodeResult:
+        with self.lock:
+            self.requests.append((latitude, longitude))
+
+        if latitude in self.failing_latitudes:
+            raise ConnectionError("Geocoder unavailable")
+
+        return GeocodeResult(street=f"Street {latitude}", postcode="1234", neighbourhood="Gare")
+
+
+@pytest.fixture
+def session_maker():
+    engine = create_engine("sqlite://")
+    orm_base.Base.metadata.create_all(engine)
+
+    return sessionmaker(engine)
+
+
+def build_report(report_id: int, latitude: float, longitude: float) -> Report:
+    return Report(
+        id=report_id,
+        title=f"Report {report_id}",
+        description="Public light not working",
+        status="accepted",
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 1),
+        latitude=latitude,
+        longitude=longitude,
+        meta=Meta(id=report_id),
+    )
+
+
+def build_container(geocoder_service: FakeGeocoderService) -> Container:
+    container = Container(config={"GEOCODE_ACTIVE": 1, "GEOCODE_REQUESTS_PER_SECOND": 1000, "GEOCODE_WORKERS": 4})
+    container.geocoder_service.override(geocoder_service)
+
+    return container
+
+
+def test_geocode_reports__resolves_each_cell_once_and_persists_it(session_maker):
+    geocoder_service = FakeGeocoderService()
+    engine = build_container(geocoder_service).geocoding_engine()
+
+    with session_maker() as session:
+        reports = [
+            build_report(1, 49.60001, 6.12001),
+            build_report(2, 49.60003, 6.11998),
+            build_report(3, 49.61, 6.13),
+        ]
+
+        assert engine.geocode_reports(session, reports) == []
+        session.commit()
+
+        assert len(geocoder_service.requests) == 2
+        assert reports[1].meta.address_street == reports[0].meta.address_street == "Street 49.60001"
+        assert reports[2].meta.address_postcode == 1234
+        assert all(report.meta.address_polled for report in reports)
+        assert {cell.id for cell in session.query(GeocodeCell)} == {"49.6000,6.1200", "49.6100,6.1300"}
+
+    with session_maker() as session:
+        later_report = build_report(4, 49.61002, 6.13004)
+
+        assert engine.geocode_reports(session, [later_report]) == []
+        assert later_report.meta.address_neighbourhood == "Gare"
+        assert len(geocoder_service.requests) == 2
+
+
+def test_geocode_reports__leaves_failed_reports_unpolled(session_maker):
+    geocoder_service = FakeGeocoderService(failing_latitudes={49.7})
+    engine = build_container(geocoder_service).geocoding_engine()
+
+    with session_maker() as session:
+        reports = [build_report(1, 49.6, 6.12), build_report(2, 49.7, 6.12)]
+
+        assert engine.geocode_reports(session, reports) == [reports[1]]
+        session.commit()
+
+        assert reports[0].meta.address_polled
+        assert not reports[1].meta.address_polled
+        assert session.query(GeocodeCell).count() == 1
+
+
+def test_geocode_pp__processes_unpolled_reports(session_maker):
+    geocoder_service = FakeGeocoderService()
+    geocode_pp: Geocode = build_container(geocoder_service).geocode_pp()
+
+    with session_maker() as session:
+        session.add_all([build_report(1, 49.6, 6.12), build_report(2, 49.6, 6.12), build_report(3, None, None)])
+        session.commit()
+
+        geocode_pp.process(session, [])
+
+        polled = {report.id: report.meta.address_polled for report in session.query(Report)}
+
+    assert polled == {1: True, 2: True, 3: False}
+    assert len(geocoder_service.requests) == 1
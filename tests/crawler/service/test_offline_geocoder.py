@@ -0,0 +1,89 @@
+import gzip
+import json
+import pytest
+
+from random import Random
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from py_reportit.crawler.service.geocoder import GeocoderService
+from py_reportit.crawler.service.offline_geocoder import OfflineReverseGeocoder
+
+
+def build_feature(latitude: float, longitude: float, street: str, postcode, neighbourhood: str) -> dict:
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+        "properties": {"street": street, "postcode": postcode, "neighbourhood": neighbourhood},
+    }
+
+
+@pytest.fixture
+def dataset_path(tmp_path) -> str:
+    path = tmp_path / "addresses.geojson.gz"
+
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        json.dump({"type": "FeatureCollection", "features": [
+            build_feature(49.6000, 6.1200, "Avenue de la Gare", "L-1611", "Gare"),
+            build_feature(49.6003, 6.1200, "Rue de Strasbourg", 2560, "Gare"),
+            build_feature(49.6116, 6.1319, "Grand-Rue", None, "Ville-Haute"),
+            {"type": "Feature", "geometry": None, "properties": {}},
+        ]}, file)
+
+    return str(path)
+
+
+def test_nearest_address_within_max_distance_is_returned(dataset_path: str):
+    geocoder = OfflineReverseGeocoder.from_geojson(dataset_path, max_distance_meters=30)
+
+    assert geocoder.size == 3
+    assert geocoder.get_neighbourhood_and_street(49.60005, 6.12001)["street"] == "Avenue de la Gare"
+    assert geocoder.get_neighbourhood_and_street(49.60025, 6.12) == {
+        "street": "Rue de Strasbourg", "postcode": "2560", "neighbourhood": "Gare"
+    }
+    # About 50 metres away from the closest address
+    assert geocoder.get_neighbourhood_and_street(49.6116, 6.1326) is None
+
+def test_nearest_address_matches_exhaustive_search():
+    random = Random(42)
+    points = [
+        {"latitude": 49.58 + random.random() * 0.05, "longitude": 6.09 + random.random() * 0.08,
+         "street": str(index), "postcode": None, "neighbourhood": None}
+        for index in range(2000)
+    ]
+    geocoder = OfflineReverseGeocoder(points, max_distance_meters=100)
+
+    for _ in range(200):
+        latitude, longitude = 49.58 + random.random() * 0.05, 6.09 + random.random() * 0.08
+        x, y = geocoder.project(latitude, longitude)
+        distances = [((px - x) ** 2 + (py - y) ** 2) ** 0.5 for px, py in (geocoder.project(p["latitude"], p["longitude"]) for p in points)]
+        closest_distance = min(distances)
+        nearest = geocoder.get_nearest(latitude, longitude)
+
+        if closest_distance > 100:
+            assert nearest is None
+        else:
+            assert nearest[1] == pytest.approx(closest_distance)
+
+def test_geocoder_service_falls_back_to_remote_api_on_miss(dataset_path: str):
+    requests_session = Mock()
+    requests_session.get.return_value = SimpleNamespace(
+        raise_for_status=lambda: None,
+        json=lambda: {"address": {"country_code": "lu", "road": "Remote road", "postcode": "L-1999"}}
+    )
+    geocoder_service = GeocoderService(
+        {"GEOCODE_REQUEST_URI_TEMPLATE": "https://geocoder.test/?lat=$LAT&lon=$LON&key=$API_KEY"},
+        requests_session,
+        OfflineReverseGeocoder.from_geojson(dataset_path)
+    )
+
+    offline_result = geocoder_service.get_neighbourhood_and_street(49.6, 6.12)
+    remote_result = geocoder_service.get_neighbourhood_and_street(49.5, 6.0)
+
+    assert offline_result == {"street": "Avenue de la Gare", "postcode": "1611", "neighbourhood": "Gare"}
+    assert remote_result["street"] == "Remote road"
+    assert remote_result["postcode"] == "1999"
+    requests_session.get.assert_called_once()
+
+def test_no_offline_geocoder_without_dataset():
+    assert OfflineReverseGeocoder.from_config({"GEOCODE_OFFLINE_DATASET": ""}) is None
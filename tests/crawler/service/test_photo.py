@@ -0,0 +1,117 @@
+import pytest
+
+from base64 import b64encode
+from io import BytesIO
+from os import listdir
+from PIL import Image
+
+from py_reportit.crawler.service.photo import PhotoFormat, PhotoService, PhotoSize, open_downscaled, save_atomically
+
+
+def build_jpeg(width: int, height: int, orientation: int = 1) -> bytes:
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buffer, format="JPEG", exif=exif)
+
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def photo_service(tmp_path) -> PhotoService:
+    return PhotoService({"PHOTO_DOWNLOAD_FOLDER": str(tmp_path), "PHOTO_DOWNLOAD_QUALITY": 70, "PHOTO_WORKERS": 2})
+
+
+def test_open_downscaled__decodes_jpegs_at_reduced_size():
+    photo = open_downscaled(build_jpeg(4800, 3200), max_size=1200)
+
+    # The largest power of two scale that still covers 1200 x 1200
+    assert photo.size == (2400, 1600)
+
+
+def test_process_base64_photo__resizes_and_applies_exif_orientation(photo_service: PhotoService, tmp_path):
+    photo_service.process_base64_photo(1, b64encode(build_jpeg(3000, 2000, orientation=6)).decode())
+
+    with Image.open(tmp_path / "1.jpg") as photo:
+        assert photo.size == (800, 1200)
+
+    assert sorted(listdir(tmp_path)) == ["1.jpg", "1_medium.jpg", "1_thumbnail.jpg"]
+
+
+def test_process_base64_photo__saves_derivatives(tmp_path):
+    photo_service = PhotoService({"PHOTO_DOWNLOAD_FOLDER": str(tmp_path), "PHOTO_DOWNLOAD_QUALITY": 70, "PHOTO_WEBP": 1})
+    photo_service.process_base64_photo(1, b64encode(build_jpeg(3000, 2000)).decode())
+
+    for size, expected_size in [(PhotoSize.THUMBNAIL, (320, 214)), (PhotoSize.MEDIUM, (640, 427)), (PhotoSize.FULL, (1200, 800))]:
+        for photo_format in PhotoFormat:
+            with Image.open(photo_service.get_photo_path(1, size, photo_format)) as photo:
+                assert photo.size == expected_size
+                assert photo.format == photo_format.name
+
+    assert (tmp_path / "1_thumbnail.webp").stat().st_size < (tmp_path / "1.jpg").stat().st_size / 5
+
+
+def test_get_servable_photo__falls_back_to_full_size_jpeg(photo_service: PhotoService, tmp_path):
+    save_atomically(Image.new("RGB", (10, 10)), str(tmp_path / "1.jpg"), 70)
+
+    assert photo_service.get_servable_photo(1, PhotoSize.THUMBNAIL, PhotoFormat.WEBP) == (str(tmp_path / "1.jpg"), PhotoFormat.JPEG)
+    assert photo_service.get_servable_photo(2) is None
+
+
+def test_submit_missing_derivatives__keeps_existing_photos(photo_service: PhotoService, tmp_path):
+    save_atomically(Image.new("RGB", (1000, 500)), str(tmp_path / "1.jpg"), 70)
+    full_size_mtime = (tmp_path / "1.jpg").stat().st_mtime_ns
+
+    with photo_service.create_pool() as pool:
+        photo_service.submit_missing_derivatives(pool, 1).result()
+
+        assert photo_service.submit_missing_derivatives(pool, 1) is None
+        assert photo_service.submit_missing_derivatives(pool, 2) is None
+
+    assert sorted(listdir(tmp_path)) == ["1.jpg", "1_medium.jpg", "1_thumbnail.jpg"]
+    assert (tmp_path / "1.jpg").stat().st_mtime_ns == full_size_mtime
+
+
+def test_save_atomically__keeps_previous_photo_if_saving_fails(tmp_path):
+    filename = str(tmp_path / "1.jpg")
+    save_atomically(Image.new("RGB", (10, 10)), filename, 70)
+
+    with pytest.raises(OSError):
+        save_atomically(Image.new("RGBA", (10, 10)), filename, 70)
+
+    assert listdir(tmp_path) == ["1.jpg"]
+    assert (tmp_path / "1.jpg").stat().st_mode & 0o777 == 0o644
+
+    with Image.open(filename) as photo:
+        assert photo.size == (10, 10)
+
+
+def test_submit_base64_photo_if_not_downloaded_yet__processes_photos_in_pool(photo_service: PhotoService, tmp_path):
+    photo = b64encode(build_jpeg(2400, 1600)).decode()
+
+    with photo_service.create_pool() as pool:
+        futures = [photo_service.submit_base64_photo_if_not_downloaded_yet(pool, report_id, photo) for report_id in range(3)]
+
+        for future in futures:
+            future.result()
+
+        assert photo_service.submit_base64_photo_if_not_downloaded_yet(pool, 0, photo) is None
+
+    assert sorted(listdir(tmp_path)) == [f"{report_id}{suffix}.jpg" for report_id in range(3) for suffix in ["", "_medium", "_thumbnail"]]
+
+
+def test_spooled_photos_are_processed_and_removed(photo_service: PhotoService, tmp_path):
+    photo = b64encode(build_jpeg(2400, 1600)).decode()
+    spool_path = photo_service.spool_base64_photo_if_not_downloaded_yet(1, photo)
+
+    assert spool_path == str(tmp_path / "1.spool")
+    assert photo_service.photo_pending_for_report_id(1)
+
+    photo_service.process_spooled_photo(1, spool_path)
+    # A retried task finds nothing left to do
+    photo_service.process_spooled_photo(1, spool_path)
+
+    assert not photo_service.photo_pending_for_report_id(1)
+    assert sorted(listdir(tmp_path)) == ["1.jpg", "1_medium.jpg", "1_thumbnail.jpg"]
+    assert photo_service.spool_base64_photo_if_not_downloaded_yet(1, photo) is None
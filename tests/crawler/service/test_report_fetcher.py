@@ -0,0 +1,143 @@
+import asyncio
+import httpx
+import pytest
+
+from urllib.parse import parse_qs
+
+from py_reportit.crawler.service.reportit_api import ReportFetchException
+from py_reportit.shared.config.async_http_client import AsyncCrawlerClient
+from py_reportit.shared.config.container import Container
+
+
+ANSWER_URL = "https://reportit.test/frame/search.php"
+
+UNPACED_CONFIG = {"CRAWLER_REQUESTS_PER_SECOND": 1000, "CRAWLER_REQUESTS_BURST": 1000}
+
+FORM_PAGE = """
+<form method="post">
+    <input type="text" name="search_id" required>
+    <input type="hidden" name="nonce_field" value="fresh_nonce">
+</form>
+"""
+
+
+class FakeReportItSite:
+    """Serves the report retrieval form, and report pages for known ids if the submitted nonce is valid."""
+
+    def __init__(self, existing_ids: set[int], valid_nonce: str = "fresh_nonce", failing_ids: set[int] = set()):
+        self.existing_ids = existing_ids
+        self.valid_nonce = valid_nonce
+        self.failing_ids = failing_ids
+        self.form_requests = 0
+        self.submissions = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            self.form_requests += 1
+            return httpx.Response(200, text=FORM_PAGE)
+
+        self.submissions += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        form = {key: values[0] for key, values in parse_qs(request.content.decode()).items()}
+        report_id = int(form["search_id"])
+
+        if report_id in self.failing_ids:
+            return httpx.Response(500)
+
+        if form.get("nonce_field") == self.valid_nonce and report_id in self.existing_ids:
+            return httpx.Response(200, text=f"<p>Report {report_id}</p><p>Sent on : 01.01.2024 12:00</p>")
+
+        return httpx.Response(200, text=f"<p>Report {report_id} could not be found</p>")
+
+
+@pytest.fixture
+def container() -> Container:
+    return Container(config={"FETCH_REPORTS_TIMEOUT_SECONDS": 1, "REPORTIT_API_ANSWER_URL": ANSWER_URL})
+
+
+def build_fetcher(container: Container, site: FakeReportItSite):
+    client_factory = lambda: AsyncCrawlerClient(
+        {**UNPACED_CONFIG, "USE_SCRAPER_API": 0},
+        httpx.AsyncClient(transport=httpx.MockTransport(site.handle))
+    )
+
+    return container.async_report_fetcher(client_factory=client_factory)
+
+
+def test_fetch_many__bounds_concurrency_and_reuses_validated_nonces(container: Container):
+    site = FakeReportItSite(existing_ids=set(range(1, 21)))
+    fetcher = build_fetcher(container, site)
+
+    pages = asyncio.run(fetcher.fetch_many(range(1, 21), concurrency=4))
+
+    assert sorted(pages) == list(range(1, 21))
+    assert all("Sent on :" in page for page in pages.values())
+    assert site.form_requests == 1
+    assert site.submissions == 20
+    assert 1 < site.max_in_flight <= 4
+    assert fetcher.nonce_service.get_counters()["fetched"] == 1
+
+
+def test_fetch_many__refreshes_rejected_cached_nonces(container: Container):
+    site = FakeReportItSite(existing_ids={1, 2})
+    fetcher = build_fetcher(container, site)
+    fetcher.nonce_service.cache_tokens({"report_id_input_field_name": "search_id", "nonces": {"nonce_field": "stale"}})
+
+    pages = asyncio.run(fetcher.fetch_many([1, 2], concurrency=1))
+
+    assert all("Sent on :" in page for page in pages.values())
+    assert site.form_requests == 1
+    assert fetcher.nonce_service.get_counters()["rejected"] == 1
+    assert fetcher.nonce_service.get_cached_tokens()["nonces"] == {"nonce_field": "fresh_nonce"}
+
+
+def test_fetch_many__returns_failures_in_place_of_pages(container: Container):
+    site = FakeReportItSite(existing_ids={1, 2, 3}, failing_ids={2})
+    fetcher = build_fetcher(container, site)
+
+    pages = asyncio.run(fetcher.fetch_many([1, 2, 3], concurrency=2))
+
+    assert "Sent on :" in pages[1] and "Sent on :" in pages[3]
+    assert isinstance(pages[2], ReportFetchException)
+
+
+def test_pre_fetched_pages_are_parsed_without_fetching(monkeypatch, container: Container):
+    reportit_service = container.reportit_service()
+    monkeypatch.setattr(reportit_service, "fetch_report_page", lambda reportId: pytest.fail("Page was fetched"))
+
+    with pytest.raises(Exception, match="No report found with id 5"):
+        reportit_service.get_report_with_answers(5, pre_fetched_page="<p>Report 5 could not be found</p>")
+
+
+def test_async_client__rewrites_urls_for_scraper_api_and_retries():
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(503 if len(requests) == 1 else 200, text="ok")
+
+    client = AsyncCrawlerClient(
+        {**UNPACED_CONFIG, "USE_SCRAPER_API": 1, "SCRAPER_API_BASE_URLS": "https://scraper.test/api?key=secret"},
+        httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    )
+
+    async def fetch():
+        async with client:
+            return await client.crawler_get(ANSWER_URL, params={"session_number": 1})
+
+    response = asyncio.run(fetch())
+
+    assert response.status_code == 200
+    assert len(requests) == 2
+    assert requests[-1].url.host == "scraper.test"
+    assert parse_qs(requests[-1].url.query.decode()) == {
+        "session_number": ["1"],
+        "key": ["secret"],
+        "url": [ANSWER_URL],
+    }
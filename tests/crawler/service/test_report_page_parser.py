@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from py_reportit.crawler.service.report_page_parser import SoupReportPageParser
+from resources.report_finished_without_photo_with_answer import REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER
+from resources.report_finished_with_photo_with_answers import REPORT_FINISHED_WITH_PHOTO_WITH_ANSWERS
+
+
+def test_parse__finished_with_photo_with_answers():
+    parsed_page = SoupReportPageParser().parse(REPORT_FINISHED_WITH_PHOTO_WITH_ANSWERS)
+
+    assert parsed_page["title"] == "arbre tombé"
+    assert parsed_page["description"] == "E Bam ass emgefal teschet Neiduerf a Cents."
+    assert parsed_page["status"] == "finished"
+    assert parsed_page["created_at"] == datetime(2024, 2, 23, 10, 2)
+    assert parsed_page["has_photo"] == True
+    assert parsed_page["base64_photo"].startswith("/9j/")
+
+    assert len(parsed_page["answers"]) == 2
+    assert parsed_page["answers"][0]["author"] == "Service Forêts"
+    assert parsed_page["answers"][0]["closing"] == False
+    assert parsed_page["answers"][1]["closing"] == True
+
+def test_parse__without_photo():
+    parsed_page = SoupReportPageParser().parse(REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER)
+
+    assert parsed_page["has_photo"] == False
+    assert parsed_page["base64_photo"] == None
+    assert len(parsed_page["answers"]) == 1
+
+def test_unknown_backend_falls_back_to_default():
+    parser = SoupReportPageParser("does-not-exist")
+
+    assert parser.features == SoupReportPageParser.DEFAULT_FEATURES
+    assert parser.parse(REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER)["title"] == "title"
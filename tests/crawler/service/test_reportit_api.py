@@ -251,94 +251,101 @@ def test_extract_nonces(container: Container):
     assert nonce == {"search_id_9ea5f12ccf149a827a9267791169e67c": "6581d20c50b93b05b0a2011fd32364e8"}
 
 
-# def test_fetch_report_page(container: Container):
-#     # Cache empty, successful page fetch
-#     r_session_mock = Mock()
-#     r_session_mock.crawler_get.return_value = build_response_mock(REPORT_RETRIEVAL_FORM_PAGE)
-#     r_session_mock.crawler_post.return_value = build_response_mock(REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER)
-#
-#     with container.requests_session.override(r_session_mock):
-#         reportit_service = container.reportit_service()
-#
-#         response = reportit_service.fetch_report_page(392)
-#
-#     r_session_mock.crawler_get.assert_called_once_with(None, params={"session_number": 392})
-#     r_session_mock.crawler_post.assert_called_once_with(
-#         None,
-#         {"search_id": 392, "search_id0": "aa3397b33358a2c43898ec7ac22e6443", "session_number": 392},
-#         timeout=1
-#     )
-#     assert response.text == REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER
-#
-#     # Cache full, successful page fetch
-#     r_session_mock = Mock()
-#     r_session_mock.crawler_get.return_value = build_response_mock(REPORT_RETRIEVAL_FORM_PAGE)
-#     r_session_mock.crawler_post.return_value = build_response_mock(REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER)
-#
-#     with container.requests_session.override(r_session_mock):
-#         reportit_service = container.reportit_service()
-#
-#         response = reportit_service.fetch_report_page(392)
-#
-#     r_session_mock.crawler_get.assert_not_called()
-#     r_session_mock.crawler_post.assert_called_once_with(
-#         None,
-#         {"search_id": 392, "search_id0": "aa3397b33358a2c43898ec7ac22e6443", "session_number": 392},
-#         timeout=1
-#     )
-#     assert response.text == REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER
-#
-#     # Cache full, unsuccessful page fetch at first try
-#     r_session_mock = Mock()
-#     r_session_mock.crawler_get.return_value = build_response_mock(REPORT_RETRIEVAL_FORM_PAGE)
-#     r_session_mock.crawler_post.side_effect = [
-#         build_response_mock(None, 204),
-#         build_response_mock(REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER, 200)
-#     ]
-#
-#     with container.requests_session.override(r_session_mock):
-#         reportit_service = container.reportit_service()
-#
-#         response = reportit_service.fetch_report_page(392)
-#
-#     r_session_mock.crawler_get.assert_called_once_with(None, params={"session_number": 392})
-#     r_session_mock.crawler_post.has_calls([
-#         call(
-#             None,
-#             {"search_id": 392, "search_id0": "aa3397b33358a2c43898ec7ac22e6443", "session_number": 392},
-#             timeout=1
-#         ),
-#         call(
-#             None,
-#             {"search_id": 392, "search_id0": "aa3397b33358a2c43898ec7ac22e6443", "session_number": 392},
-#             timeout=1
-#         )
-#     ], any_order=False)
-#     assert r_session_mock.crawler_post.call_count == 2
-#     assert response.text == REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER
-#
-#     # Cache full, unsuccessful page fetch at first and second try
-#     r_session_mock = Mock()
-#     r_session_mock.crawler_get.return_value = build_response_mock(REPORT_RETRIEVAL_FORM_PAGE)
-#     r_session_mock.crawler_post.return_value = build_response_mock(None, 204)
-#
-#     with container.requests_session.override(r_session_mock):
-#         reportit_service = container.reportit_service()
-#
-#         with pytest.raises(ReportFetchException):
-#             reportit_service.fetch_report_page(392)
-#
-#     r_session_mock.crawler_get.assert_called_once_with(None, params={"session_number": 392})
-#     r_session_mock.crawler_post.has_calls([
-#         call(
-#             None,
-#             {"search_id": 392, "search_id0": "aa3397b33358a2c43898ec7ac22e6443", "session_number": 392},
-#             timeout=1
-#         ),
-#         call(
-#             None,
-#             {"search_id": 392, "search_id0": "aa3397b33358a2c43898ec7ac22e6443", "session_number": 392},
-#             timeout=1
-#         )
-#     ], any_order=False)
-#     assert r_session_mock.crawler_post.call_count == 2
+EXPECTED_FORM_DATA = {
+    "search_id": 392,
+    "search_id_9ea5f12ccf149a827a9267791169e67c": "6581d20c50b93b05b0a2011fd32364e8",
+    "session_number": 392
+}
+
+REPORT_NOT_FOUND_PAGE = "<p>Report 392 could not be found</p>"
+
+
+def test_fetch_report_page__caches_validated_nonces(container: Container):
+    r_session_mock = Mock()
+    r_session_mock.crawler_get.return_value = build_response_mock(REPORT_RETRIEVAL_FORM_PAGE)
+    r_session_mock.crawler_post.return_value = build_response_mock(REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER)
+
+    with container.requests_session.override(r_session_mock):
+        reportit_service = container.reportit_service()
+
+        first_response = reportit_service.fetch_report_page(392)
+        second_response = reportit_service.fetch_report_page(392)
+
+    r_session_mock.crawler_get.assert_called_once_with(None, params={"session_number": 392})
+    r_session_mock.crawler_post.assert_has_calls([call(None, EXPECTED_FORM_DATA, timeout=1)] * 2)
+    assert first_response.text == second_response.text == REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER
+    assert reportit_service.nonce_service.get_counters() == {"reused": 1, "fetched": 1, "rejected": 0}
+
+
+def test_fetch_report_page__does_not_cache_unvalidated_nonces(container: Container):
+    r_session_mock = Mock()
+    r_session_mock.crawler_get.return_value = build_response_mock(REPORT_RETRIEVAL_FORM_PAGE)
+    r_session_mock.crawler_post.return_value = build_response_mock(REPORT_NOT_FOUND_PAGE)
+
+    with container.requests_session.override(r_session_mock):
+        reportit_service = container.reportit_service()
+
+        reportit_service.fetch_report_page(392)
+        response = reportit_service.fetch_report_page(392)
+
+    # Fresh nonces are trusted, the report does not exist
+    assert r_session_mock.crawler_get.call_count == 2
+    assert r_session_mock.crawler_post.call_count == 2
+    assert response.text == REPORT_NOT_FOUND_PAGE
+    assert reportit_service.nonce_service.get_counters() == {"reused": 0, "fetched": 2, "rejected": 0}
+
+
+def test_fetch_report_page__refreshes_rejected_cached_nonces(container: Container):
+    r_session_mock = Mock()
+    r_session_mock.crawler_get.return_value = build_response_mock(REPORT_RETRIEVAL_FORM_PAGE)
+    r_session_mock.crawler_post.side_effect = [
+        build_response_mock(REPORT_NOT_FOUND_PAGE),
+        build_response_mock(REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER),
+    ]
+
+    with container.requests_session.override(r_session_mock):
+        reportit_service = container.reportit_service()
+        reportit_service.nonce_service.cache_tokens({"report_id_input_field_name": "search_id", "nonces": {"stale": "1"}})
+
+        response = reportit_service.fetch_report_page(392)
+
+    r_session_mock.crawler_get.assert_called_once_with(None, params={"session_number": 392})
+    r_session_mock.crawler_post.assert_has_calls([
+        call(None, {"search_id": 392, "stale": "1", "session_number": 392}, timeout=1),
+        call(None, EXPECTED_FORM_DATA, timeout=1),
+    ])
+    assert response.text == REPORT_FINISHED_WITHOUT_PHOTO_WITH_ANSWER
+    assert reportit_service.nonce_service.get_cached_tokens()["nonces"] == {
+        "search_id_9ea5f12ccf149a827a9267791169e67c": "6581d20c50b93b05b0a2011fd32364e8"
+    }
+
+
+def test_fetch_report_page__raises_if_retry_fails(container: Container):
+    r_session_mock = Mock()
+    r_session_mock.crawler_get.return_value = build_response_mock(REPORT_RETRIEVAL_FORM_PAGE)
+    r_session_mock.crawler_post.return_value = build_response_mock(None, 204)
+
+    with container.requests_session.override(r_session_mock):
+        reportit_service = container.reportit_service()
+
+        with pytest.raises(ReportFetchException):
+            reportit_service.fetch_report_page(392)
+
+    assert r_session_mock.crawler_get.call_count == 2
+    assert r_session_mock.crawler_post.call_count == 2
+    assert reportit_service.nonce_service.get_cached_tokens() is None
+    assert reportit_service.nonce_service.get_counters()["rejected"] == 1
+
+def test_get_report_with_answers__parses_page_once(monkeypatch, container: Container):
+    reportit_service = container.reportit_service()
+
+    requests_mock = SimpleNamespace(text=REPORT_FINISHED_WITH_PHOTO_WITH_ANSWERS)
+    monkeypatch.setattr(reportit_service, "fetch_report_page", lambda reportId: requests_mock)
+
+    parse_mock = Mock(wraps=reportit_service.report_page_parser.parse)
+    monkeypatch.setattr(reportit_service.report_page_parser, "parse", parse_mock)
+
+    report = reportit_service.get_report_with_answers(28931)
+
+    assert len(report.answers) == 2
+    parse_mock.assert_called_once()
@@ -0,0 +1,108 @@
+import gzip
+import json
+import os
+import pytest
+
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from py_reportit.crawler.service.snapshot import SnapshotService
+from py_reportit.shared.model import *
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.report import Report
+from py_reportit.shared.model.report_answer import ReportAnswer
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    orm_base.Base.metadata.create_all(engine)
+
+    with sessionmaker(engine)() as session:
+        for report_id in range(1, 4):
+            session.add(Report(
+                id=report_id, title=f"Report {report_id}", status="accepted", content_hash=str(report_id),
+                created_at=datetime(2024, 1, 1), meta=Meta(),
+                answers=[ReportAnswer(order=0, author="Service", text="Merci", created_at=datetime(2024, 1, 2))],
+            ))
+
+        session.commit()
+
+        yield session
+
+@pytest.fixture
+def snapshot_service(tmp_path) -> SnapshotService:
+    # Partitions of reports 0 - 1 and 2 - 3
+    return SnapshotService({"SNAPSHOT_FOLDER": str(tmp_path), "SNAPSHOT_PARTITION_SIZE": 2})
+
+def read_snapshot(snapshot_service: SnapshotService, table_name: str) -> list[dict]:
+    rows = []
+
+    for name, file in sorted(snapshot_service.get_manifest()["files"].items()):
+        if file["table"] == table_name:
+            with gzip.open(snapshot_service.get_path(file["filename"])) as snapshot_file:
+                rows.extend(json.loads(line) for line in snapshot_file)
+
+    return rows
+
+def test_write_snapshots_dumps_all_tables(session, snapshot_service: SnapshotService):
+    assert snapshot_service.write_snapshots(session)
+
+    manifest = snapshot_service.get_manifest()
+    reports = read_snapshot(snapshot_service, "reports")
+
+    assert {name: file["row_count"] for name, file in manifest["files"].items()} == {
+        "reports.00000": 1, "report_answers.00000": 1, "metas.00000": 1,
+        "reports.00001": 2, "report_answers.00001": 2, "metas.00001": 2,
+    }
+    assert reports[0]["title"] == "Report 1"
+    assert reports[0]["created_at"] == "2024-01-01 00:00:00"
+    assert read_snapshot(snapshot_service, "report_answers")[2]["report_id"] == 3
+
+def test_unchanged_data_is_not_dumped_again(session, snapshot_service: SnapshotService):
+    snapshot_service.write_snapshots(session)
+
+    assert not snapshot_service.write_snapshots(session)
+
+def test_changed_data_replaces_previous_snapshot_of_its_partition_only(session, snapshot_service: SnapshotService, tmp_path):
+    snapshot_service.write_snapshots(session)
+    previous_files = snapshot_service.get_manifest()["files"]
+
+    session.query(Meta).filter(Meta.report_id == 3).one().address_street = "Rue de Hollerich"
+    session.commit()
+
+    assert snapshot_service.write_snapshots(session)
+
+    files = snapshot_service.get_manifest()["files"]
+
+    assert read_snapshot(snapshot_service, "metas")[2]["address_street"] == "Rue de Hollerich"
+    assert [name for name in files if files[name] != previous_files[name]] == [
+        "reports.00001", "report_answers.00001", "metas.00001"
+    ]
+    assert not os.path.exists(tmp_path / previous_files["metas.00001"]["filename"])
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [file["filename"] for file in snapshot_service.get_manifest()["files"].values()] + ["manifest.json"]
+    )
+
+def test_every_dumped_meta_column_is_fingerprinted(session, snapshot_service: SnapshotService):
+    snapshot_service.write_snapshots(session)
+
+    session.query(Meta).filter(Meta.report_id == 1).one().tweeted = True
+    session.commit()
+
+    assert snapshot_service.write_snapshots(session)
+    assert read_snapshot(snapshot_service, "metas")[0]["tweeted"] is True
+
+def test_removed_reports_drop_their_partition(session, snapshot_service: SnapshotService):
+    snapshot_service.write_snapshots(session)
+
+    for table, report_id_column in [
+        (ReportAnswer.__table__, ReportAnswer.report_id), (Meta.__table__, Meta.report_id), (Report.__table__, Report.id)
+    ]:
+        session.execute(table.delete().where(report_id_column > 1))
+
+    session.commit()
+
+    assert snapshot_service.write_snapshots(session)
+    assert sorted(snapshot_service.get_manifest()["files"]) == ["metas.00000", "report_answers.00000", "reports.00000"]
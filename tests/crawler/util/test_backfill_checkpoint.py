@@ -0,0 +1,25 @@
+import json
+
+from py_reportit.crawler.util.backfill_checkpoint import BackfillCheckpoint
+
+
+def test_checkpoint_resumes_settled_ids(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+
+    checkpoint = BackfillCheckpoint(path, 1, 5, save_every=2)
+    checkpoint.mark(1, "success")
+    checkpoint.mark(3, "not_found")
+
+    resumed = BackfillCheckpoint(path, 1, 5)
+    resumed.load()
+
+    assert resumed.pending_ids() == [2, 4, 5]
+
+def test_checkpoint_for_other_range_is_ignored(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    path.write_text(json.dumps({"start_id": 10, "end_id": 20, "settled": {"11": "success"}}))
+
+    checkpoint = BackfillCheckpoint(str(path), 1, 3)
+    checkpoint.load()
+
+    assert checkpoint.pending_ids() == [1, 2, 3]
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from py_reportit.crawler.util.reportit_utils import *
 from py_reportit.shared.model.report import Report
 
@@ -74,3 +76,45 @@ def test_is_last_in_reports_data():
     not_existing_report = Report(id=3, title="doesnt", description="exist")
 
     assert not is_last_in_reports_data(not_existing_report, reports_data)
+
+def test_reports_data_index_find():
+    reports_data = [
+        {
+            "title": "a",
+            "description": "b"
+        },
+        {
+            "title": "ti\ntle",
+            "description": "Public\nlight\tnot\rworking"
+        },
+        {
+            "title": "title",
+            "description": "Public light not working!"
+        }
+    ]
+
+    index = ReportsDataIndex(reports_data)
+
+    assert index.find("title", "Public light not working") is reports_data[1]
+    assert find_in_reports_data("title", "Public light not working", index) is reports_data[1]
+    assert find_in_reports_data("title", "Public light not working", reports_data) is reports_data[1]
+    assert index.find("doesnt", "exist") is None
+    assert index.find(None, None) is None
+    assert len(index) == 3
+
+def test_is_last_in_reports_data_with_index():
+    index = ReportsDataIndex([{"title": "c", "description": "d"}, {"title": "a", "description": "b"}])
+
+    assert is_last_in_reports_data(Report(id=1, title="a", description="b"), index)
+    assert not is_last_in_reports_data(Report(id=2, title="c", description="d"), index)
+    assert not is_last_in_reports_data(Report(id=3, title="c", description="d"), ReportsDataIndex([]))
+
+def test_report_content_hash_ignores_coordinate_representation():
+    stored = Report(id=1, title="a", description="b", status="accepted", latitude=Decimal("49.603098"), longitude=Decimal("6.132450"))
+    fetched = Report(id=1, title="a", description="b", status="accepted", latitude="49.603098302908904", longitude="6.132449755187587")
+
+    assert report_content_hash(stored) == report_content_hash(fetched)
+
+    fetched.status = "finished"
+
+    assert report_content_hash(stored) != report_content_hash(fetched)
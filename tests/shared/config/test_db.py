@@ -0,0 +1,34 @@
+from py_reportit.shared.config.db import Database
+
+
+db_kwargs = {
+    "db_user": "user",
+    "db_password": "password",
+    "db_host": "localhost",
+    "db_port": 3306,
+    "db_database": "py_reportit_bot",
+}
+
+def test_database_pool_defaults():
+    database = Database(log_db=0, **db_kwargs)
+
+    assert database.engine.pool.size() == Database.DEFAULT_POOL_SIZE
+    assert database.engine.pool._max_overflow == Database.DEFAULT_MAX_OVERFLOW
+    assert database.engine.pool._pre_ping == True
+
+def test_database_pool_from_config_strings():
+    database = Database(
+        log_db="0",
+        pool_size="20",
+        max_overflow="0",
+        pool_timeout="5",
+        pool_recycle="100",
+        pool_pre_ping="0",
+        **db_kwargs
+    )
+
+    assert database.engine.pool.size() == 20
+    assert database.engine.pool._max_overflow == 0
+    assert database.engine.pool._timeout == 5
+    assert database.engine.pool._recycle == 100
+    assert database.engine.pool._pre_ping == False
@@ -0,0 +1,102 @@
+import pytest
+import requests
+
+from collections import Counter
+from types import SimpleNamespace
+
+from py_reportit.shared.config.requests_session import UpstreamGuard
+from py_reportit.shared.util.circuit_breaker import CircuitOpenException
+
+
+SCRAPER_A = "https://scraper-a.test/api?key=a"
+SCRAPER_B = "https://scraper-b.test/api?key=b"
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def guard(clock: FakeClock) -> UpstreamGuard:
+    return UpstreamGuard(
+        {
+            "SCRAPER_API_BASE_URLS": f"{SCRAPER_A},{SCRAPER_B}",
+            "CRAWLER_REQUESTS_PER_SECOND": 2,
+            "CRAWLER_REQUESTS_BURST": 1,
+            "CIRCUIT_BREAKER_FAILURE_THRESHOLD": 2,
+            "CIRCUIT_BREAKER_RESET_SECONDS": 30,
+        },
+        clock=clock,
+        sleeper=clock.sleep
+    )
+
+
+def respond(status_code: int):
+    return lambda: SimpleNamespace(status_code=status_code)
+
+
+def test_requests_are_paced_per_upstream(guard: UpstreamGuard, clock: FakeClock):
+    guard.send("https://reportit.test/a", respond(200))
+    guard.send(SCRAPER_A, respond(200))
+
+    assert clock.sleeps == []
+
+    guard.send("https://reportit.test/b", respond(200))
+
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+def test_failing_upstream_is_cut_off_until_reset(guard: UpstreamGuard, clock: FakeClock):
+    def fail():
+        raise requests.ConnectionError()
+
+    guard.send(SCRAPER_A, respond(503))
+
+    with pytest.raises(requests.ConnectionError):
+        guard.send(SCRAPER_A, fail)
+
+    with pytest.raises(CircuitOpenException):
+        guard.send(SCRAPER_A, respond(200))
+
+    clock.now += 30
+
+    assert guard.send(SCRAPER_A, respond(200)).status_code == 200
+    assert guard.get_upstream(SCRAPER_A).health == 1
+
+def test_scraper_apis_are_chosen_by_health(guard: UpstreamGuard):
+    guard.send(SCRAPER_A, respond(500))
+
+    picks = Counter(guard.choose_scraper_api() for _ in range(3000))
+
+    # Halved health and a raised error rate, weights of 0.35 and 1
+    assert 0.22 < picks[SCRAPER_A] / 3000 < 0.30
+
+    guard.send(SCRAPER_A, respond(500))
+
+    assert {guard.choose_scraper_api() for _ in range(100)} == {SCRAPER_B}
+
+    guard.send(SCRAPER_B, respond(429))
+    guard.send(SCRAPER_B, respond(429))
+
+    with pytest.raises(CircuitOpenException):
+        guard.choose_scraper_api()
+
+def test_scraper_api_entries_on_the_same_host_are_separate_upstreams(clock: FakeClock):
+    guard = UpstreamGuard({"SCRAPER_API_BASE_URLS": "https://scraper.test/?key=a,https://scraper.test/?key=b"}, clock=clock)
+
+    assert guard.get_upstream("https://scraper.test/?key=a") is not guard.get_upstream("https://scraper.test/?key=b")
+    assert guard.get_upstream("https://reportit.test/a") is guard.get_upstream("https://reportit.test/b")
@@ -0,0 +1,128 @@
+import pytest
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep, monotonic
+from typing import Iterable
+
+from py_reportit.shared.config.requests_session import get_requests_session, get_upstream_guard
+from py_reportit.shared.config.scraper_endpoint_pool import ScraperEndpointPool, SelectionPolicy
+
+
+class ScraperApiStandIn(BaseHTTPRequestHandler):
+    """Local scraper API with a fast, a slow and a broken endpoint."""
+
+    def do_GET(self):
+        if self.path.startswith("/broken"):
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        if self.path.startswith("/slow"):
+            sleep(0.05)
+
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def scraper_api_url() -> Iterable[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScraperApiStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for(condition, timeout_seconds: float = 5) -> None:
+    deadline = monotonic() + timeout_seconds
+
+    while not condition():
+        assert monotonic() < deadline, "Condition not met in time"
+        sleep(0.01)
+
+
+def test_least_latency_policy_tries_unmeasured_endpoints_first():
+    pool = ScraperEndpointPool(["a", "b"], lambda url: 1, policy=SelectionPolicy.LEAST_LATENCY)
+    pool.record("a", 0.5, True)
+
+    assert pool.choose() == "b"
+
+    pool.record("b", 1.5, True)
+
+    assert pool.choose() == "a"
+
+def test_unavailable_endpoints_are_never_chosen():
+    health = {"a": 1, "b": 0}
+    pool = ScraperEndpointPool(["a", "b"], health.get)
+    pool.record("b", 0.01, True)
+
+    assert {pool.choose() for _ in range(50)} == {"a"}
+
+    health["a"] = 0
+
+    assert pool.choose() is None
+
+def test_weighted_policy_favours_cheap_and_reliable_endpoints():
+    pool = ScraperEndpointPool(["cheap", "expensive", "flaky"], lambda url: 1, costs=[1, 10, 1])
+
+    for url in pool.base_urls:
+        pool.record(url, 0.2, True)
+
+    pool.record("flaky", None, False)
+    pool.record("flaky", None, False)
+
+    picks = [pool.choose() for _ in range(2000)]
+
+    assert picks.count("cheap") > picks.count("flaky") > picks.count("expensive")
+    assert pool.get_stats()["expensive"]["total_cost"] == 10
+    assert pool.get_stats()["flaky"]["error_rate"] == pytest.approx(0.51)
+
+def test_background_probes_measure_endpoints_and_open_circuits(scraper_api_url: str):
+    fast, slow, broken = (f"{scraper_api_url}/{name}?key=secret" for name in ["fast", "slow", "broken"])
+    config = {
+        "USE_SCRAPER_API": 1,
+        "SCRAPER_API_BASE_URLS": f"{fast},{slow},{broken}",
+        "SCRAPER_API_SELECTION_POLICY": "least_latency",
+        "SCRAPER_API_PROBE_INTERVAL_SECONDS": 0.02,
+        "SCRAPER_API_PROBE_URL": "https://reportit.test/",
+        "CRAWLER_REQUESTS_PER_SECOND": 1000,
+        "CRAWLER_REQUESTS_BURST": 1000,
+        "CIRCUIT_BREAKER_FAILURE_THRESHOLD": 1,
+    }
+
+    guard_resource = get_upstream_guard(config)
+    guard = next(guard_resource)
+    session_resource = get_requests_session(config, guard)
+    session = next(session_resource)
+    prober = guard.scraper_endpoint_prober
+
+    try:
+        guard.start_probing()
+
+        # A single prober per guard, not sharing the crawl's session
+        assert guard.scraper_endpoint_prober is prober
+        assert guard.probe_session is not session
+
+        wait_for(lambda: all(stats["requests"] >= 3 for stats in guard.scraper_endpoint_pool.get_stats().values()))
+
+        stats = guard.scraper_endpoint_pool.get_stats()
+
+        assert stats[fast]["latency_seconds"] < stats[slow]["latency_seconds"]
+        assert stats[broken]["latency_seconds"] is None
+        assert stats[broken]["health"] == 0
+        assert {guard.choose_scraper_api() for _ in range(20)} == {fast}
+        assert session.crawler_get("https://reportit.test/").text == "ok"
+    finally:
+        next(session_resource, None)
+        next(guard_resource, None)
+
+    assert guard.scraper_endpoint_prober is None
+    assert not prober.thread
@@ -0,0 +1,151 @@
+import pytest
+
+from datetime import datetime
+from uuid import uuid4
+from unittest.mock import Mock
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import sessionmaker
+from sqlakeyset.paging import prepare_paging
+
+from py_reportit.shared.model import *
+from py_reportit.shared.model.answer_meta import ReportAnswerMeta
+from py_reportit.shared.model.category import Category
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.meta_category_vote import MetaCategoryVote
+from py_reportit.shared.model.report import Report
+from py_reportit.shared.model.report_answer import ReportAnswer
+from py_reportit.shared.repository.meta import MetaRepository
+from py_reportit.shared.repository.report import ReportRepository
+from py_reportit.web.schema.report import Report as ReportSchema
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    orm_base.Base.metadata.create_all(engine)
+
+    with sessionmaker(engine)() as session:
+        category = Category(id=1, label="Lighting")
+        session.add(category)
+
+        for report_id in range(1, 41):
+            session.add(Report(
+                id=report_id,
+                title=f"Report {report_id}",
+                description="Public light not working",
+                status="accepted",
+                created_at=datetime(2024, 1, 1),
+                updated_at=datetime(2024, 1, 2),
+                meta=Meta(id=report_id, category=category, vote_count=1,
+                          category_votes=[MetaCategoryVote(user_id=uuid4(), category=category)]),
+                answers=[
+                    ReportAnswer(order=order, author="Service", text="Merci", created_at=datetime(2024, 1, 2),
+                                 closing=False, meta=ReportAnswerMeta())
+                    for order in range(2)
+                ],
+            ))
+
+        session.commit()
+
+    return engine
+
+def count_queries_for_page(engine, page_size: int) -> int:
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+
+    try:
+        with sessionmaker(engine)() as session:
+            paged_reports = ReportRepository().get_paged(session, page_size=page_size)
+            serialized = [ReportSchema.model_validate(report) for report in paged_reports["page"]]
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(serialized) == page_size
+    assert serialized[0].meta.category.label == "Lighting"
+    assert serialized[0].service == "Service"
+
+    return len(statements)
+
+def test_get_paged_query_count_does_not_grow_with_page_size(engine):
+    assert count_queries_for_page(engine, 5) == count_queries_for_page(engine, 40)
+
+def test_search_falls_back_to_substring_matching(engine):
+    with sessionmaker(engine)() as session:
+        repository = ReportRepository()
+        paged_reports = repository.get_paged(session, page_size=5, or_cond=repository.build_search_conditions(session, "light"))
+
+        assert paged_reports["total_count"] == 40
+        assert repository.build_search_relevance(session, "light") is None
+
+def test_search_uses_fulltext_indexes_on_mysql():
+    session = Mock()
+    session.get_bind.return_value.dialect.name = "mysql"
+    repository = ReportRepository()
+
+    relevance = repository.build_search_relevance(session, "light")
+    statement = select(Report.id).where(*repository.build_search_conditions(session, "light")).order_by(relevance.desc())
+    compiled = str(statement.compile(dialect=mysql.dialect()))
+
+    assert "MATCH (report.title, report.description) AGAINST" in compiled
+    assert "MATCH (report_answer.text) AGAINST" in compiled
+
+def test_paged_query_can_be_ordered_by_relevance_on_mysql(engine):
+    mysql_session = Mock()
+    mysql_session.get_bind.return_value.dialect.name = "mysql"
+    repository = ReportRepository()
+
+    relevance = repository.build_search_relevance(mysql_session, "light")
+
+    with sessionmaker(engine)() as session:
+        query = repository.build_filter_query(
+            session, by=relevance, asc=False, or_cond=repository.build_search_conditions(mysql_session, "light")
+        )
+        paging = prepare_paging(query, 5, ((1.5, 3), False), False, True, mysql.dialect())
+
+    compiled = str(paging.query.statement.compile(dialect=mysql.dialect()))
+
+    assert "MATCH (report.title, report.description) AGAINST (%s) AS _sqlakeyset_oc_1" in compiled
+    assert "ORDER BY _sqlakeyset_oc_1 DESC, report.id DESC" in compiled
+
+def test_stream_all_loads_relationships_per_batch(engine):
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, context, executemany: statements.append(context)
+
+    event.listen(engine, "before_cursor_execute", listener)
+
+    try:
+        with sessionmaker(engine)() as session:
+            serialized = [ReportSchema.model_validate(report) for report in ReportRepository().stream_all(session, batch_size=7)]
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert [report.id for report in serialized] == list(range(1, 41))
+    assert serialized[-1].meta.category.label == "Lighting"
+    # One select for the reports and one per relationship, for each of the 6 batches of up to 7
+    assert len(statements) == 6 * (1 + 4)
+    # Results are buffered, MySQL can't run the relationship queries while a server side cursor is open
+    assert not any(context.execution_options.get("stream_results") for context in statements)
+
+def test_stream_all_descending(engine):
+    with sessionmaker(engine)() as session:
+        assert [report.id for report in ReportRepository().stream_all(session, batch_size=10, descending=True)] == list(range(40, 0, -1))
+
+def test_get_coordinates_in_range_and_update_many_by_id(engine):
+    with sessionmaker(engine)() as session:
+        session.execute(Report.__table__.update().where(Report.id <= 5).values(latitude=49.6, longitude=6.12))
+        session.execute(Meta.__table__.update().where(Meta.id == 2).values(address_polled=True))
+        session.commit()
+
+        rows = ReportRepository().get_coordinates_in_range(session, 2, 10, only_unpolled=True)
+
+        assert [(row.id, row.report_id) for row in rows] == [(3, 3), (4, 4), (5, 5)]
+
+        MetaRepository().update_many_by_id(session, [
+            {"id": row.id, "address_polled": True, "address_street": f"Street {row.report_id}"} for row in rows
+        ])
+
+        assert ReportRepository().get_coordinates_in_range(session, 2, 10, only_unpolled=True) == []
+        assert session.get(Meta, 4).address_street == "Street 4"
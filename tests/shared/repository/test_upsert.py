@@ -0,0 +1,70 @@
+import pytest
+
+from datetime import datetime
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import sessionmaker
+
+from py_reportit.crawler.service.crawler import CrawlerService
+from py_reportit.crawler.util.reportit_utils import report_content_hash
+from py_reportit.shared.model import *
+from py_reportit.shared.model.answer_meta import ReportAnswerMeta
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.report import Report
+from py_reportit.shared.model.report_answer import ReportAnswer
+from py_reportit.shared.repository.meta import MetaRepository
+from py_reportit.shared.repository.report import ReportRepository
+from py_reportit.shared.repository.report_answer import ReportAnswerRepository
+from py_reportit.shared.service.cache_service import CacheService
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    orm_base.Base.metadata.create_all(engine)
+
+    with sessionmaker(engine)() as session:
+        yield session
+
+@pytest.fixture
+def crawler() -> CrawlerService:
+    return CrawlerService(
+        config={},
+        api_service=None,
+        photo_service=None,
+        report_repository=ReportRepository(),
+        meta_repository=MetaRepository(),
+        report_answer_repository=ReportAnswerRepository(),
+        crawl_repository=None,
+        crawl_item_repository=None,
+        cache_service=CacheService(),
+        timezone=None,
+    )
+
+def build_report(title: str, answer_texts: list[str], do_tweet: bool = True) -> Report:
+    report = Report(id=1, title=title, status="accepted", created_at=datetime(2024, 1, 1), meta=Meta(do_tweet=do_tweet))
+    report.answers = [
+        ReportAnswer(report_id=1, order=order, text=text, author="Service", created_at=datetime(2024, 1, 2),
+                     closing=False, meta=ReportAnswerMeta(do_tweet=do_tweet))
+        for order, text in enumerate(answer_texts)
+    ]
+    return report
+
+def test_persist_reports_inserts_then_updates(session, crawler: CrawlerService):
+    crawler.persist_reports(session, [build_report("first", ["a"], do_tweet=False)])
+
+    crawler.persist_reports(session, [build_report("second", ["a updated", "b"])])
+
+    report = session.execute(select(Report)).scalar_one()
+
+    assert report.title == "second"
+    assert report.content_hash == report_content_hash(report)
+    assert report.meta.do_tweet == False
+    assert [answer.text for answer in sorted(report.answers, key=lambda answer: answer.order)] == ["a updated", "b"]
+    assert [answer.meta.do_tweet for answer in sorted(report.answers, key=lambda answer: answer.order)] == [False, True]
+    assert session.execute(select(func.count()).select_from(Meta)).scalar() == 1
+    assert session.execute(select(func.count()).select_from(ReportAnswerMeta)).scalar() == 2
+
+def test_upsert_many_without_entities_is_noop(session):
+    ReportRepository().upsert_many(session, [])
+
+    assert session.execute(select(func.count()).select_from(Report)).scalar() == 0
@@ -0,0 +1,119 @@
+import pytest
+
+from py_reportit.shared.service.cache_service import CacheService, InMemoryCacheBackend, RedisCacheBackend, \
+    CacheBackendException, build_cache_service
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class LocalRedis:
+    """Stand-in for a Redis server, implementing the subset of the redis-py client API used by the backend."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.values: dict[str, tuple[bytes, float | None]] = {}
+
+    def get(self, key: str):
+        value, expires_at = self.values.get(key, (None, None))
+
+        if expires_at is not None and expires_at <= self.clock():
+            del self.values[key]
+            return None
+
+        return value
+
+    def set(self, key: str, value: bytes, px: int | None = None):
+        self.values[key] = (value, self.clock() + px / 1000 if px else None)
+
+    def delete(self, key: str):
+        self.values.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        value = int(self.get(key) or 0) + 1
+        self.values[key] = (str(value).encode(), None)
+        return value
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request, clock: FakeClock) -> CacheService:
+    if request.param == "memory":
+        return CacheService(InMemoryCacheBackend(clock=clock))
+
+    return CacheService(RedisCacheBackend(LocalRedis(clock)))
+
+def test_values_expire_after_their_ttl(cache: CacheService, clock: FakeClock):
+    cache.set("nonces", {"nonce": "abc"}, ttl_seconds=10)
+    cache.set("forever", (1, [2, 3]))
+
+    clock.now = 9.9
+    assert cache.get("nonces") == {"nonce": "abc"}
+
+    clock.now = 10
+    assert cache.get("nonces") is None
+    assert cache.get("forever") == (1, [2, 3])
+
+def test_namespaces_do_not_collide_but_share_metrics(cache: CacheService):
+    crawler_cache = cache.namespaced("crawler")
+
+    cache.set("key", "root")
+    crawler_cache.set("key", "crawler")
+
+    assert cache.get("key") == "root"
+    assert crawler_cache.get("key") == "crawler"
+    assert cache.get("missing") is None
+    assert cache.get_metrics() == {"hits": 2, "misses": 1, "sets": 2, "hit_ratio": 2 / 3}
+
+def test_generations(cache: CacheService):
+    assert cache.get_generation("report_data") == 0
+
+    cache.bump_generation("report_data")
+    cache.bump_generation("report_data")
+
+    assert cache.get_generation("report_data") == 2
+    assert cache.namespaced("other").get_generation("report_data") == 0
+
+def test_unset(cache: CacheService):
+    cache.set("key", b"value")
+    cache.unset("key")
+
+    assert cache.get("key") is None
+
+def test_in_memory_backend_evicts_least_recently_used():
+    backend = InMemoryCacheBackend(max_entries=2)
+
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+    assert backend.evictions == 1
+
+def test_in_memory_backend_does_not_evict_counters():
+    cache = CacheService(InMemoryCacheBackend(max_entries=1))
+
+    cache.bump_generation("report_data")
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get_generation("report_data") == 1
+    assert cache.get("a") is None
+
+def test_build_cache_service_rejects_unknown_backends():
+    assert isinstance(build_cache_service({}).backend, InMemoryCacheBackend)
+
+    with pytest.raises(CacheBackendException):
+        build_cache_service({"CACHE_BACKEND": "memcached"})
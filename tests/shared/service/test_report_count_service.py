@@ -0,0 +1,63 @@
+import pytest
+
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from py_reportit.shared.model import *
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.report import Report
+from py_reportit.shared.repository.report import ReportRepository
+from py_reportit.shared.service.cache_service import CacheService
+from py_reportit.shared.service.report_count_service import CountMode, ReportCountService
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    orm_base.Base.metadata.create_all(engine)
+
+    with sessionmaker(engine)() as session:
+        for report_id in range(1, 6):
+            status = "finished" if report_id % 2 else "accepted"
+            session.add(Report(id=report_id, title="Report", status=status, created_at=datetime(2024, 1, 1), meta=Meta()))
+
+        session.commit()
+
+        yield session
+
+@pytest.fixture
+def count_service() -> ReportCountService:
+    return ReportCountService({}, CacheService(), ReportRepository())
+
+finished = [Report.status == "finished"]
+
+def add_finished_report(session):
+    session.add(Report(id=6, title="Report", status="finished", meta=Meta()))
+    session.commit()
+
+def test_normalize_filters_ignores_unset_values_and_case():
+    assert ReportCountService.normalize_filters({"status": "Finished ", "photo": "all", "street": None, "postcode": 1234}) == \
+        ReportCountService.normalize_filters({"postcode": 1234, "status": "finished", "search_text": ""})
+
+def test_estimate_reuses_cached_count_until_invalidated(session, count_service: ReportCountService):
+    assert count_service.get_total_count(session, CountMode.ESTIMATE, {"status": "finished"}, and_cond=finished) == 3
+
+    add_finished_report(session)
+
+    assert count_service.get_total_count(session, CountMode.ESTIMATE, {"status": "finished"}, and_cond=finished) == 3
+    assert count_service.get_total_count(session, CountMode.EXACT, {"status": "finished"}, and_cond=finished) == 4
+    # Exact counts refresh the cache
+    assert count_service.get_total_count(session, CountMode.ESTIMATE, {"status": "finished"}, and_cond=finished) == 4
+
+def test_invalidate_drops_cached_counts(session, count_service: ReportCountService):
+    count_service.get_total_count(session, CountMode.ESTIMATE, {"status": "finished"}, and_cond=finished)
+
+    add_finished_report(session)
+    count_service.invalidate()
+
+    assert count_service.get_total_count(session, CountMode.ESTIMATE, {"status": "finished"}, and_cond=finished) == 4
+
+def test_none_mode_skips_counting(session, count_service: ReportCountService):
+    assert count_service.get_total_count(session, CountMode.NONE, {}) is None
+    assert count_service.get_total_count(session, CountMode.ESTIMATE, {}) == 5
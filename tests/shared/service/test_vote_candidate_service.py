@@ -0,0 +1,70 @@
+import pytest
+
+from random import Random
+from uuid import uuid4
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from py_reportit.shared.model import *
+from py_reportit.shared.model.category import Category
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.meta_category_vote import MetaCategoryVote
+from py_reportit.shared.model.report import Report
+from py_reportit.shared.repository.meta import MetaRepository
+from py_reportit.shared.service.vote_candidate_service import VoteCandidateService, NoVoteCandidateException
+
+voter = uuid4()
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    orm_base.Base.metadata.create_all(engine)
+
+    with sessionmaker(engine)() as session:
+        session.add(Category(id=1, label="Lighting"))
+
+        # Reports 1-3 have a vote by the voter, 4-6 have one by someone else, 7-9 have none
+        for report_id in range(1, 10):
+            votes = []
+
+            if report_id <= 3:
+                votes = [MetaCategoryVote(user_id=voter, category_id=1)]
+            elif report_id <= 6:
+                votes = [MetaCategoryVote(user_id=uuid4(), category_id=1)]
+
+            session.add(Report(id=report_id, title="Report", status="accepted",
+                               meta=Meta(id=report_id, vote_count=len(votes), category_votes=votes)))
+
+        session.commit()
+
+        yield session
+
+def test_candidates_come_from_the_lowest_bucket(session):
+    service = VoteCandidateService(MetaRepository(), Random(1))
+
+    candidates = {service.get_candidate(session, voter).report_id for _ in range(50)}
+
+    assert candidates == {7, 8, 9}
+
+def test_votes_of_the_user_are_excluded(session):
+    session.query(Meta).filter(Meta.id >= 7).delete()
+    session.commit()
+    service = VoteCandidateService(MetaRepository(), Random(1))
+
+    candidates = {service.get_candidate(session, voter).report_id for _ in range(50)}
+
+    assert candidates == {4, 5, 6}
+
+def test_falls_back_to_voted_reports(session):
+    session.query(Meta).filter(Meta.id >= 4).delete()
+    session.commit()
+
+    assert VoteCandidateService(MetaRepository()).get_candidate(session, voter).report_id in {1, 2, 3}
+
+def test_raises_without_reports(session):
+    session.query(MetaCategoryVote).delete()
+    session.query(Meta).delete()
+    session.commit()
+
+    with pytest.raises(NoVoteCandidateException):
+        VoteCandidateService(MetaRepository()).get_candidate(session, voter)
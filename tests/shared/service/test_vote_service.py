@@ -0,0 +1,77 @@
+import pytest
+
+from uuid import uuid4
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from py_reportit.shared.model import *
+from py_reportit.shared.model.category import Category
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.report import Report
+from py_reportit.shared.repository.category import CategoryRepository
+from py_reportit.shared.repository.category_vote import CategoryVoteRepository
+from py_reportit.shared.repository.meta import MetaRepository
+from py_reportit.shared.repository.report import ReportRepository
+from py_reportit.shared.service.cache_service import CacheService
+from py_reportit.shared.service.report_count_service import CountMode, ReportCountService
+from py_reportit.shared.service.vote_service import VoteService
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    orm_base.Base.metadata.create_all(engine)
+
+    with sessionmaker(engine)() as session:
+        session.add_all([Category(id=1, label="Lighting"), Category(id=2, label="Waste")])
+        session.add(Report(id=1, title="Report", status="accepted", meta=Meta(id=1)))
+        session.commit()
+
+        yield session
+
+@pytest.fixture
+def vote_service() -> VoteService:
+    return VoteService(
+        config={},
+        meta_repository=MetaRepository(),
+        category_vote_repository=CategoryVoteRepository(),
+        category_repository=CategoryRepository(),
+        report_count_service=ReportCountService({}, CacheService(), ReportRepository()),
+    )
+
+def test_cast_vote_maintains_vote_count_and_category(session, vote_service: VoteService):
+    first_user, second_user, third_user = uuid4(), uuid4(), uuid4()
+
+    vote_service.cast_vote(session, first_user, 1, 1)
+    meta = session.get(Meta, 1)
+
+    assert meta.vote_count == 1
+    assert meta.category_id == 1
+
+    vote_service.cast_vote(session, second_user, 1, 2)
+    vote_service.cast_vote(session, third_user, 1, 2)
+
+    assert meta.vote_count == 3
+    assert meta.category.label == "Waste"
+
+def test_changing_a_vote_does_not_count_twice(session, vote_service: VoteService):
+    user = uuid4()
+
+    vote_service.cast_vote(session, user, 1, 1)
+    vote_service.cast_vote(session, user, 1, 2)
+    meta = session.get(Meta, 1)
+
+    assert meta.vote_count == 1
+    assert meta.category_id == 2
+    assert session.query(Meta).filter(Meta.category_id == 2, Meta.vote_count == 1).count() == 1
+
+def test_cast_vote_invalidates_cached_counts(session, vote_service: VoteService):
+    count_service = vote_service.report_count_service
+    filters = {"category": "Waste"}
+    waste_condition = [Report.meta.has(Meta.category_id == 2)]
+
+    assert count_service.get_total_count(session, CountMode.EXACT, filters, and_cond=waste_condition) == 0
+
+    vote_service.cast_vote(session, uuid4(), 1, 2)
+
+    assert count_service.get_total_count(session, CountMode.ESTIMATE, filters, and_cond=waste_condition) == 1
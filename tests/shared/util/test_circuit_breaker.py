@@ -0,0 +1,62 @@
+from py_reportit.shared.util.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10, clock=FakeClock())
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+def test_half_open_circuit_lets_a_single_trial_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+
+    breaker.record_failure()
+    clock.now += 10
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.is_available()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    assert not breaker.is_available()
+
+    breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+def test_failed_trial_reopens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=clock)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 10
+
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    clock.now += 9
+    assert not breaker.allow_request()
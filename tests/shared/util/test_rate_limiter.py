@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+
+from time import monotonic
+
+from py_reportit.shared.util.rate_limiter import PerHostRateLimiter, TokenBucket
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleeper=clock.sleep)
+
+    bucket.acquire()
+    bucket.acquire()
+
+    assert clock.sleeps == []
+
+    bucket.acquire()
+
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+def test_token_bucket_refills_up_to_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleeper=clock.sleep)
+
+    bucket.acquire()
+    clock.now += 10
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(1)
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+def test_per_host_rate_limiter_keeps_hosts_independent():
+    clock = FakeClock()
+    limiter = PerHostRateLimiter(rate=1, clock=clock, sleeper=clock.sleep)
+
+    limiter.acquire("https://reportit.vdl.lu/frame/search.php?lang=en")
+    limiter.acquire("https://eu1.locationiq.com/v1/reverse.php")
+
+    assert clock.sleeps == []
+    assert limiter.get_bucket("https://reportit.vdl.lu/other") is limiter.get_bucket("reportit.vdl.lu")
+
+def test_token_bucket_paces_async_acquires():
+    bucket = TokenBucket(rate=20, capacity=1)
+
+    async def acquire_three_times() -> float:
+        started_at = monotonic()
+
+        for _ in range(3):
+            await bucket.acquire_async()
+
+        return monotonic() - started_at
+
+    assert asyncio.run(acquire_three_times()) >= 0.09
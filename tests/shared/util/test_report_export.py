@@ -0,0 +1,47 @@
+import csv
+import gzip
+import io
+import json
+
+from py_reportit.shared.util.report_export import CSV_COLUMNS, ExportFormat, encode_json_array, encode_reports, gzip_chunks
+
+reports = [
+    {
+        "id": 1,
+        "title": "Broken light, \"urgent\"",
+        "description": "Line one\nLine two",
+        "status": "accepted",
+        "meta": {"language": "en", "address_street": "Rue de Hollerich", "category": {"id": 1, "label": "Lighting"}},
+        "answers": [{"text": "Merci"}],
+    },
+    {"id": 2, "title": "Waste", "status": "finished", "meta": {"language": "fr", "category": None}, "answers": []},
+]
+
+def test_ndjson_has_one_report_per_line():
+    lines = b"".join(encode_reports(reports, ExportFormat.NDJSON)).decode("utf-8").splitlines()
+
+    assert [json.loads(line) for line in lines] == reports
+
+def test_csv_flattens_reports():
+    rows = list(csv.DictReader(io.StringIO(b"".join(encode_reports(reports, ExportFormat.CSV)).decode("utf-8"))))
+
+    assert list(rows[0].keys()) == CSV_COLUMNS
+    assert rows[0]["description"] == "Line one\nLine two"
+    assert rows[0]["category"] == "Lighting"
+    assert rows[0]["answer_count"] == "1"
+    assert rows[1]["category"] == ""
+
+def test_csv_without_reports_only_has_a_header():
+    assert b"".join(encode_reports([], ExportFormat.CSV)).decode("utf-8").strip() == ",".join(CSV_COLUMNS)
+
+def test_json_array():
+    assert json.loads(b"".join(encode_json_array(iter(reports)))) == reports
+    assert json.loads(b"".join(encode_json_array([]))) == []
+
+def test_gzip_chunks_round_trip():
+    chunks = [f"line {i}\n".encode("utf-8") for i in range(10000)]
+
+    compressed = list(gzip_chunks(chunks, min_chunk_size=1024))
+
+    assert len(compressed) > 1
+    assert gzip.decompress(b"".join(compressed)) == b"".join(chunks)
@@ -0,0 +1,40 @@
+import pytest
+
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+
+from py_reportit.shared.service.cache_service import CacheService, InMemoryCacheBackend
+from py_reportit.web.dependencies import get_current_active_admin
+from py_reportit.web.server import app
+
+
+class SharedCacheBackend(InMemoryCacheBackend):
+    shared = True
+
+
+@pytest.fixture
+def client_with_cache():
+    app.dependency_overrides[get_current_active_admin] = lambda: None
+
+    def client_with_cache(cache_service: CacheService) -> TestClient:
+        app.container.cache_service.override(providers.Object(cache_service))
+        return TestClient(app)
+
+    yield client_with_cache
+
+    app.container.cache_service.reset_override()
+    app.dependency_overrides.pop(get_current_active_admin)
+
+def test_nonce_counters_are_unavailable_with_a_per_process_cache(client_with_cache):
+    response = client_with_cache(CacheService(InMemoryCacheBackend())).get("/admin/crawler/nonces")
+
+    assert response.status_code == 503
+
+def test_nonce_counters_are_read_from_a_shared_cache(client_with_cache):
+    cache_service = CacheService(SharedCacheBackend())
+    cache_service.namespaced("nonces").increment("counters:reused")
+
+    response = client_with_cache(cache_service).get("/admin/crawler/nonces")
+
+    assert response.status_code == 200
+    assert response.json() == {"reused": 1, "fetched": 0, "rejected": 0}
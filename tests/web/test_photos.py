@@ -0,0 +1,40 @@
+import pytest
+
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from py_reportit.crawler.service.photo import PhotoFormat, PhotoService, save_atomically, save_derivatives
+from py_reportit.web.server import app
+
+
+@pytest.fixture
+def client(tmp_path):
+    photo_service = PhotoService({"PHOTO_DOWNLOAD_FOLDER": str(tmp_path), "PHOTO_DOWNLOAD_QUALITY": 70, "PHOTO_WEBP": 1})
+
+    with app.container.photo_service.override(providers.Object(photo_service)):
+        yield TestClient(app)
+
+def test_photos_are_served_in_the_requested_size_and_format(client: TestClient, tmp_path):
+    save_derivatives(Image.new("RGB", (2400, 1600)), str(tmp_path), 1, 70, [PhotoFormat.JPEG, PhotoFormat.WEBP])
+
+    response = client.get("/photos/1", params={"size": "thumbnail", "format": "webp"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert response.content == (tmp_path / "1_thumbnail.webp").read_bytes()
+
+def test_fallback_photos_are_revalidated(client: TestClient, tmp_path):
+    # Photos saved before derivatives existed only have their full size JPEG
+    save_atomically(Image.new("RGB", (1200, 800)), str(tmp_path / "1.jpg"), 70)
+
+    response = client.get("/photos/1", params={"size": "thumbnail", "format": "webp"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["cache-control"] == "public, no-cache"
+    assert response.content == (tmp_path / "1.jpg").read_bytes()
+
+    assert client.get("/photos/1").headers["cache-control"].startswith("public, max-age=")
+    assert client.get("/photos/2").status_code == 404
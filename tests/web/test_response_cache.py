@@ -0,0 +1,110 @@
+import pytest
+
+from datetime import datetime
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from py_reportit.shared.model import *
+from py_reportit.shared.model.meta import Meta
+from py_reportit.shared.model.report import Report
+from py_reportit.shared.service.cache_service import CacheService, REPORT_DATA
+from py_reportit.web.server import app
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    orm_base.Base.metadata.create_all(engine)
+
+    with sessionmaker(engine)() as session:
+        for report_id in range(1, 4):
+            session.add(Report(id=report_id, title=f"Report {report_id}", status="accepted", meta=Meta(),
+                               created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, report_id)))
+
+        session.commit()
+
+    return engine
+
+@pytest.fixture
+def cache_service() -> CacheService:
+    return CacheService()
+
+@pytest.fixture
+def client(engine, cache_service: CacheService):
+    with app.container.sessionmaker.override(providers.Object(sessionmaker(engine))), \
+            app.container.cache_service.override(providers.Object(cache_service)):
+        yield TestClient(app)
+
+@pytest.fixture
+def statements(engine):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    yield statements
+    event.remove(engine, "before_cursor_execute", listener)
+
+def test_report_is_served_from_cache_with_validators(client: TestClient, statements: list):
+    response = client.get("/reports/2")
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Report 2"
+    assert "last-modified" not in response.headers
+
+    statements.clear()
+    cached_response = client.get("/reports/2")
+
+    assert cached_response.content == response.content
+    assert cached_response.headers["etag"] == response.headers["etag"]
+    assert not statements
+
+def test_conditional_requests_are_not_modified(client: TestClient):
+    etag = client.get("/reports/1").headers["etag"]
+
+    assert client.get("/reports/1", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/reports/1", headers={"If-None-Match": '"other"'}).status_code == 200
+    # updated_at does not reflect every change to the body, so dates alone never validate a response
+    assert client.get("/reports/1", headers={"If-Modified-Since": "Mon, 01 Jan 2030 00:00:00 GMT"}).status_code == 200
+
+def test_crawler_writes_invalidate_cached_responses(client: TestClient, cache_service: CacheService, engine, statements: list):
+    etag = client.get("/reports?page_size=2&count=estimate").headers["etag"]
+
+    with sessionmaker(engine)() as session:
+        session.get(Report, 3).title = "Updated"
+        session.commit()
+
+    assert client.get("/reports?page_size=2&count=estimate", headers={"If-None-Match": etag}).status_code == 304
+
+    cache_service.bump_generation(REPORT_DATA)
+    response = client.get("/reports?page_size=2&count=estimate", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["reports"][0]["title"] == "Updated"
+
+def test_exact_counts_bypass_the_cache(client: TestClient, engine, statements: list):
+    etag = client.get("/reports?page_size=2").headers["etag"]
+
+    with sessionmaker(engine)() as session:
+        session.add(Report(id=4, title="Report 4", status="accepted", meta=Meta(),
+                           created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 4)))
+        session.commit()
+
+    response = client.get("/reports?page_size=2", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["total_count"] == 4
+
+def test_large_responses_are_not_cached(client: TestClient, statements: list):
+    with app.container.config.RESPONSE_CACHE_MAX_BODY_BYTES.override(10):
+        client.get("/reports/1")
+        statements.clear()
+        client.get("/reports/1")
+
+    assert statements
+
+def test_missing_reports_are_not_cached(client: TestClient):
+    assert client.get("/reports/42").status_code == 404
+    assert client.get("/reports/42").status_code == 404
@@ -0,0 +1,80 @@
+import pytest
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import os
+
+from py_reportit.web.static_files import build_file_response, get_file_etag
+
+content = bytes(range(256)) * 4
+
+@pytest.fixture
+def client(tmp_path) -> TestClient:
+    path = tmp_path / "snapshot.bin"
+    path.write_bytes(content)
+
+    app = FastAPI()
+
+    @app.get("/file")
+    def get_file(request: Request):
+        return build_file_response(request, str(path), etag="abc", media_type="application/octet-stream")
+
+    @app.get("/cached")
+    def get_cached_file(request: Request):
+        return build_file_response(
+            request,
+            str(path),
+            etag=get_file_etag(os.stat(path)),
+            media_type="image/jpeg",
+            cache_control="public, max-age=60"
+        )
+
+    return TestClient(app)
+
+def test_full_response_has_validators(client: TestClient):
+    response = client.get("/file")
+
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["etag"] == '"abc"'
+    assert response.headers["accept-ranges"] == "bytes"
+
+def test_cache_control_and_file_etag(client: TestClient, tmp_path):
+    response = client.get("/cached")
+
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert client.get("/cached", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+    (tmp_path / "snapshot.bin").write_bytes(content * 2)
+
+    assert client.get("/cached", headers={"If-None-Match": response.headers["etag"]}).status_code == 200
+
+def test_matching_etag_is_not_modified(client: TestClient):
+    assert client.get("/file", headers={"If-None-Match": 'W/"abc"'}).status_code == 304
+    assert client.get("/file", headers={"If-None-Match": '"other"'}).status_code == 200
+
+@pytest.mark.parametrize("range_header,expected", [
+    ("bytes=0-9", content[0:10]),
+    ("bytes=1000-", content[1000:]),
+    ("bytes=-5", content[-5:]),
+    ("bytes=1020-5000", content[1020:]),
+])
+def test_range_requests(client: TestClient, range_header: str, expected: bytes):
+    response = client.get("/file", headers={"Range": range_header})
+
+    assert response.status_code == 206
+    assert response.content == expected
+    assert response.headers["content-range"].endswith(f"/{len(content)}")
+
+def test_unsatisfiable_range(client: TestClient):
+    response = client.get("/file", headers={"Range": "bytes=2000-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+def test_range_of_outdated_representation_returns_whole_file(client: TestClient):
+    response = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": '"outdated"'})
+
+    assert response.status_code == 200
+    assert response.content == content